@@ -7,15 +7,18 @@ RPC api.
 """
 import typing as t
 import logging
+import time
 
 from celery.exceptions import TimeoutError as CeleryTimeoutError
+from celery.result import AsyncResult
 from flask import Flask
 from flask.globals import current_app
 from kombu.exceptions import OperationalError
 from werkzeug.local import LocalProxy
 
 from .app import HadesCelery
-from .exc import HadesConfigError, HadesOperationalError, HadesTimeout
+from .cache import TTLCache
+from .exc import HadesConfigError, HadesError, HadesOperationalError, HadesTimeout
 from .parsing import RadiusLogEntry, reduce_radius_logs
 
 
@@ -30,6 +33,15 @@ A minimal example configuration would look like this:
 """
 
 
+class PortLogs(t.NamedTuple):
+    """The result of a lookup of :py:meth:`HadesLogs.fetch_logs_many` for one port"""
+    nasipaddress: str
+    nasportid: str
+    logs: list[RadiusLogEntry]
+    #: Whether the lookup did not finish in time, in which case `logs` is empty
+    timed_out: bool = False
+
+
 class HadesLogs:
     """The ``HadesLogs`` Flask extension
 
@@ -51,6 +63,16 @@ class HadesLogs:
         - 'HADES_ROUTING_KEY' (Optional, default=None): The routing
           key to use for the celery messages
 
+        - 'HADES_CACHE_TTL' (Optional, default=30): The time in seconds
+          the logs of a port are cached.  0 disables the cache.
+
+        - 'HADES_CACHE_STALE_TTL' (Optional, default=120): The time in
+          seconds expired logs are still shown while they are refreshed.
+          Ignored if the cache is disabled.
+
+        - 'HADES_CACHE_SIZE' (Optional, default=256): The number of
+          lookups to cache
+
     Usage:
 
     >>> from flask import Flask
@@ -62,6 +84,8 @@ class HadesLogs:
     >>> logs = HadesLogs(app)
 
     >>> logs.fetch_logs(<nasip>, <portid>)
+
+    >>> logs.fetch_logs_many([(<nasip>, <portid>), (<nasip>, <other_portid>)])
     """
 
     def __init__(self, app: Flask | None = None) -> None:
@@ -80,6 +104,15 @@ class HadesLogs:
             self.logger.warning("Missing config key: %s\n%s", e, _CONFIGURATION_DOCS)
             raise KeyError(f"Missing config key: {e}") from e
         self.timeout = app.config.get('HADES_TIMEOUT', 5)
+        #: The parsed results of ``get_auth_attempts_at_port`` by
+        #: ``(nasipaddress, nasportid, limit)``
+        self.cache: TTLCache[tuple[str, str, int], list[RadiusLogEntry]] = TTLCache(
+            maxsize=app.config.get('HADES_CACHE_SIZE', 256),
+            ttl=app.config.get('HADES_CACHE_TTL', 30),
+            stale_ttl=app.config.get('HADES_CACHE_STALE_TTL', 120),
+        )
+        # the pending lookups revalidating stale cache entries
+        self._revalidations: dict[tuple[str, str, int], AsyncResult] = {}
         task_default_exchange = app.config.get(
             "HADES_TASK_DEFAULT_EXCHANGE", "hades.rpc-call"
         )
@@ -114,12 +147,19 @@ class HadesLogs:
         return self.celery.signature(full_task_name, args=args, kwargs=kwargs)
 
     def fetch_logs(
-        self, nasipaddress: str, nasportid: str, limit: int = 100, reduced: bool = True
+        self,
+        nasipaddress: str,
+        nasportid: str,
+        limit: int = 100,
+        reduced: bool = True,
+        cached: bool = True,
     ) -> t.Iterator[RadiusLogEntry]:
         """Fetch the auth logs of the given port
 
         :param nasipaddress: The IP address of the NAS.
         :param nasportid: The port identifier (e.g. `C12`) of the NAS port
+        :param cached: Whether a cached result may be returned.  The result
+            is cached either way.
 
         :returns: the result of the task (see ``get_port_auth_attempts`` in hades)
         :rtype: iterable (generator if :param:`reduced`)
@@ -133,16 +173,137 @@ class HadesLogs:
             def reductor(x):
                 return x
 
-        task = self.create_task(name='get_auth_attempts_at_port',
+        key = (nasipaddress, nasportid, limit)
+        entries = self._get_cached(key) if cached else None
+        if entries is None:
+            entries = self._parse(self.wait_for_task(self._auth_attempts_task(*key)))
+            self.cache.set(key, entries)
+
+        return reductor(iter(entries))
+
+    def fetch_logs_many(
+        self,
+        ports: t.Iterable[tuple[str, str]],
+        limit: int = 100,
+        reduced: bool = True,
+    ) -> list[PortLogs]:
+        """Fetch the auth logs of several ports at once
+
+        The lookups of all ports which are not cached are dispatched before
+        waiting for any of them, and they all share one deadline of `timeout`
+        seconds.  So looking up the ports of a room takes as long as the
+        slowest lookup, not the sum of all of them.
+
+        :param ports: tuples ``(nasipaddress, nasportid)``, see :py:meth:`fetch_logs`
+
+        :returns: the logs of every port in the given order.  The logs of
+            ports whose lookup did not finish in time are marked as ``timed_out``.
+
+        :raises HadesOperationalError: raised when the lookups cannot be dispatched.
+        """
+        keys = [(nasipaddress, nasportid, limit) for nasipaddress, nasportid in ports]
+        deadline = time.monotonic() + self.timeout
+        cached = {key: entries for key in keys if (entries := self._get_cached(key)) is not None}
+        results = {
+            key: self._dispatch(self._auth_attempts_task(*key))
+            for key in keys if key not in cached
+        }
+        self.logger.info("Waiting for %d tasks", len(results))
+
+        port_logs = []
+        for key in keys:
+            nasipaddress, nasportid, _ = key
+            if (entries := cached.get(key)) is None:
+                result = results[key]
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0 and not result.ready():
+                        raise HadesTimeout("The Hades lookup task has timed out")
+                    # celery treats a timeout of 0 as no timeout at all
+                    entries = self._parse(self._wait(result, timeout=max(remaining, 0.01)))
+                except HadesTimeout:
+                    self.logger.warning(
+                        "Hades lookup of %s/%s timed out", nasipaddress, nasportid
+                    )
+                    port_logs.append(PortLogs(nasipaddress, nasportid, [], timed_out=True))
+                    continue
+                self.cache.set(key, entries)
+            port_logs.append(PortLogs(
+                nasipaddress, nasportid,
+                list(reduce_radius_logs(entries) if reduced else entries),
+            ))
+        return port_logs
+
+    def _auth_attempts_task(self, nasipaddress: str, nasportid: str, limit: int):
+        return self.create_task(name='get_auth_attempts_at_port',
                                 nas_ip_address=nasipaddress, nas_port_id=nasportid,
                                 limit=limit)
 
-        return reductor(RadiusLogEntry(*e) for e in self.wait_for_task(task))
+    @staticmethod
+    def _parse(raw_entries) -> list[RadiusLogEntry]:
+        return [RadiusLogEntry(*e) for e in raw_entries]
+
+    def _get_cached(self, key: tuple[str, str, int]) -> list[RadiusLogEntry] | None:
+        """Look up the cached result of a lookup
+
+        A stale result is returned as well, but its revalidation is
+        dispatched.  The fresh result is picked up by the first call after
+        it arrived, so no background thread is necessary.
+
+        :returns: the parsed result, or `None` on a cache miss
+        """
+        if (
+            (pending := self._revalidations.get(key)) is not None
+            and pending.ready()
+            # another thread may have picked up the result in the meantime
+            and self._revalidations.pop(key, None) is pending
+        ):
+            try:
+                self.cache.set(key, self._parse(self._wait(pending, timeout=self.timeout)))
+            except HadesError:
+                self.logger.warning("Revalidating the logs of %s failed", key, exc_info=True)
+                self.cache.end_revalidation(key)
+
+        cached = self.cache.get(key)
+        if cached is None:
+            # a revalidation which did not arrive in time is superseded by the new lookup
+            if self._revalidations.pop(key, None) is not None:
+                self.cache.end_revalidation(key)
+            return None
+        entries, fresh = cached
+        if not fresh and self.cache.start_revalidation(key):
+            self._prune_revalidations()
+            try:
+                self._revalidations[key] = self._dispatch(self._auth_attempts_task(*key))
+            except HadesOperationalError:
+                self.logger.warning("Revalidating the logs of %s failed", key, exc_info=True)
+                self.cache.end_revalidation(key)
+        return entries
+
+    def _prune_revalidations(self) -> None:
+        """Forget the revalidations of entries which have left the cache
+
+        A revalidation is only picked up by a lookup of its key, so without
+        this, the results of keys which are not looked up again would pile up.
+        As the cache is bounded, so are the pending revalidations.
+        """
+        for key in list(self._revalidations):
+            if key not in self.cache and self._revalidations.pop(key, None) is not None:
+                self.cache.end_revalidation(key)
 
     def wait_for_task(self, task):
         self.logger.info("Waiting for task: %s", task)
+        return self._wait(self._dispatch(task), timeout=self.timeout)
+
+    def _dispatch(self, task):
+        try:
+            return task.apply_async()
+        except OperationalError as e:
+            raise HadesOperationalError("OSError when fetching hades logs") from e
+
+    def _wait(self, result, timeout: float):
         try:
-            return task.apply_async().wait(timeout=self.timeout)
+            return result.wait(timeout=timeout)
         except CeleryTimeoutError as e:
             raise HadesTimeout("The Hades lookup task has timed out") from e
         except OSError as e:
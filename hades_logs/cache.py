@@ -0,0 +1,128 @@
+"""
+hades_logs.cache
+----------------
+
+A small in-process cache for the results of Hades lookups.
+"""
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+K = t.TypeVar("K", bound=t.Hashable)
+V = t.TypeVar("V")
+
+
+class CacheStats(t.NamedTuple):
+    #: lookups answered with a fresh entry
+    hits: int
+    #: lookups answered with an expired entry which was then revalidated
+    stale_hits: int
+    #: lookups which had to wait for Hades
+    misses: int
+    #: the number of cached entries
+    size: int
+
+
+class TTLCache(t.Generic[K, V]):
+    """A size-bounded LRU cache whose entries expire after `ttl` seconds
+
+    Expired entries are not dropped right away: for another `stale_ttl`
+    seconds, :meth:`get` still returns them, but marked as stale, so the
+    caller can answer with the stale value and revalidate it in the
+    background (see :meth:`start_revalidation`).  A `ttl` of 0 disables
+    the cache, including the stale entries.
+
+    The cache is safe to use from several threads.
+
+    :param maxsize: the number of entries after which the least recently
+        used ones are evicted
+    :param ttl: the time in seconds an entry is fresh
+    :param stale_ttl: the time in seconds an expired entry may still be used
+    :param clock: the source of the current time, in seconds
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float = 0,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._revalidating: set[K] = set()
+        self._lock = threading.Lock()
+        self._hits = self._stale_hits = self._misses = 0
+
+    def get(self, key: K) -> tuple[V, bool] | None:
+        """Look up an entry
+
+        :returns: the value and whether it is still fresh,
+            or `None` if there is no usable entry
+        """
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is None:
+                self._misses += 1
+                return None
+            age = self.clock() - entry[0]
+            if age >= self.ttl + self.stale_ttl:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if age < self.ttl:
+                self._hits += 1
+                return entry[1], True
+            self._stale_hits += 1
+            return entry[1], False
+
+    def __contains__(self, key: object) -> bool:
+        """Whether there is a usable entry for `key`, without counting a lookup"""
+        with self._lock:
+            entry = self._entries.get(t.cast(K, key))
+            return entry is not None and self.clock() - entry[0] < self.ttl + self.stale_ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._revalidating.discard(key)
+            if not self.enabled:
+                return
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def start_revalidation(self, key: K) -> bool:
+        """Claim the revalidation of a stale entry
+
+        :returns: whether the caller should revalidate the entry, i.e.
+            whether nobody else is revalidating it already.  The claim ends
+            with the next :meth:`set` or :meth:`end_revalidation` of `key`.
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def end_revalidation(self, key: K) -> None:
+        """Give up the claim of :meth:`start_revalidation`, e.g. after an error"""
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._stale_hits, self._misses, len(self._entries))
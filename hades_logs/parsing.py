@@ -1,11 +1,6 @@
-from collections import defaultdict, namedtuple
+from collections import defaultdict
 from datetime import datetime, timezone
-from functools import partial
 
-_radius_log_entry = namedtuple(
-    'RadiusLogEntry',
-    ['mac', 'reply', 'groups', 'raw_attributes', 'timestamp']
-)
 
 class ParsingError(ValueError):
     pass
@@ -33,45 +28,76 @@ def attrlist_to_dict(attrlist):
     return d
 
 
-class RadiusLogEntry(_radius_log_entry):
+class RadiusLogEntry:
     """Class representing a parsed hades log entry.
 
-    This is namedtuple subclass conforming with the tuples returned by
-    ``get_auth_attempts_at_port`` from the Hades RPC API.
+    It is constructed from the tuples returned by
+    ``get_auth_attempts_at_port`` from the Hades RPC API, and behaves
+    like such a tuple with respect to iteration and equality.
 
     It provides convenient access to whether the request was accepted
     (:py:meth:`__bool__`), the :py:attr:`vlans`, time, and equality.
+    Everything is parsed once on construction, as the entries are
+    usually rendered and compared several times.
     """
-    @property
-    def accepted(self):
-        """Return whether the reply says ``"Access-Accept"``"""
-        return self.reply == "Access-Accept"
-
-    @property
-    def attributes(self):
-        """The attributes provided as a dict of lists."""
-        return attrlist_to_dict(self.raw_attributes)
+    _fields = ('mac', 'reply', 'groups', 'raw_attributes', 'timestamp')
+
+    __slots__ = (
+        *_fields, 'accepted', 'attributes', 'time', '_vlans', '_vlan_error', '_key',
+    )
+
+    def __init__(self, mac, reply, groups, raw_attributes, timestamp):
+        self.mac = mac
+        self.reply = reply
+        self.groups = groups
+        self.raw_attributes = raw_attributes
+        self.timestamp = timestamp
+
+        #: Whether the reply says ``"Access-Accept"``
+        self.accepted = reply == "Access-Accept"
+        #: The attributes provided as a dict of lists.
+        self.attributes = attrlist_to_dict(raw_attributes or ())
+        self.time = (datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                     if timestamp is not None else None)
+        # an invalid VLAN only raises when the VLANs are accessed
+        self._vlans, self._vlan_error = None, None
+        try:
+            # lookup defaults to [] as self.attributes is a defaultdict
+            self._vlans = [parse_vlan(v) for v in self.attributes['Egress-VLAN-Name']]
+        except ParsingError as e:
+            self._vlan_error = e
+        # everything but the timestamp, see `effectively_equal`
+        self._key = (mac, reply, groups, raw_attributes)
 
     @property
     def vlans(self):
         """Return the string representation of each VLAN"""
-        # lookup defaults to [] as self.attributes is a defaultdict
-        raw_vlans = self.attributes['Egress-VLAN-Name']
-        return [parse_vlan(v) for v in raw_vlans]
+        if self._vlan_error is not None:
+            raise self._vlan_error
+        return self._vlans
 
-    @property
-    def time(self):
-        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+    def __iter__(self):
+        return iter((self.mac, self.reply, self.groups, self.raw_attributes, self.timestamp))
+
+    def __eq__(self, other):
+        if not isinstance(other, RadiusLogEntry):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"RadiusLogEntry({fields})"
 
     def __bool__(self):
         """Evaluates to :py:prop:`self.accepted`"""
         return self.accepted
 
     def effectively_equal(self, other):
-        relevant_attributes = set(_radius_log_entry._fields) - {'timestamp'}
+        """Whether both entries are equal except for the time"""
         try:
-            return all(getattr(self, a) == getattr(other, a)
-                       for a in relevant_attributes)
+            return self._key == other._key
         except AttributeError:
             return False
 
@@ -104,5 +130,15 @@ def reduce_to_first_occurrence(iterable, comparator=_eq):
             previous = element
 
 
-reduce_radius_logs = partial(reduce_to_first_occurrence,
-                             comparator=RadiusLogEntry.effectively_equal)
+def reduce_radius_logs(entries):
+    """Reduce blocks of effectively equal entries to their first entry
+
+    This is :py:func:`reduce_to_first_occurrence` with
+    :py:meth:`RadiusLogEntry.effectively_equal`, but compares the
+    precomputed keys directly.  It consumes `entries` lazily.
+    """
+    previous_key = object()
+    for entry in entries:
+        if entry._key != previous_key:
+            yield entry
+            previous_key = entry._key
@@ -7,21 +7,22 @@ import logging
 import os
 import typing
 
+import ldap3
 from ldap3.utils.dn import safe_dn
 from sentry_sdk.integrations.logging import LoggingIntegration
-from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from ldap_sync import logger
 from ldap_sync.concepts import types
-from ldap_sync.execution import execute_real
-from ldap_sync.record_diff import bulk_diff_records
+from ldap_sync.execution import execute_parallel, log_execution_summary
+from ldap_sync.record_diff import iter_diff_records
 from .config import get_config_or_exit
 from .sources.db import (
     establish_and_return_session,
     fetch_db_users,
     fetch_db_groups,
     fetch_db_properties,
+    consume_db_changes,
 )
 from .sources.ldap import (
     establish_and_return_ldap_connection,
@@ -32,16 +33,28 @@ from .sources.ldap import (
 )
 
 
-def sync_production() -> None:
+def sync_production(incremental: bool = False, num_connections: int = 4) -> int:
+    """Sync to the LDAP server from the config.
+
+    :returns: the number of failed LDAP actions
+    """
     logger.info("Starting the production sync. See --help for other options.")
     config = get_config_or_exit(required_property='ldap', use_ssl='False',
                                 ca_certs_file=None, ca_certs_data=None)
     db_session = establish_and_return_session(config.db_uri)
-    connection = establish_and_return_ldap_connection(config=config)
-    fetch_and_sync(db_session, connection, config.base_dn, config.required_property)
+    connections = [
+        establish_and_return_ldap_connection(config=config) for _ in range(num_connections)
+    ]
+    try:
+        return fetch_and_sync(db_session, connections[0], config.base_dn,
+                              config.required_property, incremental=incremental,
+                              write_connections=connections)
+    finally:
+        for connection in connections:
+            connection.unbind()
 
 
-def sync_fake() -> None:
+def sync_fake(incremental: bool = False) -> int:
     logger.info("Starting sync using a mocked LDAP backend. See --help for other options.")
     try:
         db_uri = os.environ['PYCROFT_DB_URI']
@@ -54,24 +67,54 @@ def sync_fake() -> None:
     connection = fake_connection()
     BASE_DN = types.DN("ou=pycroft,dc=agdsn,dc=de")
 
-    fetch_and_sync(db_session, connection, BASE_DN)
+    return fetch_and_sync(db_session, connection, BASE_DN, incremental=incremental)
 
 
 def fetch_and_sync(
     db_session: Session,
-    connection: Connection,
+    connection: ldap3.Connection,
     base_dn: types.DN,
     required_property: str | None = None,
-) -> None:
+    incremental: bool = False,
+    write_connections: typing.Sequence[ldap3.Connection] = (),
+) -> int:
+    """Sync the users, groups and properties from the database to LDAP.
+
+    In incremental mode, only the entries which changed since the previous sync
+    are fetched and compared.  Every sync consumes the change journal,
+    so a full sync can be run at any time to repair inconsistencies.
+    The database session is committed only if all changes have been written.
+    Otherwise, it is rolled back, so that the journal is kept
+    and the failed changes are retried by the next sync.
+
+    The changes are written using `write_connections` in parallel
+    (see :func:`~ldap_sync.execution.execute_parallel`), or using `connection` if none are given.
+    Users are written before groups and properties, which refer to them as members.
+
+    :returns: the number of failed LDAP actions
+    """
     user_base_dn = types.DN(safe_dn(["ou=users", base_dn]))
     group_base_dn = types.DN(safe_dn(["ou=groups", base_dn]))
     property_base_dn = types.DN(safe_dn(["ou=properties", base_dn]))
 
+    changes = consume_db_changes(db_session)
+    if not incremental or changes is None:
+        if incremental:
+            logger.info("No previous sync recorded, falling back to a full sync")
+        logins = group_names = property_names = None
+    else:
+        logins, group_names, property_names = changes
+        logger.info(
+            "Syncing %s changed users, %s groups and %s properties",
+            len(logins), len(group_names), len(property_names),
+        )
+
     db_users = list(
         fetch_db_users(
             session=db_session,
             base_dn=user_base_dn,
             required_property=required_property,
+            logins=logins,
         )
     )
     logger.info("Fetched %s database users", len(db_users))
@@ -81,6 +124,7 @@ def fetch_and_sync(
             session=db_session,
             base_dn=group_base_dn,
             user_base_dn=user_base_dn,
+            names=group_names,
         )
     )
     logger.info("Fetched %s database groups", len(db_groups))
@@ -90,26 +134,46 @@ def fetch_and_sync(
             session=db_session,
             base_dn=property_base_dn,
             user_base_dn=user_base_dn,
+            names=property_names,
         )
     )
     logger.info("Fetched %s database properties", len(db_properties))
 
-    ldap_users = list(fetch_ldap_users(connection, base_dn=user_base_dn))
-    logger.info("Fetched %s ldap users", len(ldap_users))
-
-    ldap_groups = list(fetch_ldap_groups(connection, base_dn=group_base_dn))
-    logger.info("Fetched %s ldap groups", len(ldap_groups))
-
-    ldap_properties = list(fetch_ldap_properties(connection, base_dn=property_base_dn))
-    logger.info("Fetched %s ldap properties", len(ldap_properties))
-
-    actions = [
-        *bulk_diff_records(current=ldap_users, desired=db_users).values(),
-        *bulk_diff_records(current=ldap_groups, desired=db_groups).values(),
-        *bulk_diff_records(current=ldap_properties, desired=db_properties).values(),
+    # The LDAP entries are streamed page by page while being compared
+    # to the desired records, so they never have to be held in memory at once.
+    # `execute_parallel` consumes the whole search before writing anything.
+    connections = write_connections or [connection]
+    results = [
+        *execute_parallel(
+            iter_diff_records(
+                current=fetch_ldap_users(connection, base_dn=user_base_dn, logins=logins),
+                desired=db_users,
+            ),
+            connections,
+        ),
+        *execute_parallel(
+            iter_diff_records(
+                current=fetch_ldap_groups(connection, base_dn=group_base_dn, names=group_names),
+                desired=db_groups,
+            ),
+            connections,
+        ),
+        *execute_parallel(
+            iter_diff_records(
+                current=fetch_ldap_properties(
+                    connection, base_dn=property_base_dn, names=property_names
+                ),
+                desired=db_properties,
+            ),
+            connections,
+        ),
     ]
-    for a in actions:
-        execute_real(a, connection)
+    if failures := log_execution_summary(results):
+        logger.warning("Keeping the change journal, so the next sync retries the changes")
+        db_session.rollback()
+    else:
+        db_session.commit()
+    return failures
 
 
 NAME_LEVEL_MAPPING: dict[str, int] = {
@@ -121,6 +185,12 @@ NAME_LEVEL_MAPPING: dict[str, int] = {
 }
 
 
+def positive_int(value: str) -> int:
+    if (number := int(value)) < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
 parser = argparse.ArgumentParser(description="Pycroft ldap syncer")
 parser.add_argument('--fake', dest='fake', action='store_true', default=False,
                     help="Use a mocked LDAP backend")
@@ -129,6 +199,12 @@ parser.add_argument("-l", "--log", dest='loglevel', type=str,
                     help="Set the loglevel")
 parser.add_argument("-d", "--debug", dest='loglevel', action='store_const',
                     const='debug', help="Short for --log=debug")
+parser.add_argument("--incremental", action='store_true', default=False,
+                    help="Only sync entries which changed since the previous sync. "
+                         "Falls back to a full sync if there has not been one before.")
+parser.add_argument("-c", "--connections", dest='num_connections', type=positive_int,
+                    default=4,
+                    help="The number of LDAP connections used to write changes in parallel")
 parser.add_argument("--test-sentry", action='store_true', default=False,
                     help="Trigger exception/log message to test the sentry integration")
 
@@ -182,14 +258,15 @@ def main() -> int:
 
     try:
         if args.fake:
-            sync_fake()
+            failures = sync_fake(incremental=args.incremental)
         else:
-            sync_production()
+            failures = sync_production(incremental=args.incremental,
+                                       num_connections=args.num_connections)
     except KeyboardInterrupt:
         logger.fatal("SIGINT received, stopping.")
         logger.info("Re-run the syncer to retain a consistent state.")
         return 1
-    return 0
+    return 1 if failures else 0
 
 
 if __name__ == '__main__':
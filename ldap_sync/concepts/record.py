@@ -93,6 +93,10 @@ class Record:
     def __getitem__(self, item: str) -> typing.Any:
         return self.attrs.__getitem__(item)
 
+    @classmethod
+    def get_synced_attributes(cls) -> typing.AbstractSet[str]:
+        return cls.SYNCED_ATTRIBUTES
+
     @t.override
     def __init_subclass__(cls, **kwargs: dict[str, typing.Any]) -> None:
         if "SYNCED_ATTRIBUTES" not in cls.__dict__:
@@ -146,10 +150,6 @@ class UserRecord(Record):
     LDAP_LOGIN_ENABLED_PROPERTY = "ldap_login_enabled"
     PWD_POLICY_BLOCKED = "login_disabled"
 
-    @classmethod
-    def get_synced_attributes(cls) -> typing.AbstractSet[str]:
-        return cls.SYNCED_ATTRIBUTES
-
 
 class GroupRecord(Record):
     """Create a new groupOfMembers record with a dn and certain attributes.
@@ -7,11 +7,17 @@ ldap_sync.execution
 Execution strategies for an :class:`Action`.
 Concretely, the real one and the dry-run.
 """
+import collections
 import functools
 import logging
+import queue
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
 
 import ldap3
 
+from ldap_sync import logger
+from ldap_sync.concepts import types
 from ldap_sync.concepts.action import (
     Action,
     AddAction,
@@ -22,20 +28,24 @@ from ldap_sync.concepts.action import (
 
 
 @functools.singledispatch
-def execute_real(action: Action, connection: ldap3.Connection) -> None:
+def execute_real(action: Action, connection: ldap3.Connection) -> bool:
+    """Execute `action` using `connection`.
+
+    :returns: whether the operation has been successful
+    """
     raise TypeError(f"No dispatch defined for action of type {type(action).__name__}")
 
 
 @execute_real.register
-def _(action: AddAction, connection: ldap3.Connection) -> None:
+def _(action: AddAction, connection: ldap3.Connection) -> bool:
     action.logger.debug("Executing %s for %s", type(action).__name__, action.record_dn)
     action.logger.debug("Attributes used: %s", action.nonempty_attrs)
     connection.add(action.record_dn, attributes=action.nonempty_attrs)
-    debug_whether_success(action.logger, connection)
+    return debug_whether_success(action.logger, connection)
 
 
 @execute_real.register
-def _(action: ModifyAction, connection: ldap3.Connection) -> None:
+def _(action: ModifyAction, connection: ldap3.Connection) -> bool:
     action.logger.debug(
         "Executing %s for %s (%s)",
         type(action).__name__,
@@ -50,24 +60,96 @@ def _(action: ModifyAction, connection: ldap3.Connection) -> None:
             for attr, new_value in action.modifications.items()
         },
     )
-    debug_whether_success(action.logger, connection)
+    return debug_whether_success(action.logger, connection)
 
 
 @execute_real.register
-def _(action: DeleteAction, connection: ldap3.Connection) -> None:
+def _(action: DeleteAction, connection: ldap3.Connection) -> bool:
     action.logger.debug("Executing %s for %s", type(action).__name__, action.record_dn)
     connection.delete(action.record_dn)
-    debug_whether_success(action.logger, connection)
+    return debug_whether_success(action.logger, connection)
 
 
 @execute_real.register
-def _(action: IdleAction, connection: ldap3.Connection) -> None:
-    pass
+def _(action: IdleAction, connection: ldap3.Connection) -> bool:
+    return True
 
 
-def debug_whether_success(logger: logging.Logger, connection: ldap3.Connection) -> None:
+def debug_whether_success(logger: logging.Logger, connection: ldap3.Connection) -> bool:
     """Communicate whether the last operation on `connection` has been successful."""
     if connection.result["result"]:
         logger.warning("Operation unsuccessful: %s", connection.result)
-    else:
-        logger.debug("Operation successful")
+        return False
+    logger.debug("Operation successful")
+    return True
+
+
+class ExecutionResult(t.NamedTuple):
+    """The outcome of an action executed by :func:`execute_parallel`."""
+
+    action: Action
+    success: bool
+
+
+def execute_parallel(
+    actions: t.Iterable[Action], connections: t.Sequence[ldap3.Connection]
+) -> list[ExecutionResult]:
+    """Execute `actions`, using each of the bound `connections` concurrently.
+
+    Since every operation waits for the server's reply, the round-trip latency
+    dominates when executing many actions one after another.
+    Here, up to ``len(connections)`` operations are in flight at the same time.
+    Actions concerning the same DN are executed in the given order
+    on a single connection.
+
+    :param actions: the actions to execute. Instances of :class:`IdleAction` are skipped.
+    :param connections: the connections to use.  Each one is only used by one thread at a time.
+    :returns: the results of the executed actions
+    """
+    if not connections:
+        raise ValueError("At least one connection is required")
+
+    actions_by_dn: dict[types.DN, list[Action]] = collections.defaultdict(list)
+    for action in actions:
+        if not isinstance(action, IdleAction):
+            actions_by_dn[action.record_dn].append(action)
+
+    pool: queue.SimpleQueue[ldap3.Connection] = queue.SimpleQueue()
+    for connection in connections:
+        pool.put(connection)
+
+    def execute_for_dn(dn_actions: list[Action]) -> list[ExecutionResult]:
+        connection = pool.get()
+        try:
+            return [ExecutionResult(a, execute_real(a, connection)) for a in dn_actions]
+        finally:
+            pool.put(connection)
+
+    with ThreadPoolExecutor(
+        max_workers=len(connections), thread_name_prefix="ldap_sync"
+    ) as executor:
+        return [
+            result
+            for results in executor.map(execute_for_dn, actions_by_dn.values())
+            for result in results
+        ]
+
+
+def log_execution_summary(results: t.Iterable[ExecutionResult]) -> int:
+    """Log how many actions of each type succeeded and failed.
+
+    :returns: the number of failed actions
+    """
+    succeeded: collections.Counter[str] = collections.Counter()
+    failed: collections.Counter[str] = collections.Counter()
+    for action, success in results:
+        (succeeded if success else failed)[type(action).__name__] += 1
+
+    for action_type in sorted(succeeded | failed):
+        logger.info(
+            "%s: %s succeeded, %s failed",
+            action_type, succeeded[action_type], failed[action_type],
+        )
+    if failures := failed.total():
+        logger.warning("%s actions failed", failures)
+    return failures
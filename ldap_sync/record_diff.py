@@ -99,3 +99,18 @@ def bulk_diff_records(
             {r.dn: r for r in desired},
         )
     }
+
+
+def iter_diff_records(
+    current: typing.Iterable[record.Record], desired: typing.Iterable[record.Record]
+) -> typing.Iterator[action.Action]:
+    """Like :func:`bulk_diff_records`, but consuming `current` as a stream.
+
+    Only the desired records are kept in memory,
+    so `current` can be a lazily fetched search result.
+    """
+    desired_by_dn = {r.dn: r for r in desired}
+    for cur in current:
+        yield diff_records(cur, desired_by_dn.pop(cur.dn, None))
+    for des in desired_by_dn.values():
+        yield diff_records(None, des)
@@ -11,18 +11,25 @@ Most prominently:
 * :func:`fetch_db_users`
 * :func:`fetch_db_properties`
 * :func:`fetch_db_groups`
+* :func:`consume_db_changes`
 
 """
 import typing
+from datetime import timedelta
 from typing import NamedTuple
 
-from sqlalchemy import and_, func, select, join, literal
+from sqlalchemy import and_, or_, func, select, join, literal, delete
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import scoped_session, sessionmaker, joinedload, foreign, Session
 
 from pycroft.model import create_engine
+from pycroft.model.ldap_sync import LdapSyncJournal, LdapSyncState
 from pycroft.model.property import CurrentProperty
-from pycroft.model.session import set_scoped_session, session as global_session
+from pycroft.model.session import (
+    set_scoped_session,
+    session as global_session,
+    current_timestamp,
+)
 from pycroft.model.user import User, Group, Membership
 from .. import logger, conversion
 from ..concepts import types
@@ -43,7 +50,9 @@ class _UserProxyType(NamedTuple):
 
 
 def _fetch_db_users(
-    session: Session, required_property: str | None = None
+    session: Session,
+    required_property: str | None = None,
+    logins: typing.Collection[str] | None = None,
 ) -> list[_UserProxyType]:
     """Fetch users to be synced, plus whether ``ldap_login_enabled`` is set.
 
@@ -52,11 +61,13 @@ def _fetch_db_users(
 
     :param session: The SQLAlchemy session to use
     :param str required_property: the property required to export users
+    :param logins: if given, only fetch the users with these logins
 
     :returns: An iterable of ``(User, should_be_blocked)`` ResultProxies
         having the property ``required_property`` and a unix_account.
     """
-    _warn_users_without_accounts(session, required_property)
+    if logins is None:
+        _warn_users_without_accounts(session, required_property)
 
     # used for second join against CurrentProperty
     not_blocked_property = CurrentProperty.__table__.alias("ldap_login_enabled")
@@ -72,6 +83,7 @@ def _fetch_db_users(
             if required_property
             else literal(True),
             User.unix_account_id.is_not(None),
+            User.login.in_(logins) if logins is not None else literal(True),
         )
         # additional info:
         #  absence of `ldap_login_enabled` property → should_be_blocked
@@ -94,14 +106,16 @@ def fetch_db_users(
     session: Session,
     base_dn: types.DN,
     required_property: str | None = None,
+    logins: typing.Collection[str] | None = None,
 ) -> typing.Iterator[UserRecord]:
     """Fetch the users to be synced (in the form of :class:`UserRecords <UserRecord>`).
 
     :param session: the SQLAlchemy database session
     :param base_dn: the user base dn
     :param required_property: which property the users need to currently have in order to be synced
+    :param logins: if given, only fetch the users with these logins
     """
-    for res in _fetch_db_users(session, required_property=required_property):
+    for res in _fetch_db_users(session, required_property=required_property, logins=logins):
         yield conversion.db_user_to_record(res.User, base_dn, res.should_be_blocked)
 
 
@@ -144,16 +158,20 @@ class _GroupProxyType(NamedTuple):
     members: list[str]
 
 
-def _fetch_db_groups(session: Session) -> list[_GroupProxyType]:
+def _fetch_db_groups(
+    session: Session, names: typing.Collection[str] | None = None
+) -> list[_GroupProxyType]:
     """Fetch all groups together with all members
 
     :param session: The SQLAlchemy session to use
+    :param names: if given, only fetch the groups with these names
 
     :returns: An iterable of `(Group, members)` ResultProxies.
     """
     return typing.cast(
         list[_GroupProxyType],
         Group.q
+        .filter(Group.name.in_(names) if names is not None else literal(True))
         # uids of the members of the group
         .add_columns(
             func.coalesce(
@@ -173,14 +191,16 @@ def fetch_db_groups(
     session: Session,
     base_dn: types.DN,
     user_base_dn: types.DN,
+    names: typing.Collection[str] | None = None,
 ) -> typing.Iterator[GroupRecord]:
     """Fetch the groups to be synced (in the form of :class:`GroupRecords <GroupRecord>`).
 
     :param session: the SQLAlchemy database session
     :param base_dn: the group base dn
     :param user_base_dn: the base dn of users. Used to infer DNs of the group's members.
+    :param names: if given, only fetch the groups with these names
     """
-    for res in _fetch_db_groups(session):
+    for res in _fetch_db_groups(session, names=names):
         yield conversion.db_group_to_record(
             name=res.Group.name,
             members=res.members,
@@ -196,16 +216,22 @@ class _PropertyProxyType(NamedTuple):
     members: list[str]
 
 
-def _fetch_db_properties(session: Session) -> list[_PropertyProxyType]:
+def _fetch_db_properties(
+    session: Session, names: typing.Collection[str] | None = None
+) -> list[_PropertyProxyType]:
     """Fetch the groups who should be synced.
 
     Explicitly, this returns everything in :data:`EXPORTED_PROPERTIES` together with
     the current users having the respective property as members.
 
     :param session: The SQLAlchemy session to use
+    :param names: if given, only fetch the properties with these names
 
     :returns: An iterable of `(property_name, members)` ResultProxies.
     """
+    exported = EXPORTED_PROPERTIES if names is None else EXPORTED_PROPERTIES & set(names)
+    if not exported:
+        return []
     properties = session.execute(
         select(
             CurrentProperty.property_name.label("name"),
@@ -214,11 +240,11 @@ def _fetch_db_properties(session: Session) -> list[_PropertyProxyType]:
         .select_from(
             join(CurrentProperty, User, onclause=CurrentProperty.user_id == User.id)
         )
-        .where(CurrentProperty.property_name.in_(EXPORTED_PROPERTIES))
+        .where(CurrentProperty.property_name.in_(exported))
         .group_by(CurrentProperty.property_name)
     ).fetchall()
 
-    missing_properties = EXPORTED_PROPERTIES - {p.name for p in properties}
+    missing_properties = exported - {p.name for p in properties}
     # Return mutable copy instead of SQLAlchemy's immutable RowProxy
     return [_PropertyProxyType(p.name, p.members) for p in properties] + [
         _PropertyProxyType(p, []) for p in missing_properties
@@ -229,6 +255,7 @@ def fetch_db_properties(
     session: Session,
     base_dn: types.DN,
     user_base_dn: types.DN,
+    names: typing.Collection[str] | None = None,
 ) -> typing.Iterator[GroupRecord]:
     """Fetch the properties to be synced (in the form of :class:`GroupRecords <GroupRecord>`).
 
@@ -236,8 +263,9 @@ def fetch_db_properties(
     :param base_dn: the property base dn
     :param user_base_dn: the base dn of users. Used to infer DNs of the users who are currently
         carrying this property.
+    :param names: if given, only fetch the properties with these names
     """
-    for res in _fetch_db_properties(session):
+    for res in _fetch_db_properties(session, names=names):
         yield conversion.db_group_to_record(
             name=res.name,
             members=res.members,
@@ -246,6 +274,69 @@ def fetch_db_properties(
         )
 
 
+class DbChanges(NamedTuple):
+    """The entries which might have changed since the previous sync,
+    as returned by :func:`consume_db_changes`."""
+
+    users: set[str]
+    groups: set[str]
+    properties: set[str]
+
+
+#: How far the memberships considered by :func:`consume_db_changes` reach back
+#: before the high-water mark.  Memberships committed concurrently to the previous
+#: sync may not have been visible to it.
+MEMBERSHIP_BOUNDARY_OVERLAP = timedelta(minutes=5)
+
+
+def consume_db_changes(session: Session) -> DbChanges | None:
+    """Take all entries from the change journal and advance the high-water mark.
+
+    Besides the journal, which is filled by triggers (see :mod:`pycroft.model.ldap_sync`),
+    the groups with memberships which began or ended since the previous sync are
+    considered changed, because time passing does not trigger anything.
+
+    The changes are consumed as part of the session's transaction,
+    so they are only gone once the session is committed after a successful sync.
+
+    :param session: the SQLAlchemy database session
+    :returns: the logins and names of the changed entries, or ``None``
+        if there has not been a sync before.
+    """
+    now = session.scalar(select(current_timestamp()))
+    journal = session.execute(
+        delete(LdapSyncJournal).returning(LdapSyncJournal.kind, LdapSyncJournal.name)
+    ).all()
+    state = session.get(LdapSyncState, 1)
+    if state is None:
+        session.add(LdapSyncState(id=1, synced_until=now))
+        session.flush()
+        return None
+
+    since = state.synced_until - MEMBERSHIP_BOUNDARY_OVERLAP
+    begin = func.lower(Membership.active_during)
+    end = func.upper(Membership.active_during)
+    groups_with_boundaries = session.scalars(
+        select(Group.name).distinct().join(Membership).where(or_(
+            and_(begin > since, begin <= now),
+            and_(end > since, end <= now),
+        ))
+    )
+    state.synced_until = now
+    session.flush()
+
+    changes = DbChanges(users=set(), groups=set(groups_with_boundaries), properties=set())
+    for kind, name in journal:
+        match kind:
+            case "user":
+                changes.users.add(name)
+            case "group":
+                changes.groups.add(name)
+            case "property":
+                changes.properties.add(name)
+    return changes
+
+
 #: The properties of a user we export to LDAP.
 EXPORTED_PROPERTIES = frozenset(
     [
@@ -9,6 +9,8 @@ import ssl
 import typing
 
 import ldap3
+from ldap3.core.exceptions import LDAPOperationResult
+from ldap3.utils.conv import escape_filter_chars
 
 from .. import logger, conversion
 from ..concepts.record import UserRecord, GroupRecord
@@ -32,63 +34,138 @@ def establish_and_return_ldap_connection(config: SyncConfig) -> ldap3.Connection
     )
 
 
+#: The number of entries requested per page by :func:`_fetch_ldap_entries` (:rfc:`2696`)
+PAGE_SIZE = 500
+
+
 def _fetch_ldap_entries(
     connection: ldap3.Connection,
     base_dn: str,
     search_filter: str | None = None,
     attributes: str | typing.Collection[str] = ldap3.ALL_ATTRIBUTES,
-) -> list[LdapRecord]:
-    success = connection.search(
-        search_base=base_dn, search_filter=search_filter, attributes=attributes
+) -> typing.Iterator[LdapRecord]:
+    """Search for entries below `base_dn` using a paged search.
+
+    The entries are fetched lazily, one page after another,
+    so neither the client nor the server has to hold the whole result at once.
+    """
+    entries = connection.extend.standard.paged_search(
+        search_base=base_dn,
+        search_filter=search_filter,
+        attributes=attributes,
+        paged_size=PAGE_SIZE,
+        generator=True,
     )
-    if not success:
-        logger.warning("LDAP search not successful.  Result: %s", connection.result)
-        return []
+    try:
+        for entry in entries:
+            if entry.get("type") == "searchResEntry" and entry["dn"] != base_dn:
+                yield entry
+    except LDAPOperationResult as e:
+        logger.warning("LDAP search not successful.  Result: %s", e)
 
-    return [r for r in connection.response if r["dn"] != base_dn]
 
+#: How many values are put into a single search filter by :func:`_fetch_ldap_entries_by`
+FILTER_CHUNK_SIZE = 500
 
-def _fetch_ldap_users(connection: ldap3.Connection, base_dn: str) -> list[LdapRecord]:
-    return _fetch_ldap_entries(
+
+def _fetch_ldap_entries_by(
+    connection: ldap3.Connection,
+    base_dn: str,
+    search_filter: str,
+    attribute: str,
+    values: typing.Collection[str] | None,
+    attributes: str | typing.Collection[str] = ldap3.ALL_ATTRIBUTES,
+) -> typing.Iterator[LdapRecord]:
+    """Like :func:`_fetch_ldap_entries`, but restricted to the entries
+    where `attribute` is one of `values`.
+
+    If `values` is ``None``, all entries matching `search_filter` are fetched.
+    """
+    if values is None:
+        yield from _fetch_ldap_entries(connection, base_dn, search_filter, attributes)
+        return
+
+    values = sorted(values)
+    for i in range(0, len(values), FILTER_CHUNK_SIZE):
+        alternatives = "".join(
+            f"({attribute}={escape_filter_chars(v)})"
+            for v in values[i:i + FILTER_CHUNK_SIZE]
+        )
+        yield from _fetch_ldap_entries(
+            connection, base_dn, f"(&{search_filter}(|{alternatives}))", attributes
+        )
+
+
+def _fetch_ldap_users(
+    connection: ldap3.Connection,
+    base_dn: str,
+    logins: typing.Collection[str] | None = None,
+) -> typing.Iterator[LdapRecord]:
+    return _fetch_ldap_entries_by(
         connection,
         base_dn,
         search_filter="(objectclass=inetOrgPerson)",
-        attributes=[ldap3.ALL_ATTRIBUTES, "pwdAccountLockedTime"],
+        attribute="uid",
+        values=logins,
+        # includes the operational attribute `pwdAccountLockedTime`
+        attributes=sorted(UserRecord.get_synced_attributes()),
     )
 
 
 def fetch_ldap_users(
-    connection: ldap3.Connection, base_dn: str
+    connection: ldap3.Connection,
+    base_dn: str,
+    logins: typing.Collection[str] | None = None,
 ) -> typing.Iterator[UserRecord]:
-    for r in _fetch_ldap_users(connection, base_dn):
+    for r in _fetch_ldap_users(connection, base_dn, logins=logins):
         yield conversion.ldap_user_to_record(r)
 
 
-def _fetch_ldap_groups(connection: ldap3.Connection, base_dn: str) -> list[LdapRecord]:
-    return _fetch_ldap_entries(
-        connection, base_dn, search_filter="(objectclass=groupOfMembers)"
+def _fetch_ldap_groups(
+    connection: ldap3.Connection,
+    base_dn: str,
+    names: typing.Collection[str] | None = None,
+) -> typing.Iterator[LdapRecord]:
+    return _fetch_ldap_entries_by(
+        connection,
+        base_dn,
+        search_filter="(objectclass=groupOfMembers)",
+        attribute="cn",
+        values=names,
+        attributes=sorted(GroupRecord.get_synced_attributes()),
     )
 
 
 def fetch_ldap_groups(
-    connection: ldap3.Connection, base_dn: str
+    connection: ldap3.Connection,
+    base_dn: str,
+    names: typing.Collection[str] | None = None,
 ) -> typing.Iterator[GroupRecord]:
-    for r in _fetch_ldap_groups(connection, base_dn):
+    for r in _fetch_ldap_groups(connection, base_dn, names=names):
         yield conversion.ldap_group_to_record(r)
 
 
 def _fetch_ldap_properties(
-    connection: ldap3.Connection, base_dn: str
-) -> list[LdapRecord]:
-    return _fetch_ldap_entries(
-        connection, base_dn, search_filter="(objectclass=groupOfMembers)"
+    connection: ldap3.Connection,
+    base_dn: str,
+    names: typing.Collection[str] | None = None,
+) -> typing.Iterator[LdapRecord]:
+    return _fetch_ldap_entries_by(
+        connection,
+        base_dn,
+        search_filter="(objectclass=groupOfMembers)",
+        attribute="cn",
+        values=names,
+        attributes=sorted(GroupRecord.get_synced_attributes()),
     )
 
 
 def fetch_ldap_properties(
-    connection: ldap3.Connection, base_dn: str
+    connection: ldap3.Connection,
+    base_dn: str,
+    names: typing.Collection[str] | None = None,
 ) -> typing.Iterator[GroupRecord]:
-    for r in _fetch_ldap_properties(connection, base_dn):
+    for r in _fetch_ldap_properties(connection, base_dn, names=names):
         yield conversion.ldap_group_to_record(r)
 
 
@@ -22,11 +22,13 @@ from .babel import (
     set_translation_lookup,
 )
 from .formatting import identity, format_param
-from .message import Message, SimpleMessage, NumericalMessage
+from .message import Message, SimpleMessage, NumericalMessage, localize_json
 from .options import Options
 
 
 def localized(json_string: str, options: Options | None = None) -> str:
+    if options is None:
+        return localize_json(json_string)
     return Message.from_json(json_string).localize(options)
 
 
@@ -36,11 +36,20 @@ def get_translations() -> Translations:
 def set_locale_lookup(lookup_func: typing.Callable[[], Locale]) -> None:
     global _locale_lookup
     _locale_lookup = lookup_func
+    _clear_message_caches()
 
 
 def set_translation_lookup(lookup_func: typing.Callable[[], Translations]) -> None:
     global _translations_lookup
     _translations_lookup = lookup_func
+    _clear_message_caches()
+
+
+def _clear_message_caches() -> None:
+    # the localized messages are cached per locale only
+    from .message import clear_caches  # circular import
+
+    clear_caches()
 
 
 def gettext(message: str) -> str:
@@ -8,15 +8,16 @@ pycroft.helpers.i18n.message
 from __future__ import annotations
 
 import abc
+import copy
 import json
 import traceback
 import typing
 import typing as t
-from functools import partial
+from functools import lru_cache, partial
 
 import jsonschema
 
-from .babel import gettext, dgettext, dngettext, ngettext
+from .babel import gettext, dgettext, dngettext, ngettext, get_locale
 from .formatting import format_param
 from .options import Options
 from .serde import Serializable, serialize_param, deserialize_param
@@ -27,43 +28,8 @@ class Message(abc.ABC):
 
     @classmethod
     def from_json(cls, json_string: str) -> Message:
-        try:
-            float(json_string)
-        except ValueError:
-            pass
-        else:
-            return SimpleMessage(json_string, domain=None)
-        try:
-            obj = json.loads(json_string)
-        except ValueError:
-            return ErroneousMessage(json_string)
-        try:
-            jsonschema.validate(obj, schema)
-        except jsonschema.ValidationError as e:
-            return ErroneousMessage(
-                "Message validation failed: {} for " "message {}".format(e, json_string)
-            )
-        args = obj.get("args", ())
-        kwargs = obj.get("kwargs", {})
-        try:
-            args = tuple(deserialize_param(a) for a in args)
-            kwargs = {k: deserialize_param(v) for k, v in kwargs.items()}
-        except (TypeError, ValueError) as e:
-            error = "".join(traceback.format_exception_only(type(e), e))
-            return ErroneousMessage(
-                "Parameter deserialization error: {} in "
-                "message: {}".format(error, json_string)
-            )
-        m: Message
-        if "plural" in obj:
-            m = NumericalMessage(
-                obj["singular"], obj["plural"], obj["n"], obj.get("domain")
-            )
-        else:
-            m = SimpleMessage(obj["message"], obj.get("domain"))
-        m.args = args
-        m.kwargs = kwargs
-        return m
+        # parsed messages are shared by the cache, but may be changed by `format`
+        return copy.copy(_parse_json(json_string))
 
     def __init__(self, domain: str | None = None):
         self.domain: str | None = domain
@@ -221,3 +187,71 @@ schema = {
         },
     },
 }
+
+#: `jsonschema.validate` would check the schema and build a validator on every call
+_validator_class = jsonschema.validators.validator_for(schema)
+_validator_class.check_schema(schema)
+_validator = _validator_class(schema)
+
+
+#: the number of parsed messages and localized strings kept by the caches
+CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_json(json_string: str) -> Message:
+    try:
+        float(json_string)
+    except ValueError:
+        pass
+    else:
+        return SimpleMessage(json_string, domain=None)
+    try:
+        obj = json.loads(json_string)
+    except ValueError:
+        return ErroneousMessage(json_string)
+    if (error := jsonschema.exceptions.best_match(_validator.iter_errors(obj))) is not None:
+        return ErroneousMessage(
+            "Message validation failed: {} for " "message {}".format(error, json_string)
+        )
+    args = obj.get("args", ())
+    kwargs = obj.get("kwargs", {})
+    try:
+        args = tuple(deserialize_param(a) for a in args)
+        kwargs = {k: deserialize_param(v) for k, v in kwargs.items()}
+    except (TypeError, ValueError) as e:
+        error = "".join(traceback.format_exception_only(type(e), e))
+        return ErroneousMessage(
+            "Parameter deserialization error: {} in "
+            "message: {}".format(error, json_string)
+        )
+    m: Message
+    if "plural" in obj:
+        m = NumericalMessage(
+            obj["singular"], obj["plural"], obj["n"], obj.get("domain")
+        )
+    else:
+        m = SimpleMessage(obj["message"], obj.get("domain"))
+    m.args = args
+    m.kwargs = kwargs
+    return m
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _localize_json(json_string: str, locale: str) -> str:
+    # `locale` is only part of the cache key, the translations are looked up
+    return _parse_json(json_string).localize()
+
+
+def localize_json(json_string: str) -> str:
+    """Localize a serialized message with the default options.
+
+    The result is cached per locale.
+    """
+    return _localize_json(json_string, str(get_locale()))
+
+
+def clear_caches() -> None:
+    """Forget the parsed and localized messages, e.g. after the translations changed"""
+    _parse_json.cache_clear()
+    _localize_json.cache_clear()
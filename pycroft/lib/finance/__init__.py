@@ -23,6 +23,11 @@ from pycroft.model.finance import (
     AccountType,
 )
 from pycroft.model.user import User
+from .account_balance import (
+    BalanceMismatch,
+    find_balance_mismatches,
+    repair_balance_mismatches,
+)
 from .matching import match_activities
 from .membership_fee import (
     get_membership_fee_for_date,
@@ -36,6 +41,8 @@ from .payment_in_default import (
     end_payment_in_default_memberships,
     get_last_payment_in_default_membership,
     get_negative_members,
+    select_negative_members,
+    select_in_default_days,
     get_users_with_payment_in_default,
     take_actions_for_payment_in_default_users,
     get_pid_csv,
@@ -55,6 +62,8 @@ from .transaction_crud import (
     transaction_confirm_all,
     build_transactions_query,
     process_transactions,
+    find_known_activities,
+    insert_activities,
     ImportedTransactions,
 )
 
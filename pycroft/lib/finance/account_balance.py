@@ -0,0 +1,78 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""
+pycroft.lib.finance.account_balance
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Consistency checks for the trigger-maintained :class:`AccountBalance` table.
+"""
+import typing as t
+from decimal import Decimal
+
+from sqlalchemy import Select, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from pycroft.model.finance import AccountBalance, Split
+from pycroft.model.types import Money
+
+
+class BalanceMismatch(t.NamedTuple):
+    account_id: int
+    #: the balance recorded in `account_balance`
+    recorded: Decimal
+    #: the sum of the splits of the account
+    actual: Decimal
+
+
+def select_balance_mismatches() -> Select[tuple[int, Decimal, Decimal]]:
+    """Select the accounts whose recorded balance differs from the sum of their splits."""
+    actual = (
+        select(Split.account_id, func.sum(Split.amount).label("balance"))
+        .group_by(Split.account_id)
+        .subquery("actual")
+    )
+    account_id = func.coalesce(AccountBalance.account_id, actual.c.account_id)
+    # `Money` columns are mapped as `int`, but return `Decimal`s
+    recorded_balance = type_coerce(func.coalesce(AccountBalance.balance, 0), Money)
+    actual_balance = type_coerce(func.coalesce(actual.c.balance, 0), Money)
+    return (
+        select(
+            account_id.label("account_id"),
+            recorded_balance.label("recorded"),
+            actual_balance.label("actual"),
+        )
+        .select_from(AccountBalance)
+        .join(actual, actual.c.account_id == AccountBalance.account_id, full=True)
+        .where(recorded_balance != actual_balance)
+        .order_by(account_id)
+    )
+
+
+def find_balance_mismatches(session: Session) -> list[BalanceMismatch]:
+    """Compare the recorded balance of every account to the sum of its splits.
+
+    This is a full scan of `split`, so it is meant to be run occasionally,
+    e.g. after manual changes to the database.
+
+    :returns: the accounts whose recorded balance is wrong
+    """
+    return [BalanceMismatch(*row) for row in session.execute(select_balance_mismatches())]
+
+
+def repair_balance_mismatches(session: Session) -> list[BalanceMismatch]:
+    """Correct the recorded balances which differ from the sum of the splits.
+
+    :returns: the accounts whose recorded balance was wrong
+    """
+    mismatches = find_balance_mismatches(session)
+    if mismatches:
+        stmt = insert(AccountBalance).values(
+            [{"account_id": m.account_id, "balance": m.actual} for m in mismatches]
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[AccountBalance.account_id],
+            set_={"balance": stmt.excluded.balance},
+        ))
+    return mismatches
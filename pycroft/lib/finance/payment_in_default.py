@@ -2,16 +2,15 @@
 #  This file is part of the Pycroft project and licensed under the terms of
 #  the Apache License, Version 2.0. See the LICENSE file for details
 import csv
-import operator
 import typing as t
 from datetime import timedelta
 from io import StringIO
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, between, exists, func, select, true
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.orm.exc import NoResultFound
 
-from pycroft import config
+from pycroft import config, Config
 from pycroft.helpers.interval import closed, starting_from
 from pycroft.lib.logging import log_user_event
 from pycroft.lib.membership import make_member_of, remove_member_of
@@ -19,6 +18,8 @@ from pycroft.model import session
 from pycroft.model.finance import (
     Account,
     MembershipFee,
+    Split,
+    Transaction,
 )
 from pycroft.model.property import CurrentProperty
 from pycroft.model.session import with_transaction, utcnow
@@ -64,67 +65,166 @@ def get_last_payment_in_default_membership(
     return membership
 
 
-def get_negative_members() -> t.Sequence[User]:
-    users = session.session.scalars(
+def select_negative_members() -> Select[tuple[User]]:
+    """Select the users who have to pay the membership fee and have a positive balance."""
+    return (
         select(User)
         .join(User.current_properties)
         .filter(CurrentProperty.property_name == "membership_fee")
         .join(Account)
         .filter(Account.balance > 0)
-    ).all()
+    )
+
+
+def get_negative_members() -> t.Sequence[User]:
+    users = session.session.scalars(select_negative_members()).all()
 
     return users
 
 
+def select_in_default_days(
+    account_ids: Select[tuple[int]],
+) -> Select[tuple[int, int]]:
+    """Select how many days the given accounts have been in default.
+
+    This is the set-based equivalent of :attr:`Account.in_default_days`:
+    An account is in default since the first split after which
+    the balance stayed positive until today.
+    Accounts which are not in default are omitted.
+
+    :param account_ids: a statement selecting the ids of the accounts to consider
+    :returns: a statement selecting ``account_id`` and ``in_default_days``
+    """
+    running = (
+        select(
+            Split.id.label("split_id"),
+            Split.account_id,
+            Transaction.valid_on,
+            func.sum(Split.amount)
+            .over(
+                partition_by=Split.account_id,
+                order_by=(Transaction.valid_on, Split.id),
+                rows=(None, 0),
+            )
+            .label("balance"),
+        )
+        .join(Transaction)
+        .where(Split.account_id.in_(account_ids.scalar_subquery()))
+        .cte("running_balance")
+    )
+    # whether the balance stays positive from this split on
+    overdue = (
+        select(
+            running.c.account_id,
+            running.c.valid_on,
+            func.bool_and(running.c.balance > 0)
+            .over(
+                partition_by=running.c.account_id,
+                order_by=(running.c.valid_on.desc(), running.c.split_id.desc()),
+                rows=(None, 0),
+            )
+            .label("overdue"),
+        )
+        .subquery("overdue")
+    )
+    return (
+        select(
+            overdue.c.account_id,
+            (func.current_date() - func.min(overdue.c.valid_on)).label("in_default_days"),
+        )
+        .where(overdue.c.overdue)
+        .group_by(overdue.c.account_id)
+    )
+
+
 def get_users_with_payment_in_default(session: Session) -> tuple[set[User], set[User]]:
     """Determine which users should be blocked and whose membership should be terminated.
 
+    Everything needed is fetched by a single query, see :func:`select_in_default_days`.
+
     :returns: which users should be added to the ``payment_in_default`` group (``[0]``)
         and which ones should get their membership terminated (``[1]``).
     """
-    # Add memberships and end "member" membership if threshold met
-    users = get_negative_members()
+    ts_now = func.current_timestamp()
+    in_default = select_in_default_days(
+        select_negative_members().with_only_columns(User.account_id)
+    ).subquery("in_default")
+
+    # the fee which was due when the user went into default
+    fee_date = ts_now - func.make_interval(0, 0, 0, in_default.c.in_default_days)
+    fee = (
+        select(MembershipFee.payment_deadline, MembershipFee.payment_deadline_final)
+        .where(between(fee_date, MembershipFee.begins_on, MembershipFee.ends_on))
+        .limit(1)
+        .lateral("fee")
+    )
+    last_applied_fee = (
+        select(MembershipFee.payment_deadline, MembershipFee.payment_deadline_final)
+        .where(MembershipFee.ends_on <= ts_now)
+        .order_by(MembershipFee.ends_on.desc())
+        .limit(1)
+        .subquery("last_applied_fee")
+    )
+    last_pid_membership_end = (
+        select(func.upper(Membership.active_during))
+        .where(Membership.user_id == User.id)
+        .where(Membership.group_id == Config.payment_in_default_group_id)
+        .order_by(Membership.active_during.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    # aliased, because the outer query joins `current_property` already
+    pid_property = aliased(CurrentProperty)
+    has_pid_property = (
+        exists()
+        .where(
+            pid_property.user_id == User.id,
+            pid_property.property_name == "payment_in_default",
+            ~pid_property.denied,
+        )
+        .correlate(User)
+    )
+
+    rows = session.execute(
+        select_negative_members()
+        .add_columns(
+            in_default.c.in_default_days,
+            func.coalesce(fee.c.payment_deadline, last_applied_fee.c.payment_deadline),
+            func.coalesce(
+                fee.c.payment_deadline_final, last_applied_fee.c.payment_deadline_final
+            ),
+            last_pid_membership_end,
+            has_pid_property,
+        )
+        .join(in_default, in_default.c.account_id == User.account_id)
+        .join(fee, true(), isouter=True)
+        .join(last_applied_fee, true(), isouter=True)
+        .join(Config, true())
+    ).all()
 
     users_pid_membership: set[User] = set()
     users_membership_terminated: set[User] = set()
 
-    ts_now = utcnow()
-    for user in users:
-        in_default_days = user.account.in_default_days
-
-        fee: MembershipFee | None
-        try:
-            fee_date = ts_now - timedelta(days=in_default_days)
-            fee = get_membership_fee_for_date(fee_date)
-        except NoResultFound:
-            fee = get_last_applied_membership_fee()
-
-        if fee is None:
+    now = utcnow()
+    for user, in_default_days, deadline, deadline_final, pid_end, has_pid in rows:
+        if deadline is None or deadline_final is None:
             raise ValueError("No fee found")
 
-        if in_default_days >= fee.payment_deadline.days:
+        if in_default_days >= deadline.days:
             # Skip user if the payment in default group membership was terminated within the last week
-            last_pid_membership = get_last_payment_in_default_membership(session, user)
+            if pid_end is not None and pid_end >= now - timedelta(days=7):
+                continue
 
-            if last_pid_membership is not None:
-                end = last_pid_membership.active_during.end
-                if end is not None and end >= ts_now - timedelta(days=7):
-                    continue
-
-            if not user.has_property("payment_in_default"):
+            if not has_pid:
                 # Add user to new payment in default list
                 users_pid_membership.add(user)
 
-        if in_default_days >= fee.payment_deadline_final.days:
+        if in_default_days >= deadline_final.days:
             # Add user to terminated memberships
             users_membership_terminated.add(user)
 
     users_membership_terminated.difference_update(users_pid_membership)
 
-    _bal = operator.attrgetter("account.balance")
-    users_pid_membership = set(sorted(users_pid_membership, key=_bal))
-    users_membership_terminated = set(sorted(users_membership_terminated, key=_bal))
-
     return users_pid_membership, users_membership_terminated
 
 
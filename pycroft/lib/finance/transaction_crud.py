@@ -4,11 +4,22 @@
 import typing as t
 from datetime import timedelta, date
 from decimal import Decimal
+from itertools import batched
 
 from mt940.models import Transaction as MT940Transaction
 from fints.models import Transaction as FinTSTransaction
-from sqlalchemy import select, func, Select, text
-from sqlalchemy.orm import contains_eager
+from sqlalchemy import (
+    Integer,
+    Select,
+    column,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    values,
+)
+from sqlalchemy.orm import Session, contains_eager
 
 from pycroft.helpers.i18n import deferred_gettext
 from pycroft.lib.logging import log_event
@@ -23,7 +34,6 @@ from pycroft.model.finance import (
 )
 from pycroft.model.session import with_transaction
 from pycroft.model.user import User
-from pycroft.model.utils import row_exists
 
 
 @with_transaction
@@ -182,21 +192,48 @@ def build_transactions_query(
     return stmt
 
 
-def _similar_activity_stmt(activity: BankAccountActivity) -> Select:
-    return (
-        select()
-        .select_from(BankAccountActivity)
-        .filter_by(
-            bank_account_id=activity.bank_account_id,
-            amount=activity.amount,
-            reference=activity.reference,
-            other_account_number=activity.other_account_number,
-            other_routing_number=activity.other_routing_number,
-            other_name=activity.other_name,
-            posted_on=activity.posted_on,
-            valid_on=activity.valid_on,
+#: The columns identifying a bank account activity.
+#: An incoming activity agreeing with an existing one in all of them is not imported again.
+_IDENTIFYING_COLUMNS = (
+    BankAccountActivity.bank_account_id,
+    BankAccountActivity.amount,
+    BankAccountActivity.reference,
+    BankAccountActivity.other_account_number,
+    BankAccountActivity.other_routing_number,
+    BankAccountActivity.other_name,
+    BankAccountActivity.posted_on,
+    BankAccountActivity.valid_on,
+)
+
+#: The number of activities which are checked for duplicates by a single query
+IMPORT_BATCH_SIZE = 1000
+
+
+def find_known_activities(
+    session: Session, activities: t.Sequence[BankAccountActivity]
+) -> set[int]:
+    """Find the activities which have already been imported.
+
+    All activities are checked by a single query.
+
+    :returns: the indices of the activities for which an activity
+        with the same identifying columns exists
+    """
+    if not activities:
+        return set()
+    incoming = values(
+        column("idx", Integer),
+        *(column(c.key, c.type) for c in _IDENTIFYING_COLUMNS),
+        name="incoming",
+    ).data([
+        (idx, *(getattr(activity, c.key) for c in _IDENTIFYING_COLUMNS))
+        for idx, activity in enumerate(activities)
+    ])
+    return set(session.scalars(
+        select(incoming.c.idx).where(
+            exists().where(*(c == incoming.c[c.key] for c in _IDENTIFYING_COLUMNS))
         )
-    )
+    ))
 
 
 class ImportedTransactions(t.NamedTuple):
@@ -210,6 +247,9 @@ def process_transactions(
     statement: t.Iterable[MT940Transaction | FinTSTransaction],
 ) -> ImportedTransactions:
     imported = ImportedTransactions([], [], [])
+    imported_at = session.utcnow()
+    today = date.today()
+    candidates: list[BankAccountActivity] = []
 
     for transaction in statement:
         iban: str = transaction.data.get("applicant_iban") or ""
@@ -229,15 +269,35 @@ def process_transactions(
             other_account_number=iban,
             other_routing_number=bic,
             other_name=other_name,
-            imported_at=session.utcnow(),
+            imported_at=imported_at,
             posted_on=transaction.data["guessed_entry_date"],
             valid_on=transaction.data["date"],
         )
-        if new_activity.posted_on >= date.today():
+        if new_activity.posted_on >= today:
             imported.doubtful.append(new_activity)
-        elif not row_exists(session.session, _similar_activity_stmt(new_activity)):
-            imported.new.append(new_activity)
         else:
-            imported.old.append(new_activity)
+            candidates.append(new_activity)
+
+    for batch in batched(candidates, IMPORT_BATCH_SIZE):
+        known = find_known_activities(session.session, batch)
+        for idx, activity in enumerate(batch):
+            (imported.old if idx in known else imported.new).append(activity)
 
     return imported
+
+
+def insert_activities(
+    session: Session, activities: t.Sequence[BankAccountActivity]
+) -> None:
+    """Insert new activities (e.g. :attr:`ImportedTransactions.new`) in bulk.
+
+    In contrast to adding them to the session, the activities are inserted
+    by multi-row ``INSERT`` statements.  The given objects stay transient.
+    """
+    if not activities:
+        return
+    columns = [*(c.key for c in _IDENTIFYING_COLUMNS), "imported_at"]
+    session.execute(
+        insert(BankAccountActivity),
+        [{c: getattr(activity, c) for c in columns} for activity in activities],
+    )
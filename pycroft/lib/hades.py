@@ -0,0 +1,81 @@
+"""
+pycroft.lib.hades
+~~~~~~~~~~~~~~~~~
+
+Publishing the Hades views as tables which Hades can sync incrementally,
+see the `hades_*` tables in :mod:`pycroft.model.hades`.
+"""
+import typing as t
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import BigInteger, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from pycroft.model.hades import hades_change, hades_sync_state
+
+#: how long the changes of a version are kept for clients to catch up
+HADES_CHANGE_RETENTION = timedelta(days=1)
+
+
+def refresh_hades_tables(session: Session) -> int:
+    """Apply the changes since the last refresh to the materialized Hades tables.
+
+    Only the rows of the MACs marked as dirty are compared to the views,
+    unless a change affecting many MACs (e.g. to a VLAN) requires a full refresh.
+    If anything changed, a new version is created and announced
+    on the ``hades_change`` channel via ``NOTIFY``.
+
+    :returns: the current version
+    """
+    return t.cast(int, session.scalar(select(func.hades_refresh(type_=BigInteger))))
+
+
+class HadesChanges(t.NamedTuple):
+    #: the current version
+    version: int
+    #: the keys of the changed rows by view name, or `None` if the changes
+    #: since the requested version have been pruned, so a full sync is necessary
+    changes: dict[str, set[str]] | None
+
+
+def get_hades_changes(session: Session, since: int) -> HadesChanges:
+    """Collect the changes to the materialized Hades tables since version `since`.
+
+    :param since: the version the client has synced up to
+    """
+    version, pruned_version = session.execute(
+        select(hades_sync_state.c.version, hades_sync_state.c.pruned_version)
+    ).one()
+    if since < pruned_version:
+        return HadesChanges(version, None)
+    changes: dict[str, set[str]] = defaultdict(set)
+    for table_name, key in session.execute(
+        select(hades_change.c.table_name, hades_change.c.key)
+        .where(hades_change.c.version > since)
+    ):
+        changes[table_name].add(key)
+    return HadesChanges(version, dict(changes))
+
+
+def prune_hades_changes(
+    session: Session, retention: timedelta = HADES_CHANGE_RETENTION
+) -> int:
+    """Delete the recorded changes older than `retention`.
+
+    Clients which synced before the pruned versions have to do a full sync.
+
+    :returns: the number of deleted changes
+    """
+    versions = session.scalars(
+        delete(hades_change)
+        .where(hades_change.c.changed_at < func.current_timestamp() - retention)
+        .returning(hades_change.c.version)
+    ).all()
+    if versions:
+        session.execute(
+            update(hades_sync_state).values(
+                pruned_version=func.greatest(hades_sync_state.c.pruned_version, max(versions))
+            )
+        )
+    return len(versions)
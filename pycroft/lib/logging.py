@@ -5,14 +5,32 @@
 pycroft.lib.logging
 ~~~~~~~~~~~~~~~~~~~
 """
+from __future__ import annotations
+
 import typing as t
 from datetime import datetime
 
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    String,
+    Subquery,
+    Table,
+    false,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
 from pycroft.model import session
 from pycroft.model.facilities import Room
 from pycroft.model.logging import UserLogEntry, RoomLogEntry, LogEntry, \
     TaskLogEntry
-from pycroft.model.task import Task
+from pycroft.model.task import Task, UserTask
 from pycroft.model.user import User
 
 
@@ -105,3 +123,173 @@ def log_room_event(
     """
     return _create_log_entry(RoomLogEntry, message, author, created_at,
                              room=room)
+
+
+LogKind = t.Literal["user", "room", "task"]
+LOG_KINDS: tuple[LogKind, ...] = t.get_args(LogKind)
+
+
+class LogCursor(t.NamedTuple):
+    """The position of the last entry of a :func:`fetch_log_timeline` page."""
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        return f"{self.created_at.isoformat()}_{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> LogCursor:
+        """:raises ValueError: if `value` is not an encoded cursor"""
+        created_at, _, id_ = value.rpartition("_")
+        return cls(datetime.fromisoformat(created_at), int(id_))
+
+
+class TimelineEntry(t.NamedTuple):
+    id: int
+    created_at: datetime
+    type: LogKind
+    message: str
+    author_id: int
+    author_name: str
+
+
+class LogTimelinePage(t.NamedTuple):
+    entries: list[TimelineEntry]
+    #: pass as `after` to fetch the next page; ``None`` if there are no more entries
+    cursor: LogCursor | None
+
+
+_log_entry = t.cast(Table, LogEntry.__table__)
+
+
+def _select_log_entries(
+    kind: LogKind, table: Table, *where: ColumnElement[bool]
+) -> Select[tuple[int, datetime, str, str, int]]:
+    return (
+        select(
+            _log_entry.c.id,
+            _log_entry.c.created_at,
+            literal(kind, String).label("type"),
+            _log_entry.c.message,
+            _log_entry.c.author_id,
+        )
+        .join_from(_log_entry, table, table.c.id == _log_entry.c.id)
+        .where(*where)
+    )
+
+
+def _timeline(*parts: Select[tuple[int, datetime, str, str, int]]) -> Subquery:
+    if not parts:
+        parts = (_select_log_entries("user", t.cast(Table, UserLogEntry.__table__), false()),)
+    return union_all(*parts).subquery("timeline")
+
+
+def user_log_timeline(user: User, kinds: t.Container[LogKind] = LOG_KINDS) -> Subquery:
+    """The log entries concerning `user`: their own, their room's and their tasks'.
+
+    :param kinds: restrict the timeline to these kinds of entries
+    """
+    user_log_entry = t.cast(Table, UserLogEntry.__table__)
+    room_log_entry = t.cast(Table, RoomLogEntry.__table__)
+    task_log_entry = t.cast(Table, TaskLogEntry.__table__)
+    user_task = t.cast(Table, UserTask.__table__)
+
+    parts = []
+    if "user" in kinds:
+        parts.append(
+            _select_log_entries("user", user_log_entry, user_log_entry.c.user_id == user.id)
+        )
+    if "room" in kinds and user.room_id is not None:
+        parts.append(
+            _select_log_entries("room", room_log_entry, room_log_entry.c.room_id == user.room_id)
+        )
+    if "task" in kinds:
+        parts.append(
+            _select_log_entries("task", task_log_entry)
+            .join(user_task, user_task.c.id == task_log_entry.c.task_id)
+            .where(user_task.c.user_id == user.id)
+        )
+    return _timeline(*parts)
+
+
+def room_log_timeline(room: Room) -> Subquery:
+    """The log entries of `room`"""
+    room_log_entry = t.cast(Table, RoomLogEntry.__table__)
+    return _timeline(
+        _select_log_entries("room", room_log_entry, room_log_entry.c.room_id == room.id)
+    )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _select_timeline(timeline: Subquery, search: str | None) -> Select[tuple[t.Any, ...]]:
+    author = t.cast(Table, User.__table__)
+    stmt = select(
+        timeline.c.id,
+        timeline.c.created_at,
+        timeline.c.type,
+        timeline.c.message,
+        timeline.c.author_id,
+        author.c.name.label("author_name"),
+    ).join(author, author.c.id == timeline.c.author_id)
+    if search:
+        pattern = f"%{_escape_like(search)}%"
+        stmt = stmt.where(or_(
+            timeline.c.message.ilike(pattern, escape="\\"),
+            author.c.name.ilike(pattern, escape="\\"),
+        ))
+    return stmt
+
+
+def count_log_timeline(session: Session, timeline: Subquery, search: str | None = None) -> int:
+    """The number of entries of a timeline matching `search`"""
+    if not search:
+        return session.scalar(select(func.count()).select_from(timeline)) or 0
+    stmt = _select_timeline(timeline, search)
+    return session.scalar(select(func.count()).select_from(stmt.subquery())) or 0
+
+
+def fetch_log_timeline(
+    session: Session,
+    timeline: Subquery,
+    *,
+    limit: int | None,
+    after: LogCursor | None = None,
+    offset: int = 0,
+    ascending: bool = False,
+    search: str | None = None,
+) -> LogTimelinePage:
+    """Fetch a page of a timeline, newest entries first.
+
+    The entries are merged and sorted by the database, so only those on
+    the page are transferred.  Prefer passing the cursor of the previous
+    page as `after` over an `offset`: the cost of the latter grows with
+    the number of skipped entries.
+
+    :param session: the session
+    :param timeline: see :func:`user_log_timeline` and :func:`room_log_timeline`
+    :param limit: the maximum number of entries, ``None`` for all
+    :param after: continue after the page this cursor was returned with
+    :param offset: the number of entries to skip
+    :param ascending: list the oldest entries first
+    :param search: only include entries whose stored message or author name
+        contains this text (case-insensitively).  The stored message is not
+        localized; it consists of the message template and its arguments.
+    """
+    stmt = _select_timeline(timeline, search)
+    if after is not None:
+        key = tuple_(timeline.c.created_at, timeline.c.id)
+        position = tuple_(literal(after.created_at), literal(after.id))
+        stmt = stmt.where(key > position if ascending else key < position)
+    if ascending:
+        stmt = stmt.order_by(timeline.c.created_at.asc(), timeline.c.id.asc())
+    else:
+        stmt = stmt.order_by(timeline.c.created_at.desc(), timeline.c.id.desc())
+    entries = [
+        TimelineEntry(*row) for row in session.execute(stmt.offset(offset).limit(limit))
+    ]
+    last = entries[-1] if len(entries) == limit else None
+    return LogTimelinePage(entries, LogCursor(last.created_at, last.id) if last else None)
@@ -11,12 +11,15 @@ management.
 """
 from __future__ import annotations
 import typing as t
+from datetime import timedelta
 
-from sqlalchemy import and_, func, distinct, Result, nulls_last
+from sqlalchemy import and_, or_, func, distinct, Result, nulls_last, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.future import select
 from sqlalchemy.orm import aliased, Session
 from sqlalchemy.sql import Select
 from sqlalchemy.sql._typing import _TypedColumnClauseArgument, _ByArgument
+from sqlalchemy.types import Integer
 
 from pycroft import Config
 from pycroft.helpers import utc
@@ -25,10 +28,10 @@ from pycroft.helpers.interval import UnboundedInterval, IntervalSet, Interval, c
 from pycroft.helpers.utc import DateTimeTz
 from pycroft.lib.logging import log_user_event, log_event
 from pycroft.model import session
+from pycroft.model.property import CurrentPropertyRefresh
 from pycroft.model.session import with_transaction
 from pycroft.model.user import Membership, Property, PropertyGroup, User
 
-
 def known_properties() -> set[str]:
     """Return a set of all known properties, granted or denied."""
     return set(session.session.execute(
@@ -36,6 +39,71 @@ def known_properties() -> set[str]:
     ).scalars())
 
 
+def refresh_current_properties(
+    session: Session, user_ids: t.Iterable[int] | None = None
+) -> set[int]:
+    """Bring the `current_property` table up to date with the current time.
+
+    Changes to memberships and properties are applied to `current_property`
+    by triggers right away.  Memberships which begin or end as time passes,
+    however, are only taken into account once this function is called.
+
+    :param session: the session
+    :param user_ids: restrict the refresh to these users.
+        If ``None``, the properties of all users are re-evaluated.
+    :returns: the ids of the users whose properties changed
+    """
+    ids = list(user_ids) if user_ids is not None else None
+    return set(session.scalars(
+        select(func.refresh_current_properties(
+            bindparam("user_ids", ids, type_=ARRAY(Integer))
+        ))
+    ))
+
+
+def users_with_membership_boundaries(
+    session: Session, after: DateTimeTz, until: DateTimeTz
+) -> set[int]:
+    """Return the users having a membership which began or ended in ``(after, until]``."""
+    begin = func.lower(Membership.active_during)
+    end = func.upper(Membership.active_during)
+    return set(session.scalars(
+        select(Membership.user_id).distinct().where(or_(
+            and_(begin > after, begin <= until),
+            and_(end > after, end <= until),
+        ))
+    ))
+
+
+#: How far a refresh reaches back before the previous one.  Memberships committed
+#: concurrently to a refresh may not have been visible to it.
+BOUNDARY_REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+def refresh_properties_at_boundaries(session: Session) -> set[int]:
+    """Re-evaluate the properties of users whose memberships just began or ended.
+
+    Only the memberships with a boundary since the last call are considered,
+    so the cost depends on the number of affected users instead of the number of users.
+    The first call refreshes the properties of all users.
+
+    :returns: the ids of the users whose properties changed
+    """
+    now = t.cast(DateTimeTz, session.scalar(select(func.current_timestamp())))
+    mark = session.get(CurrentPropertyRefresh, 1)
+    if mark is None:
+        changed = refresh_current_properties(session)
+        session.add(CurrentPropertyRefresh(id=1, refreshed_until=now))
+    else:
+        affected = users_with_membership_boundaries(
+            session, mark.refreshed_until - BOUNDARY_REFRESH_OVERLAP, now
+        )
+        changed = refresh_current_properties(session, affected) if affected else set()
+        mark.refreshed_until = now
+    session.flush()
+    return changed
+
+
 @with_transaction
 def grant_property(group: PropertyGroup, name: str) -> Property:
     """
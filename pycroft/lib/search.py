@@ -2,15 +2,18 @@
 pycroft.lib.search
 ~~~~~~~~~~~~~~~~~~
 """
+from __future__ import annotations
+
 import re
+import typing as t
 
-from sqlalchemy import or_, func, cast, Text
-from sqlalchemy.orm import Query
+from sqlalchemy import ColumnElement, Float, Select, or_, and_, func, cast, Text, select, case
+from sqlalchemy.orm import Session
 
 from pycroft.helpers.net import mac_regex, ip_regex
 from pycroft.model.facilities import Room
 from pycroft.model.host import Host, Interface, IP
-from pycroft.model.user import User, Membership, PropertyGroup
+from pycroft.model.user import User, Membership
 
 
 def user_search_query(
@@ -24,8 +27,9 @@ def user_search_query(
     email: str | None = None,
     person_id: int | None = None,
     query: str | None = None,
-) -> Query:
-    result = User.q
+) -> Select[tuple[User]]:
+    # to-many relations are filtered with `EXISTS`, so that every user is selected once
+    result = select(User)
     if user_id is not None:
         result = result.filter(User.id == int(user_id))
     if email:
@@ -37,20 +41,15 @@ def user_search_query(
     if login:
         result = result.filter(User.login.ilike(f"%{login}%"))
     if mac:
-        result = result.join(User.hosts) \
-            .join(Host.interfaces) \
-            .filter(Interface.mac == mac)
+        result = result.filter(User.hosts.any(Host.interfaces.any(Interface.mac == mac)))
     if ip_address:
-        result = result.join(User.hosts) \
-            .join(Host.ips) \
-            .filter(IP.address == ip_address)
+        result = result.filter(User.hosts.any(Host.ips.any(IP.address == ip_address)))
 
     if property_group_id is not None:
-        result = result\
-            .join(Membership)\
-            .filter(Membership.active_during.contains(func.current_timestamp()))\
-            .join(PropertyGroup, PropertyGroup.id == Membership.group_id)\
-            .filter(PropertyGroup.id == property_group_id)
+        result = result.filter(User.memberships.any(and_(
+            Membership.active_during.contains(func.current_timestamp()),
+            Membership.group_id == property_group_id,
+        )))
 
     if building_id is not None:
         result = result.join(User.room) \
@@ -60,19 +59,124 @@ def user_search_query(
         query = query.strip()
 
         if re.match(mac_regex, query):
-            result = result.join(User.hosts) \
-                .join(Host.interfaces) \
-                .filter(Interface.mac == query)
+            result = result.filter(User.hosts.any(Host.interfaces.any(Interface.mac == query)))
         elif re.match(ip_regex, query):
-            result = result.join(User.hosts) \
-                .join(Host.ips) \
-                .filter(IP.address == query)
+            result = result.filter(User.hosts.any(Host.ips.any(IP.address == query)))
         else:
+            # `ILIKE` (instead of comparing `lower()`ed values)
+            # can use the trigram indexes on `name` and `login`
             result = result.filter(or_(
-                func.lower(User.name).like(func.lower(f"%{query}%")),
-                func.lower(User.login).like(func.lower(f"%{query}%")),
+                User.name.ilike(f"%{query}%"),
+                User.login.ilike(f"%{query}%"),
                 cast(User.id, Text).like(f"{query}%"),
                 cast(User.swdd_person_id, Text) == query,
                 cast(User.email, Text) == query,
             ))
     return result
+
+
+#: The number of users returned by :func:`ranked_user_search` unless requested otherwise
+RANKED_SEARCH_LIMIT = 10
+#: The trigram indexes only help for search terms of at least three characters.
+#: Shorter terms only match ids and logins exactly.
+RANKED_SEARCH_MIN_LENGTH = 3
+# ids are `integer` columns; larger numbers cannot match and would overflow
+_MAX_ID = 2**31 - 1
+
+
+class SearchCursor(t.NamedTuple):
+    """The position of the last result of a :func:`ranked_user_search`."""
+
+    score: float
+    user_id: int
+
+    def encode(self) -> str:
+        return f"{self.score!r}_{self.user_id}"
+
+    @classmethod
+    def decode(cls, value: str) -> SearchCursor:
+        """:raises ValueError: if `value` is not an encoded cursor"""
+        score, _, user_id = value.partition("_")
+        return cls(float(score), int(user_id))
+
+
+class RankedUser(t.NamedTuple):
+    user: User
+    #: between 0 and 1; 1 for an exact match of the id or login
+    score: float
+
+
+class RankedSearchResult(t.NamedTuple):
+    users: list[RankedUser]
+    #: pass as `after` to fetch the next results; ``None`` if there are none
+    cursor: SearchCursor | None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def ranked_user_search(
+    session: Session,
+    query: str,
+    *,
+    limit: int = RANKED_SEARCH_LIMIT,
+    after: SearchCursor | None = None,
+) -> RankedSearchResult:
+    """Search users by id, login, name and email address, best matches first.
+
+    In contrast to :func:`user_search_query`, every condition can be answered
+    using an index (the trigram indexes on ``name``, ``login`` and ``email``),
+    and at most `limit` users are fetched.  This makes it suitable
+    for searching as you type.
+
+    Users are ranked by the trigram word similarity of the search term
+    to their name, login and email address; ties are broken by id.
+
+    :param session: the session
+    :param query: the search term
+    :param limit: the maximum number of users to return
+    :param after: continue a previous search after this result
+    """
+    query = query.strip()
+    matches: list[ColumnElement[bool]] = [User.login == query]
+    scores: list[ColumnElement[t.Any]] = [case((User.login == query, 1.0))]
+
+    if query.isdigit() and int(query) <= _MAX_ID:
+        matches += [User.id == int(query), User.swdd_person_id == int(query)]
+        scores += [case((User.id == int(query), 1.0))]
+
+    if len(query) >= RANKED_SEARCH_MIN_LENGTH:
+        pattern = f"%{_escape_like(query)}%"
+        matches += [
+            User.name.ilike(pattern, escape="\\"),
+            User.login.ilike(pattern, escape="\\"),
+            User.email.ilike(pattern, escape="\\"),
+            # tolerate typos in names, i.e. `word_similarity(query, name)`
+            # is at least `pg_trgm.word_similarity_threshold`
+            User.name.op("%>")(query),
+        ]
+        scores += [
+            func.word_similarity(query, User.name),
+            func.word_similarity(query, User.login),
+            func.word_similarity(query, User.email),
+        ]
+
+    score = cast(func.coalesce(func.greatest(*scores), 0), Float)
+    stmt = select(User, score.label("score")).where(or_(*matches))
+    if after is not None:
+        stmt = stmt.where(or_(
+            score < after.score,
+            and_(score == after.score, User.id > after.user_id),
+        ))
+    rows = session.execute(
+        stmt.order_by(score.desc(), User.id).limit(limit + 1)
+    ).all()
+
+    users = [RankedUser(user, score) for user, score in rows[:limit]]
+    cursor = (
+        SearchCursor(users[-1].score, users[-1].user.id)
+        if len(rows) > limit
+        else None
+    )
+    return RankedSearchResult(users, cursor)
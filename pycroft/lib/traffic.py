@@ -8,15 +8,44 @@ pycroft.lib.traffic
 This module contains functions concerning network traffic
 
 """
+import io
+import re
 import typing as t
-from datetime import timedelta
+from datetime import date, datetime, time, timedelta, timezone
 
-from sqlalchemy import func, select, literal_column, delete, CursorResult
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Select,
+    cast,
+    delete,
+    func,
+    select,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import join, Session
+from sqlalchemy.sql._typing import _ColumnExpressionArgument
 
+from pycroft.helpers.interval import starting_from
+from pycroft.helpers.utc import DateTimeTz
+from pycroft.lib.membership import make_member_of, remove_member_of
 from pycroft.model import session
-from pycroft.model.traffic import TrafficVolume
-from pycroft.model.user import User
+from pycroft.model.traffic import (
+    TrafficDailyUser,
+    TrafficHistoryEntry,
+    TrafficMonthlyUser,
+    TrafficQuotaUser,
+    TrafficDirection,
+    TrafficTopRefresh,
+    TrafficTopUser,
+    TrafficVolume,
+    TRAFFIC_VOLUME_DEFAULT_PARTITION,
+    pmacct_traffic_staging,
+)
+from pycroft.model.user import Membership, PropertyGroup, User
 
 
 class UserTrafficInfo(t.Protocol):
@@ -25,30 +54,520 @@ class UserTrafficInfo(t.Protocol):
     traffic_for_days: int
 
 
+def select_users_with_highest_traffic(days: int, limit: int) -> Select[tuple[int, str, int]]:
+    """Select the `limit` users with the most traffic in the last `days` days."""
+    return (
+        select(
+            User.id,
+            User.name,
+            func.sum(TrafficVolume.amount).label("traffic_for_days"),
+        )
+        .select_from(join(User, TrafficVolume, TrafficVolume.user_id == User.id))
+        .where(User.id != 0)
+        .where(TrafficVolume.timestamp >= _utc_midnight_before(days - 1))
+        .group_by(User.id, User.name)
+        .order_by(literal_column("traffic_for_days").desc())
+        .limit(limit)
+    )
+
+
 def get_users_with_highest_traffic(days: int, limit: int) -> list[UserTrafficInfo]:
     return t.cast(
         list[UserTrafficInfo],
-        session.session.execute(
+        session.session.execute(select_users_with_highest_traffic(days, limit)).fetchall(),
+    )
+
+
+class TrafficLeaderboard(t.NamedTuple):
+    users: list[UserTrafficInfo]
+    #: the number of days the traffic has been summed up over
+    days: int | None
+    #: when the leaderboard was computed, or `None` if it never was
+    computed_at: datetime | None
+
+
+def refresh_traffic_leaderboard(session: Session, days: int, limit: int) -> None:
+    """Recompute the precomputed leaderboard read by :func:`get_traffic_leaderboard`."""
+    top = select_users_with_highest_traffic(days, limit).subquery()
+    session.execute(delete(TrafficTopUser))
+    session.execute(insert(TrafficTopUser).from_select(
+        ["rank", "user_id", "traffic"],
+        select(
+            func.row_number().over(order_by=(top.c.traffic_for_days.desc(), top.c.id)),
+            top.c.id,
+            top.c.traffic_for_days,
+        ),
+    ))
+    refresh = insert(TrafficTopRefresh).values(
+        id=1, days=days, computed_at=func.current_timestamp()
+    )
+    session.execute(refresh.on_conflict_do_update(
+        index_elements=[TrafficTopRefresh.id],
+        set_={"days": refresh.excluded.days, "computed_at": refresh.excluded.computed_at},
+    ))
+
+
+def get_traffic_leaderboard(session: Session) -> TrafficLeaderboard:
+    """The users with the highest traffic, as of the last leaderboard refresh."""
+    rows = session.execute(
+        select(
+            User.id,
+            User.name,
+            TrafficTopUser.traffic.label("traffic_for_days"),
+        )
+        .join(TrafficTopUser.user)
+        .order_by(TrafficTopUser.rank)
+    ).all()
+    refresh = session.get(TrafficTopRefresh, 1)
+    return TrafficLeaderboard(
+        users=t.cast(list[UserTrafficInfo], rows),
+        days=refresh.days if refresh else None,
+        computed_at=refresh.computed_at if refresh else None,
+    )
+
+
+#: how long traffic data is kept
+TRAFFIC_RETENTION = timedelta(weeks=1)
+#: for how many days ahead `traffic_volume` partitions are created
+TRAFFIC_PARTITIONS_AHEAD = 7
+
+_PARTITION_NAME = re.compile(rf"{TrafficVolume.__tablename__}_p(\d{{8}})")
+
+
+def traffic_partition_name(day: date) -> str:
+    """The name of the `traffic_volume` partition holding the traffic of `day`."""
+    return f"{TrafficVolume.__tablename__}_p{day:%Y%m%d}"
+
+
+def _utc_midnight(day: date) -> DateTimeTz:
+    return DateTimeTz(datetime.combine(day, time(), tzinfo=timezone.utc))
+
+
+def _utc_day(timestamp: _ColumnExpressionArgument[datetime]) -> ColumnElement[date]:
+    """The UTC day of `timestamp`, regardless of the session's time zone"""
+    return cast(func.timezone("UTC", timestamp), Date)
+
+
+def _utc_midnight_before(days: int) -> ColumnElement[datetime]:
+    """The beginning of the UTC day `days` days before the current one.
+
+    Comparing the raw timestamps with it is equivalent to comparing their
+    :func:`_utc_day`, but lets Postgres skip the partitions outside of the range.
+    """
+    day = _utc_day(func.current_timestamp()) - days
+    return func.timezone("UTC", cast(day, DateTime))
+
+
+def _daily_traffic(*where: ColumnElement[bool]) -> Select[tuple[int, date, int, int]]:
+    """Select the ingress and egress of the `traffic_volume` rows matching `where`
+    per user and UTC day, regardless of the session's time zone.
+    """
+    day = _utc_day(TrafficVolume.timestamp)
+    return (
+        select(
+            TrafficVolume.user_id,
+            day,
+            *(
+                func.coalesce(
+                    func.sum(TrafficVolume.amount).filter(TrafficVolume.type == type_), 0
+                )
+                for type_ in ("Ingress", "Egress")
+            ),
+        )
+        .where(*where)
+        .group_by(TrafficVolume.user_id, day)
+    )
+
+
+def _utc_today(session: Session) -> date:
+    return t.cast(
+        date,
+        session.scalar(select(_utc_day(func.current_timestamp()))),
+    )
+
+
+def get_traffic_partitions(session: Session) -> dict[date, str]:
+    """The daily partitions of `traffic_volume`, by the day they hold.
+
+    The default partition is not included.
+    """
+    names = session.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": TrafficVolume.__tablename__},
+    )
+    return {
+        datetime.strptime(match.group(1), "%Y%m%d").date(): name
+        for name in names
+        if (match := _PARTITION_NAME.fullmatch(name))
+    }
+
+
+def create_traffic_partitions(session: Session, start: date, end: date) -> list[str]:
+    """Create the missing daily `traffic_volume` partitions from `start` to `end`.
+
+    Rows which already ended up in the default partition are moved
+    into the new partition.
+
+    :param start: the first day to create a partition for
+    :param end: the first day not to create a partition for
+    :returns: the names of the created partitions
+    """
+    existing = get_traffic_partitions(session)
+    parent = t.cast(str, TrafficVolume.__tablename__)
+    created = []
+    for day in (start + timedelta(days=d) for d in range((end - start).days)):
+        if day in existing:
+            continue
+        name = traffic_partition_name(day)
+        lower, upper = _utc_midnight(day), _utc_midnight(day + timedelta(days=1))
+        session.execute(text(
+            f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {TRAFFIC_VOLUME_DEFAULT_PARTITION}"
+                ' WHERE "timestamp" >= :lower AND "timestamp" < :upper RETURNING *)'
+                f" INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"lower": lower, "upper": upper},
+        )
+        session.execute(text(
+            f"ALTER TABLE {parent} ATTACH PARTITION {name}"
+            f" FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+
+def create_upcoming_traffic_partitions(
+    session: Session, days: int = TRAFFIC_PARTITIONS_AHEAD
+) -> list[str]:
+    """Make sure that `traffic_volume` partitions exist for today and the next `days` days.
+
+    :returns: the names of the created partitions
+    """
+    today = _utc_today(session)
+    return create_traffic_partitions(session, today, today + timedelta(days=days + 1))
+
+
+def drop_old_traffic_partitions(
+    session: Session, retention: timedelta = TRAFFIC_RETENTION
+) -> list[str]:
+    """Delete the traffic data older than `retention`.
+
+    Instead of deleting rows, whole daily partitions are detached and dropped.
+    Old rows in the default partition are deleted.  The traffic of the
+    removed days is rolled up beforehand.
+
+    :returns: the names of the dropped partitions
+    """
+    cutoff = _utc_today(session) - retention
+    parent = t.cast(str, TrafficVolume.__tablename__)
+    old_partitions = sorted(
+        (day, name) for day, name in get_traffic_partitions(session).items() if day < cutoff
+    )
+    # the raw data is gone afterwards, so make sure that its rollups are complete
+    oldest_days = [day for day, _name in old_partitions[:1]]
+    if oldest_default := session.scalar(text(
+        """SELECT CAST(timezone('UTC', min("timestamp")) AS date)"""
+        f" FROM {TRAFFIC_VOLUME_DEFAULT_PARTITION}"
+    )):
+        oldest_days.append(oldest_default)
+    if (rollup_start := min(oldest_days, default=cutoff)) < cutoff:
+        rollup_traffic(session, rollup_start, cutoff)
+
+    dropped = []
+    for _day, name in old_partitions:
+        session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+        session.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    session.execute(
+        text(
+            f"DELETE FROM {TRAFFIC_VOLUME_DEFAULT_PARTITION}"
+            ' WHERE "timestamp" < :cutoff'
+        ),
+        {"cutoff": _utc_midnight(cutoff)},
+    )
+    return dropped
+
+
+#: the rollups of how many recent days are refreshed periodically
+TRAFFIC_ROLLUP_DAYS = 2
+#: up to how many days the traffic history is shown per day rather than per month
+MAX_DAILY_HISTORY_DAYS = 92
+
+
+def _first_of_next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def rollup_traffic(session: Session, start: date, end: date) -> set[int]:
+    """Refresh the daily and monthly rollups for the days from `start` to `end`.
+
+    The daily rollups are recomputed from the raw :class:`TrafficVolume` data,
+    so the days have to lie within the retention period.  The monthly rollups
+    of the affected users are recomputed from the daily rollups.
+
+    :param start: the first day to roll up
+    :param end: the first day not to roll up
+    :returns: the ids of the users with traffic on these days
+    """
+    daily = insert(TrafficDailyUser).from_select(
+        ["user_id", "day", "ingress", "egress"],
+        _daily_traffic(
+            TrafficVolume.timestamp >= _utc_midnight(start),
+            TrafficVolume.timestamp < _utc_midnight(end),
+        ),
+    )
+    user_ids = set(session.scalars(daily.on_conflict_do_update(
+        index_elements=[TrafficDailyUser.user_id, TrafficDailyUser.day],
+        set_={"ingress": daily.excluded.ingress, "egress": daily.excluded.egress},
+    ).returning(TrafficDailyUser.user_id)))
+
+    month = cast(func.date_trunc("month", TrafficDailyUser.day), Date)
+    monthly = insert(TrafficMonthlyUser).from_select(
+        ["user_id", "month", "ingress", "egress"],
+        select(
+            TrafficDailyUser.user_id,
+            month,
+            func.sum(TrafficDailyUser.ingress),
+            func.sum(TrafficDailyUser.egress),
+        )
+        .where(
+            TrafficDailyUser.day >= start.replace(day=1),
+            TrafficDailyUser.day < _first_of_next_month(end - timedelta(days=1)),
+            TrafficDailyUser.user_id.in_(
+                select(TrafficDailyUser.user_id).where(
+                    TrafficDailyUser.day >= start, TrafficDailyUser.day < end
+                )
+            ),
+        )
+        .group_by(TrafficDailyUser.user_id, month),
+    )
+    session.execute(monthly.on_conflict_do_update(
+        index_elements=[TrafficMonthlyUser.user_id, TrafficMonthlyUser.month],
+        set_={"ingress": monthly.excluded.ingress, "egress": monthly.excluded.egress},
+    ))
+    return user_ids
+
+
+def rollup_recent_traffic(session: Session, days: int = TRAFFIC_ROLLUP_DAYS) -> set[int]:
+    """Refresh the rollups of today and the preceding `days - 1` days.
+
+    :returns: the ids of the users with traffic on these days
+    """
+    today = _utc_today(session)
+    return rollup_traffic(
+        session, today - timedelta(days=days - 1), today + timedelta(days=1)
+    )
+
+
+#: the length of the rolling window the traffic quota applies to
+TRAFFIC_QUOTA_DAYS = 7
+
+
+def update_traffic_quota_counters(
+    session: Session, user_ids: t.Collection[int]
+) -> dict[int, int]:
+    """Bring the rolling traffic counters of the given users up to date.
+
+    The counters of users whose window moved on since their last update are
+    refreshed as well, as their oldest day dropped out of the window.  So the
+    cost depends on the number of users with changing traffic, not on the
+    number of users.
+
+    :param user_ids: the users whose traffic changed,
+        e.g. as returned by :func:`rollup_traffic`
+    :returns: the traffic within the window by user id, for every refreshed user
+    """
+    today = _utc_today(session)
+    window_start = today - timedelta(days=TRAFFIC_QUOTA_DAYS - 1)
+    outdated = session.scalars(
+        select(TrafficQuotaUser.user_id).where(
+            TrafficQuotaUser.window_start < window_start, TrafficQuotaUser.traffic > 0
+        )
+    )
+    ids = set(user_ids).union(outdated)
+    if not ids:
+        return {}
+
+    counters = dict.fromkeys(ids, 0) | {
+        user_id: int(traffic)
+        for user_id, traffic in session.execute(
             select(
-                User.id,
-                User.name,
-                func.sum(TrafficVolume.amount).label("traffic_for_days"),
+                TrafficDailyUser.user_id,
+                func.sum(TrafficDailyUser.ingress + TrafficDailyUser.egress),
             )
-            .select_from(join(User, TrafficVolume, TrafficVolume.user_id == User.id))
-            .where(User.id != 0)
             .where(
-                TrafficVolume.timestamp
-                >= (session.utcnow() - timedelta(days - 1)).date()
+                TrafficDailyUser.user_id.in_(ids),
+                TrafficDailyUser.day >= window_start,
+                TrafficDailyUser.day <= today,
             )
-            .group_by(User.id, User.name)
-            .order_by(literal_column("traffic_for_days").desc())
-            .limit(limit)
-        ).fetchall(),
-    )
+            .group_by(TrafficDailyUser.user_id)
+        )
+    }
+    stmt = insert(TrafficQuotaUser).values([
+        {"user_id": user_id, "window_start": window_start, "traffic": traffic}
+        for user_id, traffic in counters.items()
+    ])
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[TrafficQuotaUser.user_id],
+        set_={"window_start": stmt.excluded.window_start, "traffic": stmt.excluded.traffic},
+    ))
+    return counters
+
+
+class TrafficQuotaChanges(t.NamedTuple):
+    #: the users who have been added to the group
+    exceeded: set[int]
+    #: the users who have been removed from the group
+    cleared: set[int]
+
+
+def evaluate_traffic_quota(
+    session: Session,
+    user_ids: t.Collection[int],
+    limit: int,
+    group: PropertyGroup,
+    processor: User,
+) -> TrafficQuotaChanges:
+    """Flag the users whose traffic within the rolling window exceeds `limit`.
+
+    Users crossing the limit are made members of `group`; users falling
+    below it again are removed from it.  Only the users whose counters are
+    refreshed (see :func:`update_traffic_quota_counters`) are looked at.
+
+    :param user_ids: the users whose traffic changed
+    :param limit: the traffic (in bytes) allowed within the window
+    :param group: the group marking users who exceeded the limit,
+        usually ``config.traffic_limit_exceeded_group``
+    :param processor: the user the membership changes are logged as
+    """
+    counters = update_traffic_quota_counters(session, user_ids)
+    if not counters:
+        return TrafficQuotaChanges(set(), set())
+    over_limit = {user_id for user_id, traffic in counters.items() if traffic > limit}
+    flagged = set(session.scalars(
+        select(Membership.user_id).where(
+            Membership.user_id.in_(counters),
+            Membership.group == group,
+            Membership.active_during.contains(func.current_timestamp()),
+        )
+    ))
+    changes = TrafficQuotaChanges(exceeded=over_limit - flagged, cleared=flagged - over_limit)
+
+    now = t.cast(DateTimeTz, session.scalar(select(func.current_timestamp())))
+    for user in session.scalars(select(User).where(User.id.in_(changes.exceeded))):
+        make_member_of(user, group, processor, starting_from(now))
+    for user in session.scalars(select(User).where(User.id.in_(changes.cleared))):
+        remove_member_of(user, group, processor, starting_from(now))
+    return changes
+
+
+TrafficGranularity = t.Literal["raw", "day", "month"]
+
+
+def traffic_history_granularity(start: date, end: date, today: date) -> TrafficGranularity:
+    """The coarsest data which can answer a traffic history from `start` to `end`.
+
+    Ranges within the retention period are answered from the raw data,
+    longer ones from the daily or, beyond :data:`MAX_DAILY_HISTORY_DAYS`,
+    the monthly rollups.
+    """
+    if start >= today - TRAFFIC_RETENTION:
+        return "raw"
+    if (end - start).days < MAX_DAILY_HISTORY_DAYS:
+        return "day"
+    return "month"
+
+
+def get_traffic_history(
+    session: Session, user_id: int, start: date, end: date
+) -> list[TrafficHistoryEntry]:
+    """The traffic of a user from `start` to `end` (inclusive).
+
+    The cost only depends on the number of entries, which is at most
+    :data:`MAX_DAILY_HISTORY_DAYS` or the number of months.
+    Like the rollups, the days are UTC days.
+
+    :returns: one entry per day or, for long ranges, per month
+        (see :func:`traffic_history_granularity`)
+    """
+    granularity = traffic_history_granularity(start, end, _utc_today(session))
+    stmt: Select[tuple[date, int, int]]
+    if granularity == "month":
+        buckets = [start.replace(day=1)]
+        while (next_month := _first_of_next_month(buckets[-1])) <= end:
+            buckets.append(next_month)
+        stmt = select(
+            TrafficMonthlyUser.month, TrafficMonthlyUser.ingress, TrafficMonthlyUser.egress
+        ).where(
+            TrafficMonthlyUser.user_id == user_id,
+            TrafficMonthlyUser.month >= buckets[0],
+            TrafficMonthlyUser.month <= buckets[-1],
+        )
+    else:
+        buckets = [start + timedelta(days=d) for d in range((end - start).days + 1)]
+        if granularity == "day":
+            stmt = select(
+                TrafficDailyUser.day, TrafficDailyUser.ingress, TrafficDailyUser.egress
+            ).where(
+                TrafficDailyUser.user_id == user_id,
+                TrafficDailyUser.day >= start,
+                TrafficDailyUser.day <= end,
+            )
+        else:
+            daily = _daily_traffic(
+                TrafficVolume.user_id == user_id,
+                TrafficVolume.timestamp >= _utc_midnight(start),
+                TrafficVolume.timestamp < _utc_midnight(end + timedelta(days=1)),
+            ).subquery()
+            stmt = select(*list(daily.c)[1:])
+
+    traffic = {b: (ingress, egress) for b, ingress, egress in session.execute(stmt)}
+    return [
+        TrafficHistoryEntry(_utc_midnight(b), *traffic.get(b, (0, 0))) for b in buckets
+    ]
+
+
+class StagedTraffic(t.NamedTuple):
+    """A traffic record as accepted by `pmacct_traffic_staging`."""
+    type: TrafficDirection
+    ip: str
+    stamp_inserted: datetime
+    bytes: int
+    packets: int
+
+
+def stage_traffic(session: Session, records: t.Iterable[StagedTraffic]) -> None:
+    """``COPY`` traffic records into the `pmacct_traffic_staging` table.
+
+    The records only end up in `traffic_volume` after :func:`merge_staged_traffic`.
+    """
+    buffer = io.StringIO()
+    for r in records:
+        buffer.write(f"{r.type}\t{r.ip}\t{r.stamp_inserted.isoformat()}\t{r.bytes}\t{r.packets}\n")
+    buffer.seek(0)
+    columns = ", ".join(c.name for c in pmacct_traffic_staging.columns)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {pmacct_traffic_staging.name} ({columns}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def merge_staged_traffic(session: Session) -> int:
+    """Move the staged traffic records into `traffic_volume`.
 
+    The records are summed up per IP, day and direction and upserted in
+    a single statement, see :data:`pycroft.model.traffic.pmacct_traffic_merge`.
+    Records of unknown IPs are discarded.
 
-def delete_old_traffic_data(session: Session) -> int:
-    week_ago = func.current_timestamp() - timedelta(weeks=1)
-    stmt = delete(TrafficVolume).where(TrafficVolume.timestamp < week_ago)
-    result = t.cast(CursorResult, session.execute(stmt))
-    return result.rowcount
+    :returns: the number of upserted `traffic_volume` rows
+    """
+    return t.cast(int, session.scalar(select(func.pmacct_traffic_merge())))
@@ -21,6 +21,8 @@ from .info import (
     UserStatus,
     status,
     traffic_history,
+    traffic_history_many,
+    TrafficHistoryMatrix,
     scheduled_membership_end,
     scheduled_membership_start,
     membership_ending_task,
@@ -46,6 +48,7 @@ from .member_request import (
     finish_member_request,
     user_from_pre_member,
     get_member_requests,
+    MEMBER_REQUEST_ORDER,
     delete_member_request,
     merge_member_request,
     get_possible_existing_users_for_pre_member,
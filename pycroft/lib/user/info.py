@@ -9,6 +9,7 @@ from pycroft.model import session
 from pycroft.model.task import TaskStatus, TaskType, UserTask
 from pycroft.model.traffic import TrafficHistoryEntry
 from pycroft.model.traffic import traffic_history as func_traffic_history
+from pycroft.model.traffic import traffic_history_many as func_traffic_history_many
 from pycroft.model.user import (
     User,
 )
@@ -29,18 +30,18 @@ class UserStatus(t.NamedTuple):
 
 def status(user: User) -> UserStatus:
     has_interface = any(h.interfaces for h in user.hosts)
-    has_access = user.has_property("network_access")
-    is_active = user.has_property("active_member")
+    properties = user.current_properties_set
+    has_access = "network_access" in properties
     return UserStatus(
-        member=user.has_property("member"),
-        traffic_exceeded=user.has_property("traffic_limit_exceeded"),
+        member="member" in properties,
+        traffic_exceeded="traffic_limit_exceeded" in properties,
         network_access=has_access and has_interface,
-        is_active=is_active,
+        is_active="active_member" in properties,
         wifi_access=user.has_wifi_access and has_access,
         account_balanced=user_has_paid(user),
-        violation=user.has_property("violation"),
-        ldap=user.has_property("ldap"),
-        admin=any(prop in user.current_properties for prop in _admin_properties),
+        violation="violation" in properties,
+        ldap="ldap" in properties,
+        admin=not properties.isdisjoint(_admin_properties),
     )
 
 
@@ -58,6 +59,43 @@ def traffic_history(
     return [TrafficHistoryEntry(**row._asdict()) for row in result]
 
 
+class TrafficHistoryMatrix(t.NamedTuple):
+    """The traffic of several users per day.
+
+    ``ingress[d][u]`` is the ingress of ``user_ids[u]`` on ``days[d]``.
+    """
+    days: list[DateTimeTz]
+    user_ids: list[int]
+    ingress: list[list[int]]
+    egress: list[list[int]]
+
+
+def traffic_history_many(
+    user_ids: t.Sequence[int],
+    start: DateTimeTz | ColumnElement[DateTimeTz],
+    end: DateTimeTz | ColumnElement[DateTimeTz],
+) -> TrafficHistoryMatrix:
+    """The traffic history of several users, fetched in a single query.
+
+    :returns: a dense day × user matrix; days without traffic are ``0``
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    rows = session.session.execute(
+        select("*").select_from(func_traffic_history_many(user_ids, start, end))
+    ).all()
+    # every user has a row for every day, ordered by user and day
+    num_days = len(rows) // len(user_ids) if user_ids else 0
+    days = [row.timestamp for row in rows[:num_days]]
+    column = {user_id: u for u, user_id in enumerate(user_ids)}
+    ingress = [[0] * len(user_ids) for _ in days]
+    egress = [[0] * len(user_ids) for _ in days]
+    for i, row in enumerate(rows):
+        d, u = i % num_days, column[row.user_id]
+        ingress[d][u] = int(row.ingress or 0)
+        egress[d][u] = int(row.egress or 0)
+    return TrafficHistoryMatrix(days, user_ids, ingress, egress)
+
+
 def scheduled_membership_start(user: User) -> date | None:
     """
     :return: The due date of the task that will begin a membership; None if not
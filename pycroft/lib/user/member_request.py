@@ -183,14 +183,20 @@ def user_from_pre_member(pre_member: PreMember, processor: User | None) -> User:
     return user
 
 
+#: The order in which member requests are listed: confirmed ones first, oldest first
+MEMBER_REQUEST_ORDER = (
+    PreMember.email_confirmed.desc(),
+    PreMember.registered_at.asc(),
+    PreMember.id,
+)
+
+
 def get_member_requests() -> list[PreMember]:
-    prms = (
-        PreMember.q.order_by(PreMember.email_confirmed.desc())
-        .order_by(PreMember.registered_at.asc())
-        .all()
-    )
+    prms = session.session.scalars(
+        select(PreMember).order_by(*MEMBER_REQUEST_ORDER)
+    ).all()
 
-    return prms
+    return list(prms)
 
 
 @with_transaction
@@ -28,6 +28,7 @@ from .user import *
 from .unix_account import *
 from .webstorage import *
 from .scrubbing import *
+from .ldap_sync import *
 
 # hades is special: it calls `configure_mappers()` at import time.
 # Therefore, importing it should happen as late as possible.
@@ -0,0 +1,208 @@
+"""materialize current_property
+
+Revision ID: 800a22e96e71
+Revises: a0fd5bf93d1d
+Create Date: 2026-10-16 09:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "800a22e96e71"
+down_revision = "a0fd5bf93d1d"
+branch_labels = None
+depends_on = None
+
+
+def _dependent_views(relation: str) -> list[tuple[str, str]]:
+    """Names and definitions of all views (transitively) depending on `relation`,
+    ordered such that they can be recreated in that order.
+
+    Views reference their dependencies by oid, so replacing a relation
+    requires dropping and recreating everything built on top of it.
+    """
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                """
+        WITH RECURSIVE dependent (oid, depth) AS (
+            SELECT CAST(:relation AS regclass)::oid, 0
+            UNION
+            SELECT r.ev_class, d.depth + 1
+            FROM dependent d
+            JOIN pg_depend dep ON dep.refobjid = d.oid AND dep.classid = 'pg_rewrite'::regclass
+            JOIN pg_rewrite r ON r.oid = dep.objid
+            WHERE r.ev_class <> d.oid
+        )
+        SELECT c.relname, pg_get_viewdef(c.oid)
+        FROM dependent d JOIN pg_class c ON c.oid = d.oid
+        WHERE d.depth > 0
+        GROUP BY c.oid, c.relname
+        ORDER BY max(d.depth), c.relname
+    """
+            ),
+            {"relation": relation},
+        )
+        .all()
+    )
+
+
+def _recreate_views(views: list[tuple[str, str]]) -> None:
+    for name, definition in views:
+        op.execute(f'CREATE VIEW "{name}" AS {definition}')
+
+
+def upgrade():
+    dependent_views = _dependent_views("current_property")
+    op.execute("DROP VIEW current_property CASCADE")
+
+    op.create_table(
+        "current_property",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("property_name", sa.String(length=255), nullable=False),
+        sa.Column("denied", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "property_name"),
+    )
+    op.create_index(
+        "ix_current_property_property_name", "current_property", ["property_name"]
+    )
+    op.execute(SQL_FUNCTIONS_CREATE)
+    op.execute("SELECT refresh_current_properties(NULL)")
+
+    _recreate_views(dependent_views)
+
+
+def downgrade():
+    dependent_views = _dependent_views("current_property")
+    op.execute(SQL_FUNCTIONS_DROP)
+    op.execute("DROP TABLE current_property CASCADE")
+    op.execute(
+        """
+        CREATE VIEW current_property AS
+        SELECT properties.user_id, properties.property_name, properties.denied
+        FROM evaluate_properties(CURRENT_TIMESTAMP) AS properties
+    """
+    )
+    _recreate_views(dependent_views)
+
+
+# cf. the DDL objects in `pycroft.model.property`
+SQL_FUNCTIONS_CREATE = """
+CREATE OR REPLACE FUNCTION evaluate_users_properties(evaluation_time timestamp with time zone, user_ids integer[]) RETURNS TABLE (user_id INT, property_name VARCHAR(255), denied BOOLEAN) STABLE LANGUAGE sql AS $$
+SELECT "user".id AS user_id, property.name AS property_name, false AS denied
+FROM membership
+    JOIN ("group" JOIN property_group ON "group".id = property_group.id) ON property_group.id = membership.group_id
+    JOIN "user" ON "user".id = membership.user_id
+    JOIN property ON property_group.id = property.property_group_id
+WHERE membership.active_during @> evaluation_time AND membership.user_id = any(user_ids)
+GROUP BY "user".id, property.name
+HAVING every(property.granted)
+UNION
+SELECT "user".id AS user_id, property.name AS property_name, true AS denied
+FROM membership
+    JOIN ("group" JOIN property_group ON "group".id = property_group.id) ON property_group.id = membership.group_id
+    JOIN "user" ON "user".id = membership.user_id
+    JOIN property ON property_group.id = property.property_group_id
+WHERE membership.active_during @> evaluation_time AND membership.user_id = any(user_ids)
+GROUP BY "user".id, property.name
+HAVING bool_or(property.granted) AND NOT every(property.granted)
+$$;
+CREATE OR REPLACE FUNCTION refresh_current_properties(user_ids integer[]) RETURNS SETOF integer VOLATILE LANGUAGE plpgsql AS $$
+BEGIN
+    -- Only rows which actually change are written, and only the ids of users
+    -- whose properties changed are returned.
+    IF user_ids IS NULL THEN
+        RETURN QUERY
+        WITH evaluated AS (
+            SELECT user_id, property_name, denied FROM evaluate_properties(current_timestamp)
+        ), deleted AS (
+            DELETE FROM current_property cp
+            WHERE TRUE AND NOT EXISTS (
+                SELECT FROM evaluated e
+                WHERE e.user_id = cp.user_id AND e.property_name = cp.property_name
+            )
+            RETURNING cp.user_id
+        ), upserted AS (
+            INSERT INTO current_property AS cp (user_id, property_name, denied)
+            SELECT user_id, property_name, denied FROM evaluated
+            ON CONFLICT (user_id, property_name) DO UPDATE SET denied = EXCLUDED.denied
+                WHERE cp.denied IS DISTINCT FROM EXCLUDED.denied
+            RETURNING cp.user_id
+        )
+        SELECT user_id FROM deleted UNION SELECT user_id FROM upserted;
+    ELSE
+        RETURN QUERY
+        WITH evaluated AS (
+            SELECT user_id, property_name, denied FROM evaluate_users_properties(current_timestamp, user_ids)
+        ), deleted AS (
+            DELETE FROM current_property cp
+            WHERE cp.user_id = ANY(user_ids) AND NOT EXISTS (
+                SELECT FROM evaluated e
+                WHERE e.user_id = cp.user_id AND e.property_name = cp.property_name
+            )
+            RETURNING cp.user_id
+        ), upserted AS (
+            INSERT INTO current_property AS cp (user_id, property_name, denied)
+            SELECT user_id, property_name, denied FROM evaluated
+            ON CONFLICT (user_id, property_name) DO UPDATE SET denied = EXCLUDED.denied
+                WHERE cp.denied IS DISTINCT FROM EXCLUDED.denied
+            RETURNING cp.user_id
+        )
+        SELECT user_id FROM deleted UNION SELECT user_id FROM upserted;
+    END IF;
+END;
+$$;
+CREATE OR REPLACE FUNCTION membership_refresh_current_properties() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_user_ids integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_user_ids := array_append(v_user_ids, OLD.user_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_user_ids := array_append(v_user_ids, NEW.user_id);
+    END IF;
+    PERFORM refresh_current_properties(v_user_ids);
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER membership_refresh_current_properties_trigger AFTER INSERT OR UPDATE OR DELETE ON membership FOR EACH ROW EXECUTE PROCEDURE membership_refresh_current_properties();
+CREATE OR REPLACE FUNCTION property_refresh_current_properties() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_group_ids integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_group_ids := array_append(v_group_ids, OLD.property_group_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_group_ids := array_append(v_group_ids, NEW.property_group_id);
+    END IF;
+    PERFORM refresh_current_properties(array(
+        SELECT DISTINCT m.user_id FROM membership m
+        WHERE m.group_id = ANY(v_group_ids)
+          AND m.active_during @> current_timestamp
+    ));
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER property_refresh_current_properties_trigger AFTER INSERT OR UPDATE OR DELETE ON property FOR EACH ROW EXECUTE PROCEDURE property_refresh_current_properties();
+"""
+
+SQL_FUNCTIONS_DROP = """
+DROP TRIGGER IF EXISTS property_refresh_current_properties_trigger ON property;
+DROP FUNCTION IF EXISTS property_refresh_current_properties();
+DROP TRIGGER IF EXISTS membership_refresh_current_properties_trigger ON membership;
+DROP FUNCTION IF EXISTS membership_refresh_current_properties();
+DROP FUNCTION IF EXISTS refresh_current_properties(integer[]);
+DROP FUNCTION IF EXISTS evaluate_users_properties(timestamp with time zone, integer[]);
+"""
@@ -0,0 +1,47 @@
+"""add membership boundary indexes
+
+Revision ID: 3c5e1f7a9b20
+Revises: 800a22e96e71
+Create Date: 2026-10-16 09:30:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3c5e1f7a9b20"
+down_revision = "800a22e96e71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_membership_lower_active_during",
+        "membership",
+        [sa.text("lower(active_during)")],
+    )
+    op.create_index(
+        "ix_membership_upper_active_during",
+        "membership",
+        [sa.text("upper(active_during)")],
+    )
+    op.create_table(
+        "current_property_refresh",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "refreshed_until",
+            sa.types.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("id = 1"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("current_property_refresh")
+    op.drop_index("ix_membership_upper_active_during", table_name="membership")
+    op.drop_index("ix_membership_lower_active_during", table_name="membership")
@@ -0,0 +1,159 @@
+"""add ldap sync journal
+
+Revision ID: 5b8d2c4e6f13
+Revises: 3c5e1f7a9b20
+Create Date: 2026-10-16 10:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5b8d2c4e6f13"
+down_revision = "3c5e1f7a9b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ldap_sync_journal",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("user", "group", "property", name="ldap_entry_kind"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.types.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "ldap_sync_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "synced_until",
+            sa.types.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("id = 1"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(SQL_TRIGGERS_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_TRIGGERS_DROP)
+    op.drop_table("ldap_sync_state")
+    op.drop_table("ldap_sync_journal")
+    op.execute("DROP TYPE ldap_entry_kind")
+
+
+# cf. the DDL objects in `pycroft.model.ldap_sync`
+SQL_TRIGGERS_CREATE = """
+CREATE OR REPLACE FUNCTION user_ldap_sync_journal() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+BEGIN
+    -- only columns which are exported to LDAP are of interest
+    IF TG_OP = 'UPDATE'
+        AND (NEW.login, NEW.name, NEW.email, NEW.email_forwarded,
+             NEW.passwd_hash, NEW.unix_account_id)
+        IS NOT DISTINCT FROM (OLD.login, OLD.name, OLD.email, OLD.email_forwarded,
+                              OLD.passwd_hash, OLD.unix_account_id)
+    THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO ldap_sync_journal (kind, name) VALUES ('user', OLD.login);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ldap_sync_journal (kind, name) VALUES ('user', NEW.login);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER user_ldap_sync_journal_trigger AFTER INSERT OR UPDATE OR DELETE ON "user" FOR EACH ROW EXECUTE PROCEDURE user_ldap_sync_journal();
+CREATE OR REPLACE FUNCTION unix_account_ldap_sync_journal() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO ldap_sync_journal (kind, name)
+        SELECT 'user', u.login FROM "user" u
+        WHERE u.unix_account_id = CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END;
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER unix_account_ldap_sync_journal_trigger AFTER UPDATE OR DELETE ON unix_account FOR EACH ROW EXECUTE PROCEDURE unix_account_ldap_sync_journal();
+CREATE OR REPLACE FUNCTION group_ldap_sync_journal() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.name IS NOT DISTINCT FROM OLD.name THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO ldap_sync_journal (kind, name) VALUES ('group', OLD.name);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ldap_sync_journal (kind, name) VALUES ('group', NEW.name);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER group_ldap_sync_journal_trigger AFTER INSERT OR UPDATE OR DELETE ON "group" FOR EACH ROW EXECUTE PROCEDURE group_ldap_sync_journal();
+CREATE OR REPLACE FUNCTION membership_ldap_sync_journal() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_group_ids integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_group_ids := array_append(v_group_ids, OLD.group_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_group_ids := array_append(v_group_ids, NEW.group_id);
+    END IF;
+    INSERT INTO ldap_sync_journal (kind, name)
+        SELECT 'group', g.name FROM "group" g WHERE g.id = ANY(v_group_ids);
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER membership_ldap_sync_journal_trigger AFTER INSERT OR UPDATE OR DELETE ON membership FOR EACH ROW EXECUTE PROCEDURE membership_ldap_sync_journal();
+CREATE OR REPLACE FUNCTION current_property_ldap_sync_journal() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_row current_property;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+    -- the user is affected as well, because the required property
+    -- and `ldap_login_enabled` determine how the user is exported
+    INSERT INTO ldap_sync_journal (kind, name)
+        SELECT 'user', u.login FROM "user" u WHERE u.id = v_row.user_id;
+    INSERT INTO ldap_sync_journal (kind, name) VALUES ('property', v_row.property_name);
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER current_property_ldap_sync_journal_trigger AFTER INSERT OR UPDATE OR DELETE ON current_property FOR EACH ROW EXECUTE PROCEDURE current_property_ldap_sync_journal();
+"""
+
+SQL_TRIGGERS_DROP = """
+DROP TRIGGER IF EXISTS current_property_ldap_sync_journal_trigger ON current_property;
+DROP FUNCTION IF EXISTS current_property_ldap_sync_journal();
+DROP TRIGGER IF EXISTS membership_ldap_sync_journal_trigger ON membership;
+DROP FUNCTION IF EXISTS membership_ldap_sync_journal();
+DROP TRIGGER IF EXISTS group_ldap_sync_journal_trigger ON "group";
+DROP FUNCTION IF EXISTS group_ldap_sync_journal();
+DROP TRIGGER IF EXISTS unix_account_ldap_sync_journal_trigger ON unix_account;
+DROP FUNCTION IF EXISTS unix_account_ldap_sync_journal();
+DROP TRIGGER IF EXISTS user_ldap_sync_journal_trigger ON "user";
+DROP FUNCTION IF EXISTS user_ldap_sync_journal();
+"""
@@ -0,0 +1,35 @@
+"""add user trigram indexes
+
+Revision ID: 9e4a7c2d1b58
+Revises: 5b8d2c4e6f13
+Create Date: 2026-10-16 10:30:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9e4a7c2d1b58"
+down_revision = "5b8d2c4e6f13"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("name", "login", "email")
+
+
+def upgrade():
+    op.execute(sa.text("create extension if not exists pg_trgm"))
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_user_{column}_trgm",
+            "user",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade():
+    for column in reversed(COLUMNS):
+        op.drop_index(f"ix_user_{column}_trgm", table_name="user")
@@ -0,0 +1,68 @@
+"""add account balance
+
+Revision ID: 1f6b3d8a2c47
+Revises: 9e4a7c2d1b58
+Create Date: 2026-10-16 11:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "1f6b3d8a2c47"
+down_revision = "9e4a7c2d1b58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "account_balance",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["account_id"], ["account.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("account_id"),
+    )
+    # no split may change between the backfill and the creation of the trigger
+    op.execute("LOCK TABLE split IN SHARE MODE")
+    op.execute(
+        "INSERT INTO account_balance (account_id, balance)"
+        " SELECT account_id, sum(amount) FROM split GROUP BY account_id"
+    )
+    op.execute(SQL_TRIGGER_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_TRIGGER_DROP)
+    op.drop_table("account_balance")
+
+
+# cf. the DDL objects in `pycroft.model.finance`
+SQL_TRIGGER_CREATE = """
+CREATE OR REPLACE FUNCTION split_update_account_balance() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- if the account itself is being deleted, the row is already gone
+        UPDATE account_balance SET balance = balance - OLD.amount
+            WHERE account_id = OLD.account_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO account_balance AS b (account_id, balance)
+            VALUES (NEW.account_id, NEW.amount)
+            ON CONFLICT (account_id)
+            DO UPDATE SET balance = b.balance + EXCLUDED.balance;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER split_update_account_balance_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON split
+    FOR EACH ROW EXECUTE PROCEDURE split_update_account_balance();
+"""
+
+SQL_TRIGGER_DROP = """
+DROP TRIGGER IF EXISTS split_update_account_balance_trigger ON split;
+DROP FUNCTION IF EXISTS split_update_account_balance();
+"""
@@ -0,0 +1,30 @@
+"""add bank account activity lookup index
+
+Revision ID: 7c2e9f4b5a13
+Revises: 1f6b3d8a2c47
+Create Date: 2026-10-16 11:30:00.000000+00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c2e9f4b5a13"
+down_revision = "1f6b3d8a2c47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_bank_account_activity_bank_account_id_valid_on_amount",
+        "bank_account_activity",
+        ["bank_account_id", "valid_on", "amount"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_bank_account_activity_bank_account_id_valid_on_amount",
+        table_name="bank_account_activity",
+    )
@@ -0,0 +1,133 @@
+"""partition traffic_volume by day
+
+Revision ID: 3d9f1a6c8e24
+Revises: 7c2e9f4b5a13
+Create Date: 2026-10-16 12:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3d9f1a6c8e24"
+down_revision = "7c2e9f4b5a13"
+branch_labels = None
+depends_on = None
+
+COLUMNS = '"timestamp", amount, type, ip_id, user_id, packets'
+
+
+def create_traffic_volume(**kw):
+    op.create_table(
+        "traffic_volume",
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "type",
+            postgresql.ENUM("Ingress", "Egress", name="traffic_direction", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("ip_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("packets", sa.Integer(), nullable=False),
+        sa.CheckConstraint("amount >= 0"),
+        sa.CheckConstraint("packets >= 0"),
+        sa.ForeignKeyConstraint(["ip_id"], ["ip.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ip_id", "type", "timestamp"),
+        **kw,
+    )
+    op.create_index("ix_traffic_volume_ip_id", "traffic_volume", ["ip_id"])
+    op.create_index("ix_traffic_volume_user_id", "traffic_volume", ["user_id"])
+
+
+def rename_traffic_volume_to_old():
+    op.rename_table("traffic_volume", "traffic_volume_old")
+    for index in ("traffic_volume_pkey", "ix_traffic_volume_ip_id", "ix_traffic_volume_user_id"):
+        op.execute(
+            f"ALTER INDEX IF EXISTS {index} RENAME TO {index.replace('volume', 'volume_old')}"
+        )
+
+
+def upgrade():
+    op.execute(SQL_VIEWS_DROP)
+    rename_traffic_volume_to_old()
+    create_traffic_volume(postgresql_partition_by='RANGE ("timestamp")')
+    op.execute("CREATE TABLE traffic_volume_default PARTITION OF traffic_volume DEFAULT")
+    op.execute(SQL_PARTITIONS_CREATE)
+    op.execute(
+        f"INSERT INTO traffic_volume ({COLUMNS}) SELECT {COLUMNS} FROM traffic_volume_old"
+    )
+    op.drop_table("traffic_volume_old")
+    op.execute(SQL_VIEWS_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_VIEWS_DROP)
+    rename_traffic_volume_to_old()
+    create_traffic_volume()
+    op.execute(
+        f"INSERT INTO traffic_volume ({COLUMNS}) SELECT {COLUMNS} FROM traffic_volume_old"
+    )
+    # drops the partitions as well
+    op.drop_table("traffic_volume_old")
+    op.execute(SQL_VIEWS_CREATE)
+
+
+# the partitions for the retention period and the week ahead,
+# cf. `pycroft.lib.traffic.create_traffic_partitions`
+SQL_PARTITIONS_CREATE = """
+DO $$
+DECLARE
+    day date;
+BEGIN
+    FOR day IN SELECT generate_series(
+        (now() AT TIME ZONE 'UTC')::date - 7,
+        (now() AT TIME ZONE 'UTC')::date + 7,
+        interval '1 day'
+    )::date LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF traffic_volume FOR VALUES FROM (%L) TO (%L)',
+            'traffic_volume_p' || to_char(day, 'YYYYMMDD'),
+            day::timestamp AT TIME ZONE 'UTC',
+            (day + 1)::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END;
+$$;
+"""
+
+# cf. the DDL objects in `pycroft.model.traffic`
+SQL_VIEWS_CREATE = """
+CREATE VIEW pmacct_traffic_egress AS
+    SELECT traffic_volume.packets AS packets, traffic_volume.amount AS bytes,
+           traffic_volume."timestamp" AS stamp_inserted,
+           traffic_volume."timestamp" AS stamp_updated,
+           ip.address AS ip_src
+    FROM traffic_volume JOIN ip ON ip.id = traffic_volume.ip_id
+    WHERE traffic_volume.type = 'Egress';
+
+CREATE TRIGGER pmacct_traffic_egress_insert_trigger
+    INSTEAD OF INSERT ON pmacct_traffic_egress
+    FOR EACH ROW EXECUTE PROCEDURE pmacct_traffic_egress_insert();
+
+CREATE VIEW pmacct_traffic_ingress AS
+    SELECT traffic_volume.packets AS packets, traffic_volume.amount AS bytes,
+           traffic_volume."timestamp" AS stamp_inserted,
+           traffic_volume."timestamp" AS stamp_updated,
+           ip.address AS ip_dst
+    FROM traffic_volume JOIN ip ON ip.id = traffic_volume.ip_id
+    WHERE traffic_volume.type = 'Ingress';
+
+CREATE TRIGGER pmacct_traffic_ingress_insert_trigger
+    INSTEAD OF INSERT ON pmacct_traffic_ingress
+    FOR EACH ROW EXECUTE PROCEDURE pmacct_traffic_ingress_insert();
+"""
+
+# also drops the triggers
+SQL_VIEWS_DROP = """
+DROP VIEW IF EXISTS pmacct_traffic_egress;
+DROP VIEW IF EXISTS pmacct_traffic_ingress;
+"""
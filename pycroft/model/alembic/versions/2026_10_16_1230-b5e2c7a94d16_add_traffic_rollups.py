@@ -0,0 +1,53 @@
+"""add traffic rollups
+
+Revision ID: b5e2c7a94d16
+Revises: 3d9f1a6c8e24
+Create Date: 2026-10-16 12:30:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b5e2c7a94d16"
+down_revision = "3d9f1a6c8e24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table, column in (("traffic_daily_user", "day"), ("traffic_monthly_user", "month")):
+        op.create_table(
+            table,
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column(column, sa.Date(), nullable=False),
+            sa.Column("ingress", sa.BigInteger(), server_default="0", nullable=False),
+            sa.Column("egress", sa.BigInteger(), server_default="0", nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id", column),
+        )
+    # cf. `pycroft.lib.traffic.rollup_traffic`
+    op.execute(
+        """
+        INSERT INTO traffic_daily_user (user_id, day, ingress, egress)
+        SELECT user_id, CAST(timezone('UTC', "timestamp") AS date),
+               coalesce(sum(amount) FILTER (WHERE type = 'Ingress'), 0),
+               coalesce(sum(amount) FILTER (WHERE type = 'Egress'), 0)
+        FROM traffic_volume
+        GROUP BY user_id, CAST(timezone('UTC', "timestamp") AS date)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO traffic_monthly_user (user_id, month, ingress, egress)
+        SELECT user_id, CAST(date_trunc('month', day) AS date), sum(ingress), sum(egress)
+        FROM traffic_daily_user
+        GROUP BY user_id, CAST(date_trunc('month', day) AS date)
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("traffic_monthly_user")
+    op.drop_table("traffic_daily_user")
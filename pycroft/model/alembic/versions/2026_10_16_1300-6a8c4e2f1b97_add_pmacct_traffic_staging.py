@@ -0,0 +1,65 @@
+"""add pmacct traffic staging
+
+Revision ID: 6a8c4e2f1b97
+Revises: b5e2c7a94d16
+Create Date: 2026-10-16 13:00:00.000000+00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6a8c4e2f1b97"
+down_revision = "b5e2c7a94d16"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(SQL_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_DROP)
+
+
+# cf. the DDL objects in `pycroft.model.traffic`
+SQL_CREATE = """
+CREATE UNLOGGED TABLE pmacct_traffic_staging (
+    type traffic_direction NOT NULL,
+    ip inet NOT NULL,
+    stamp_inserted timestamp with time zone NOT NULL,
+    bytes bigint NOT NULL,
+    packets bigint NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION pmacct_traffic_merge() RETURNS bigint VOLATILE LANGUAGE sql AS $$
+    WITH staged AS (
+        DELETE FROM pmacct_traffic_staging RETURNING *
+    ), aggregated AS (
+        SELECT type, ip, date_trunc('day', stamp_inserted) AS day,
+               sum(bytes) AS bytes, sum(packets) AS packets
+        FROM staged
+        GROUP BY type, ip, date_trunc('day', stamp_inserted)
+    ), resolved AS (
+        SELECT aggregated.*, ip.id AS ip_id, host.owner_id AS owner_id
+        FROM aggregated
+        JOIN ip ON ip.address = aggregated.ip
+        JOIN interface ON ip.interface_id = interface.id
+        JOIN host ON interface.host_id = host.id
+    ), merged AS (
+        INSERT INTO traffic_volume (type, ip_id, "timestamp", amount, packets, user_id)
+        SELECT type, ip_id, day, bytes, packets, owner_id FROM resolved
+        ON CONFLICT (ip_id, type, "timestamp")
+        DO UPDATE SET (amount, packets) = (traffic_volume.amount + EXCLUDED.amount,
+                                           traffic_volume.packets + EXCLUDED.packets)
+        RETURNING 1
+    )
+    SELECT count(*) FROM merged
+$$;
+"""
+
+SQL_DROP = """
+DROP FUNCTION IF EXISTS pmacct_traffic_merge();
+DROP TABLE IF EXISTS pmacct_traffic_staging;
+"""
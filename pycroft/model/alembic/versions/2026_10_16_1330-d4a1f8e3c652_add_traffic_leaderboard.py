@@ -0,0 +1,43 @@
+"""add traffic leaderboard
+
+Revision ID: d4a1f8e3c652
+Revises: 6a8c4e2f1b97
+Create Date: 2026-10-16 13:30:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d4a1f8e3c652"
+down_revision = "6a8c4e2f1b97"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "traffic_top_user",
+        sa.Column("rank", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("traffic", sa.BigInteger(), nullable=False),
+        sa.Column("days", sa.Integer(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("rank"),
+    )
+    op.add_column(
+        "config",
+        sa.Column("traffic_top_days", sa.Integer(), server_default="7", nullable=False),
+    )
+    op.add_column(
+        "config",
+        sa.Column("traffic_top_limit", sa.Integer(), server_default="20", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("config", "traffic_top_limit")
+    op.drop_column("config", "traffic_top_days")
+    op.drop_table("traffic_top_user")
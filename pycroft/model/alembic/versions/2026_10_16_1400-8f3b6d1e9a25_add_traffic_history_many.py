@@ -0,0 +1,60 @@
+"""add traffic_history_many
+
+Revision ID: 8f3b6d1e9a25
+Revises: d4a1f8e3c652
+Create Date: 2026-10-16 14:00:00.000000+00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8f3b6d1e9a25"
+down_revision = "d4a1f8e3c652"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_traffic_volume_user_id_timestamp", "traffic_volume", ["user_id", "timestamp"]
+    )
+    op.drop_index("ix_traffic_volume_user_id", table_name="traffic_volume")
+    op.execute(SQL_FUNCTION_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_FUNCTION_DROP)
+    op.create_index("ix_traffic_volume_user_id", "traffic_volume", ["user_id"])
+    op.drop_index("ix_traffic_volume_user_id_timestamp", table_name="traffic_volume")
+
+
+# cf. the DDL objects in `pycroft.model.traffic`
+SQL_FUNCTION_CREATE = """
+CREATE OR REPLACE FUNCTION traffic_history_many(
+    arg_user_ids int[], arg_start timestamptz, arg_end timestamptz
+) RETURNS TABLE (user_id int, "timestamp" timestamptz, ingress numeric, egress numeric)
+STABLE LANGUAGE sql AS $$
+    WITH traffic AS (
+        SELECT tv.user_id AS user_id, date_trunc('day', tv."timestamp") AS day,
+               sum(tv.amount) FILTER (WHERE tv.type = 'Ingress') AS ingress,
+               sum(tv.amount) FILTER (WHERE tv.type = 'Egress') AS egress
+        FROM traffic_volume AS tv
+        WHERE tv.user_id = ANY(arg_user_ids)
+          AND tv."timestamp" >= date_trunc('day', arg_start)
+          AND tv."timestamp" < date_trunc('day', arg_end) + interval '1 day'
+        GROUP BY tv.user_id, date_trunc('day', tv."timestamp")
+    )
+    SELECT u.user_id, d.day, traffic.ingress, traffic.egress
+    FROM unnest(arg_user_ids) AS u(user_id)
+    CROSS JOIN generate_series(
+        date_trunc('day', arg_start), date_trunc('day', arg_end), '1 day'
+    ) AS d(day)
+    LEFT JOIN traffic ON traffic.user_id = u.user_id AND traffic.day = d.day
+    ORDER BY u.user_id, d.day
+$$;
+"""
+
+SQL_FUNCTION_DROP = """
+DROP FUNCTION IF EXISTS traffic_history_many(int[], timestamptz, timestamptz);
+"""
@@ -0,0 +1,33 @@
+"""add traffic quota
+
+Revision ID: 2c7e5a9d4f18
+Revises: 8f3b6d1e9a25
+Create Date: 2026-10-16 14:30:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "2c7e5a9d4f18"
+down_revision = "8f3b6d1e9a25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "traffic_quota_user",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("window_start", sa.Date(), nullable=False),
+        sa.Column("traffic", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.add_column("config", sa.Column("traffic_limit", sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("config", "traffic_limit")
+    op.drop_table("traffic_quota_user")
@@ -0,0 +1,388 @@
+"""add materialized hades tables
+
+Revision ID: 5e9c2b7f3a61
+Revises: 2c7e5a9d4f18
+Create Date: 2026-10-16 15:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5e9c2b7f3a61"
+down_revision = "2c7e5a9d4f18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "hades_radusergroup",
+        sa.Column("UserName", sa.Text(), nullable=False),
+        sa.Column("NASIPAddress", sa.Text(), nullable=True),
+        sa.Column("NASPortId", sa.String(), nullable=True),
+        sa.Column("GroupName", sa.Text(), nullable=False),
+        sa.Column("Priority", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_hades_radusergroup_UserName", "hades_radusergroup", ["UserName"]
+    )
+    op.create_table(
+        "hades_radcheck",
+        sa.Column("UserName", sa.Text(), nullable=False),
+        sa.Column("NASIPAddress", sa.Text(), nullable=True),
+        sa.Column("NASPortId", sa.String(), nullable=True),
+        sa.Column("Attribute", sa.Text(), nullable=False),
+        sa.Column("Op", sa.Text(), nullable=False),
+        sa.Column("Value", sa.Text(), nullable=True),
+        sa.Column("Priority", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_hades_radcheck_UserName", "hades_radcheck", ["UserName"])
+    op.create_table(
+        "hades_radgroupreply",
+        sa.Column("GroupName", sa.Text(), nullable=False),
+        sa.Column("Attribute", sa.Text(), nullable=False),
+        sa.Column("Op", sa.Text(), nullable=False),
+        sa.Column("Value", sa.Text(), nullable=False),
+    )
+    op.create_index(
+        "ix_hades_radgroupreply_GroupName", "hades_radgroupreply", ["GroupName"]
+    )
+    op.create_table(
+        "hades_dhcphost",
+        sa.Column("Mac", postgresql.MACADDR(), nullable=False),
+        sa.Column("IpAddress", sa.Text(), nullable=False),
+        sa.Column("HostName", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_hades_dhcphost_Mac", "hades_dhcphost", ["Mac"])
+    op.create_table(
+        "hades_alternative_dns",
+        sa.Column("IpAddress", sa.Text(), nullable=False),
+    )
+    op.create_index(
+        "ix_hades_alternative_dns_IpAddress", "hades_alternative_dns", ["IpAddress"]
+    )
+    op.create_table(
+        "hades_dirty_mac",
+        sa.Column("mac", postgresql.MACADDR(), nullable=False),
+        sa.PrimaryKeyConstraint("mac"),
+    )
+    op.create_table(
+        "hades_change",
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("version", "table_name", "key"),
+    )
+    op.create_table(
+        "hades_sync_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("pruned_version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "full_refresh_needed", sa.Boolean(), server_default="true", nullable=False
+        ),
+        sa.CheckConstraint("id = 1"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # the first refresh fills the tables
+    op.execute("INSERT INTO hades_sync_state (id) VALUES (1)")
+    op.execute("CREATE INDEX ix_interface_mac_text ON interface (text(mac))")
+    op.execute(SQL_FUNCTIONS_CREATE)
+    op.execute(SQL_TRIGGERS_CREATE)
+
+
+def downgrade():
+    op.execute(SQL_TRIGGERS_DROP)
+    op.execute(SQL_FUNCTIONS_DROP)
+    op.drop_index("ix_interface_mac_text", table_name="interface")
+    op.drop_table("hades_sync_state")
+    op.drop_table("hades_change")
+    op.drop_table("hades_dirty_mac")
+    op.drop_table("hades_alternative_dns")
+    op.drop_table("hades_dhcphost")
+    op.drop_table("hades_radgroupreply")
+    op.drop_table("hades_radcheck")
+    op.drop_table("hades_radusergroup")
+
+
+# cf. the DDL objects in `pycroft.model.hades`
+SQL_FUNCTIONS_CREATE = """
+CREATE OR REPLACE FUNCTION hades_mark_all_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE hades_sync_state SET full_refresh_needed = true WHERE NOT full_refresh_needed;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION hades_refresh_table(p_view text, p_table text, p_key text, p_keys text[], p_version bigint) RETURNS integer VOLATILE LANGUAGE plpgsql AS $$
+DECLARE
+    v_changed_keys text[];
+BEGIN
+    -- The keys whose rows differ between the view and the table,
+    -- only looking at `p_keys` unless it is NULL.
+    EXECUTE format($q$
+        WITH fresh AS (
+            SELECT * FROM %1$I WHERE $1 IS NULL OR %3$s = ANY($1)
+        ), stale AS (
+            SELECT * FROM %2$I WHERE $1 IS NULL OR %3$s = ANY($1)
+        )
+        SELECT array_agg(DISTINCT %3$s) FROM (
+            (SELECT * FROM fresh EXCEPT ALL SELECT * FROM stale)
+            UNION ALL
+            (SELECT * FROM stale EXCEPT ALL SELECT * FROM fresh)
+        ) d
+    $q$, p_view, p_table, p_key) INTO v_changed_keys USING p_keys;
+    IF v_changed_keys IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    EXECUTE format('DELETE FROM %2$I WHERE %3$s = ANY($1)', p_view, p_table, p_key)
+        USING v_changed_keys;
+    EXECUTE format('INSERT INTO %2$I SELECT * FROM %1$I WHERE %3$s = ANY($1)',
+                   p_view, p_table, p_key)
+        USING v_changed_keys;
+    INSERT INTO hades_change (version, table_name, key)
+        SELECT p_version, p_view, unnest(v_changed_keys);
+    RETURN cardinality(v_changed_keys);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION hades_refresh() RETURNS bigint VOLATILE LANGUAGE plpgsql AS $$
+DECLARE
+    v_state hades_sync_state;
+    v_macs text[];
+    v_all_or_none text[];
+    v_changed integer;
+BEGIN
+    -- serializes concurrent refreshes
+    SELECT * INTO v_state FROM hades_sync_state FOR UPDATE;
+    WITH taken AS (DELETE FROM hades_dirty_mac RETURNING mac)
+        SELECT coalesce(array_agg(text(mac)), '{}') INTO v_macs FROM taken;
+    IF v_state.full_refresh_needed THEN
+        v_macs := NULL;
+    ELSE
+        v_all_or_none := '{}';
+    END IF;
+
+    v_changed :=
+        hades_refresh_table('radusergroup', 'hades_radusergroup', '"UserName"',
+                            v_macs, v_state.version + 1)
+        + hades_refresh_table('radcheck', 'hades_radcheck', '"UserName"',
+                              v_macs, v_state.version + 1)
+        + hades_refresh_table('dhcphost', 'hades_dhcphost', 'text("Mac")',
+                              v_macs, v_state.version + 1)
+        -- only depends on tables triggering a full refresh
+        + hades_refresh_table('radgroupreply', 'hades_radgroupreply', '"GroupName"',
+                              v_all_or_none, v_state.version + 1)
+        -- keyed by IP addresses, but (almost) empty, so it is compared as a whole
+        + hades_refresh_table('alternative_dns', 'hades_alternative_dns', '"IpAddress"',
+                              NULL, v_state.version + 1);
+
+    IF v_changed = 0 THEN
+        UPDATE hades_sync_state SET full_refresh_needed = false WHERE full_refresh_needed;
+        RETURN v_state.version;
+    END IF;
+    UPDATE hades_sync_state
+        SET version = v_state.version + 1, full_refresh_needed = false;
+    PERFORM pg_notify('hades_change', (v_state.version + 1)::text);
+    RETURN v_state.version + 1;
+END;
+$$;
+"""
+
+SQL_FUNCTIONS_DROP = """
+DROP FUNCTION IF EXISTS hades_refresh();
+DROP FUNCTION IF EXISTS hades_refresh_table(text, text, text, text[], bigint);
+DROP FUNCTION IF EXISTS hades_mark_all_dirty();
+"""
+
+SQL_TRIGGERS_CREATE = """
+CREATE OR REPLACE FUNCTION hades_current_property_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.user_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.user_id);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) 
+        SELECT i.mac FROM host h JOIN interface i ON i.host_id = h.id
+        WHERE h.owner_id = ANY(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_current_property_mark_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON current_property
+    FOR EACH ROW EXECUTE PROCEDURE hades_current_property_mark_dirty();
+
+CREATE OR REPLACE FUNCTION hades_host_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.id);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) SELECT mac FROM interface WHERE host_id = ANY(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_host_mark_dirty_trigger
+    AFTER UPDATE ON host
+    FOR EACH ROW EXECUTE PROCEDURE hades_host_mark_dirty();
+
+CREATE OR REPLACE FUNCTION hades_interface_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys macaddr[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.mac);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.mac);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) SELECT unnest(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_interface_mark_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON interface
+    FOR EACH ROW EXECUTE PROCEDURE hades_interface_mark_dirty();
+
+CREATE OR REPLACE FUNCTION hades_ip_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.interface_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.interface_id);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) SELECT mac FROM interface WHERE id = ANY(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_ip_mark_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON ip
+    FOR EACH ROW EXECUTE PROCEDURE hades_ip_mark_dirty();
+
+CREATE OR REPLACE FUNCTION hades_patch_port_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.room_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.room_id);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) 
+        SELECT i.mac FROM host h JOIN interface i ON i.host_id = h.id
+        WHERE h.room_id = ANY(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_patch_port_mark_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON patch_port
+    FOR EACH ROW EXECUTE PROCEDURE hades_patch_port_mark_dirty();
+
+CREATE OR REPLACE FUNCTION hades_switch_port_mark_dirty() RETURNS trigger VOLATILE STRICT LANGUAGE plpgsql AS $$
+DECLARE
+    v_keys integer[];
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_keys := array_append(v_keys, OLD.id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_keys := array_append(v_keys, NEW.id);
+    END IF;
+    INSERT INTO hades_dirty_mac (mac) 
+        SELECT i.mac FROM patch_port pp
+            JOIN host h ON h.room_id = pp.room_id
+            JOIN interface i ON i.host_id = h.id
+        WHERE pp.switch_port_id = ANY(v_keys) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER hades_switch_port_mark_dirty_trigger
+    AFTER UPDATE ON switch_port
+    FOR EACH ROW EXECUTE PROCEDURE hades_switch_port_mark_dirty();
+
+CREATE TRIGGER hades_switch_mark_all_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON switch
+    FOR EACH ROW EXECUTE PROCEDURE hades_mark_all_dirty();
+
+CREATE TRIGGER hades_vlan_mark_all_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON vlan
+    FOR EACH ROW EXECUTE PROCEDURE hades_mark_all_dirty();
+
+CREATE TRIGGER hades_subnet_mark_all_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON subnet
+    FOR EACH ROW EXECUTE PROCEDURE hades_mark_all_dirty();
+
+CREATE TRIGGER hades_radius_property_mark_all_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON radius_property
+    FOR EACH ROW EXECUTE PROCEDURE hades_mark_all_dirty();
+
+CREATE TRIGGER hades_radgroupreply_base_mark_all_dirty_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON radgroupreply_base
+    FOR EACH ROW EXECUTE PROCEDURE hades_mark_all_dirty();
+"""
+
+SQL_TRIGGERS_DROP = """
+DROP TRIGGER IF EXISTS hades_current_property_mark_dirty_trigger ON current_property;
+DROP FUNCTION IF EXISTS hades_current_property_mark_dirty();
+DROP TRIGGER IF EXISTS hades_host_mark_dirty_trigger ON host;
+DROP FUNCTION IF EXISTS hades_host_mark_dirty();
+DROP TRIGGER IF EXISTS hades_interface_mark_dirty_trigger ON interface;
+DROP FUNCTION IF EXISTS hades_interface_mark_dirty();
+DROP TRIGGER IF EXISTS hades_ip_mark_dirty_trigger ON ip;
+DROP FUNCTION IF EXISTS hades_ip_mark_dirty();
+DROP TRIGGER IF EXISTS hades_patch_port_mark_dirty_trigger ON patch_port;
+DROP FUNCTION IF EXISTS hades_patch_port_mark_dirty();
+DROP TRIGGER IF EXISTS hades_switch_port_mark_dirty_trigger ON switch_port;
+DROP FUNCTION IF EXISTS hades_switch_port_mark_dirty();
+DROP TRIGGER IF EXISTS hades_switch_mark_all_dirty_trigger ON switch;
+DROP TRIGGER IF EXISTS hades_vlan_mark_all_dirty_trigger ON vlan;
+DROP TRIGGER IF EXISTS hades_subnet_mark_all_dirty_trigger ON subnet;
+DROP TRIGGER IF EXISTS hades_radius_property_mark_all_dirty_trigger ON radius_property;
+DROP TRIGGER IF EXISTS hades_radgroupreply_base_mark_all_dirty_trigger ON radgroupreply_base;
+"""
@@ -0,0 +1,56 @@
+"""add traffic top refresh
+
+Revision ID: 7d2e4b9c1a53
+Revises: 5e9c2b7f3a61
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7d2e4b9c1a53"
+down_revision = "5e9c2b7f3a61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "traffic_top_refresh",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("days", sa.Integer(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint("id = 1"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        "INSERT INTO traffic_top_refresh (id, days, computed_at)"
+        " SELECT 1, days, computed_at FROM traffic_top_user ORDER BY rank LIMIT 1"
+    )
+    op.drop_column("traffic_top_user", "computed_at")
+    op.drop_column("traffic_top_user", "days")
+
+
+def downgrade():
+    op.add_column(
+        "traffic_top_user",
+        sa.Column("days", sa.Integer(), server_default="7", nullable=False),
+    )
+    op.add_column(
+        "traffic_top_user",
+        sa.Column(
+            "computed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        "UPDATE traffic_top_user SET days = r.days, computed_at = r.computed_at"
+        " FROM traffic_top_refresh r"
+    )
+    op.alter_column("traffic_top_user", "days", server_default=None)
+    op.alter_column("traffic_top_user", "computed_at", server_default=None)
+    op.drop_table("traffic_top_refresh")
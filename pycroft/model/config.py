@@ -6,7 +6,7 @@ pycroft.model.config
 ~~~~~~~~~~~~~~~~~~~~
 """
 import typing as t
-from sqlalchemy import CheckConstraint, ForeignKey
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKey
 from sqlalchemy.orm import relationship, Mapped, mapped_column as col
 
 from pycroft.model.base import IntegerIdModel
@@ -79,4 +79,14 @@ class Config(IntegerIdModel):
 
     fints_product_id: Mapped[str | None]
 
+    #: the window (in days) and the number of users of the traffic leaderboard,
+    #: see :func:`pycroft.lib.traffic.refresh_traffic_leaderboard`
+    traffic_top_days: Mapped[int] = col(server_default="7")
+    traffic_top_limit: Mapped[int] = col(server_default="20")
+
+    #: the traffic (in bytes) a user may cause within the rolling quota window
+    #: before being made a member of the `traffic_limit_exceeded_group`,
+    #: see :func:`pycroft.lib.traffic.evaluate_traffic_quota`.  `None` disables the quota.
+    traffic_limit: Mapped[int | None] = col(BigInteger)
+
     __table_args__ = (CheckConstraint("id = 1"),)
@@ -12,7 +12,7 @@ from datetime import timedelta, date
 from decimal import Decimal
 from math import fabs
 
-from sqlalchemy import ForeignKey, event, func, select, Enum, ColumnElement, Select
+from sqlalchemy import ForeignKey, Index, event, func, select, Enum, ColumnElement, Select
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship, object_session, Mapped, mapped_column
 from sqlalchemy.schema import CheckConstraint, ForeignKeyConstraint, UniqueConstraint
@@ -22,7 +22,7 @@ from pycroft.helpers.i18n import gettext
 from pycroft.helpers.interval import closed
 from pycroft.model import ddl
 from pycroft.model.types import Money
-from .base import IntegerIdModel
+from .base import IntegerIdModel, ModelBase
 from .exc import PycroftModelException
 from .type_aliases import str127, str255, datetime_tz_onupdate
 from ..helpers import utc
@@ -137,13 +137,21 @@ class Account(IntegerIdModel):
 
     @hybrid_property
     def _balance(self) -> int:
-        return sum(s.amount for s in self.splits)
+        session = object_session(self)
+        if session is None or self.id is None:
+            return sum(s.amount for s in self.splits)
+        return session.scalar(
+            select(AccountBalance.balance).where(AccountBalance.account_id == self.id)
+        ) or 0
 
     @_balance.expression
     def balance(cls) -> ColumnElement[int]:
-        return select(func.coalesce(func.sum(Split.amount), 0))\
-            .where(Split.account_id == cls.id)\
-            .label("balance")
+        return func.coalesce(
+            select(AccountBalance.balance)
+            .where(AccountBalance.account_id == cls.id)
+            .scalar_subquery(),
+            0,
+        ).label("balance")
 
     @property
     def in_default_days(self):
@@ -252,6 +260,53 @@ class Split(IntegerIdModel):
     # /backrefs
 
 
+class AccountBalance(ModelBase):
+    """The sum of the splits of an account.
+
+    This is maintained by a trigger on `split`
+    (see `split_update_account_balance_function`),
+    so reading the balance of an account does not need to sum up its splits.
+    Accounts without splits may not have a row.
+    """
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey(Account.id, ondelete="CASCADE"), primary_key=True
+    )
+    balance: Mapped[int] = mapped_column(Money, server_default="0")
+
+
+account_balance = AccountBalance.__table__
+# the trigger is attached to `split`, so it must be created after it
+account_balance.add_is_dependent_on(Split.__table__)
+
+split_update_account_balance_function = ddl.Function(
+    'split_update_account_balance', [], 'trigger',
+    """
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            -- if the account itself is being deleted, the row is already gone
+            UPDATE account_balance SET balance = balance - OLD.amount
+                WHERE account_id = OLD.account_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO account_balance AS b (account_id, balance)
+                VALUES (NEW.account_id, NEW.amount)
+                ON CONFLICT (account_id)
+                DO UPDATE SET balance = b.balance + EXCLUDED.balance;
+        END IF;
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(account_balance, split_update_account_balance_function)
+manager.add_trigger(account_balance, ddl.Trigger(
+    'split_update_account_balance_trigger',
+    Split.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'split_update_account_balance()',
+))
+
+
 manager.add_function(
     Split.__table__,
     ddl.Function(
@@ -431,6 +486,12 @@ class BankAccountActivity(IntegerIdModel):
                              onupdate='CASCADE',
                              ondelete='SET NULL'),
         UniqueConstraint(transaction_id, account_id),
+        # supports finding already imported activities,
+        # see `pycroft.lib.finance.transaction_crud.find_known_activities`
+        Index(
+            "ix_bank_account_activity_bank_account_id_valid_on_amount",
+            "bank_account_id", "valid_on", "amount",
+        ),
     )
 
 
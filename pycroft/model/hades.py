@@ -18,9 +18,16 @@ from sqlalchemy import (
     select,
     case,
     cast,
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    DDL,
+    Index,
+    event,
 )
 from sqlalchemy.orm import Query, aliased, configure_mappers
 
+from pycroft.model import ddl
 from pycroft.model.base import ModelBase
 from pycroft.model.ddl import DDLManager, View
 from pycroft.model.facilities import Room
@@ -28,6 +35,7 @@ from pycroft.model.host import Interface, Switch, SwitchPort, Host, IP
 from pycroft.model.net import VLAN, Subnet
 from pycroft.model.port import PatchPort
 from pycroft.model.property import current_property, CurrentProperty
+from pycroft.model.types import MACAddress
 from pycroft.model.user import User
 
 # we need backref attributes to be accessible for view queries,
@@ -37,10 +45,10 @@ hades_view_ddl = DDLManager()
 
 network_access_subq = (
     # Select `user_id, 1` for all people with network_access
-    Query([current_property.table.c.user_id.label('user_id'),
+    Query([current_property.c.user_id.label('user_id'),
            literal(1).label('network_access')])
-    .filter(and_(current_property.table.c.property_name == 'network_access',
-                 ~current_property.table.c.denied))
+    .filter(and_(current_property.c.property_name == 'network_access',
+                 ~current_property.c.denied))
     .subquery('users_with_network_access')
 )
 
@@ -64,6 +72,7 @@ radius_property.add_is_dependent_on(Host.__table__)
 radius_property.add_is_dependent_on(VLAN.__table__)
 radius_property.add_is_dependent_on(Subnet.__table__)
 radius_property.add_is_dependent_on(User.__table__)
+radius_property.add_is_dependent_on(current_property)
 
 radusergroup = View(
     name='radusergroup',
@@ -340,3 +349,282 @@ alternative_dns = View(
 hades_view_ddl.add_view(ModelBase.metadata, alternative_dns)
 
 hades_view_ddl.register()
+
+
+# Materialized copies of the views above, which Hades can sync incrementally:
+# every refresh (see `hades_refresh`) which changes something bumps the version
+# in `hades_sync_state` and records the keys of the changed rows in `hades_change`.
+# The rows of a key (the MAC for `radusergroup`, `radcheck` and `dhcphost`)
+# are always replaced as a whole, so a client re-reads all rows of a changed key.
+hades_ddl = DDLManager()
+
+hades_radusergroup = Table(
+    "hades_radusergroup",
+    ModelBase.metadata,
+    Column("UserName", Text, nullable=False, index=True),
+    Column("NASIPAddress", Text),
+    Column("NASPortId", String),
+    Column("GroupName", Text, nullable=False),
+    Column("Priority", Integer, nullable=False),
+)
+
+hades_radcheck = Table(
+    "hades_radcheck",
+    ModelBase.metadata,
+    Column("UserName", Text, nullable=False, index=True),
+    Column("NASIPAddress", Text),
+    Column("NASPortId", String),
+    Column("Attribute", Text, nullable=False),
+    Column("Op", Text, nullable=False),
+    Column("Value", Text),
+    Column("Priority", Integer, nullable=False),
+)
+
+hades_radgroupreply = Table(
+    "hades_radgroupreply",
+    ModelBase.metadata,
+    Column("GroupName", Text, nullable=False, index=True),
+    Column("Attribute", Text, nullable=False),
+    Column("Op", Text, nullable=False),
+    Column("Value", Text, nullable=False),
+)
+
+hades_dhcphost = Table(
+    "hades_dhcphost",
+    ModelBase.metadata,
+    Column("Mac", MACAddress, nullable=False, index=True),
+    Column("IpAddress", Text, nullable=False),
+    Column("HostName", Text),
+)
+
+hades_alternative_dns = Table(
+    "hades_alternative_dns",
+    ModelBase.metadata,
+    Column("IpAddress", Text, nullable=False, index=True),
+)
+
+#: The MACs whose rows have to be refreshed, marked by the triggers below
+hades_dirty_mac = Table(
+    "hades_dirty_mac",
+    ModelBase.metadata,
+    Column("mac", MACAddress, primary_key=True),
+)
+
+hades_change = Table(
+    "hades_change",
+    ModelBase.metadata,
+    Column("version", BigInteger, primary_key=True),
+    Column("table_name", Text, primary_key=True),
+    Column("key", Text, primary_key=True),
+    Column(
+        "changed_at", DateTime(timezone=True), nullable=False, server_default=func.now()
+    ),
+)
+
+hades_sync_state = Table(
+    "hades_sync_state",
+    ModelBase.metadata,
+    Column("id", Integer, primary_key=True),
+    #: the version of the materialized tables
+    Column("version", BigInteger, nullable=False, server_default="0"),
+    #: the changes up to this version have been pruned from `hades_change`
+    Column("pruned_version", BigInteger, nullable=False, server_default="0"),
+    #: set by changes whose effect cannot be narrowed down to some MACs
+    Column("full_refresh_needed", Boolean, nullable=False, server_default="true"),
+    CheckConstraint("id = 1"),
+)
+event.listen(
+    hades_sync_state,
+    "after_create",
+    DDL("INSERT INTO hades_sync_state (id) VALUES (1)").execute_if(dialect="postgresql"),
+)
+# the triggers are attached to this table, so it must be created after their targets
+for _table in (
+    hades_dirty_mac, hades_change, current_property, Interface.__table__,
+    IP.__table__, Host.__table__, PatchPort.__table__, SwitchPort.__table__,
+    Switch.__table__, VLAN.__table__, Subnet.__table__, radius_property,
+    radgroupreply_base,
+):
+    hades_sync_state.add_is_dependent_on(_table)
+
+# `radusergroup`, `radcheck` and `dhcphost` are filtered by the text of the MAC
+Index("ix_interface_mac_text", func.text(Interface.mac))
+
+
+def _mark_dirty_function(name: str, column: str, column_type: str, macs: str) -> ddl.Function:
+    """A trigger function marking the MACs affected by a changed row as dirty.
+
+    :param column: the column of the changed row the MACs depend on
+    :param macs: a query selecting the affected MACs given the array ``v_keys``
+        of the values of `column` in the old and the new row
+    """
+    return ddl.Function(
+        name, [], 'trigger',
+        definition=f"""
+        DECLARE
+            v_keys {column_type}[];
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                v_keys := array_append(v_keys, OLD.{column});
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                v_keys := array_append(v_keys, NEW.{column});
+            END IF;
+            INSERT INTO hades_dirty_mac (mac) {macs} ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END;
+        """,
+        volatility='volatile', strict=True, language='plpgsql',
+    )
+
+
+_macs_of_owners = """
+    SELECT i.mac FROM host h JOIN interface i ON i.host_id = h.id
+    WHERE h.owner_id = ANY(v_keys)"""
+_macs_of_hosts = "SELECT mac FROM interface WHERE host_id = ANY(v_keys)"
+_macs_of_interfaces = "SELECT mac FROM interface WHERE id = ANY(v_keys)"
+_macs_in_rooms = """
+    SELECT i.mac FROM host h JOIN interface i ON i.host_id = h.id
+    WHERE h.room_id = ANY(v_keys)"""
+_macs_at_switch_ports = """
+    SELECT i.mac FROM patch_port pp
+        JOIN host h ON h.room_id = pp.room_id
+        JOIN interface i ON i.host_id = h.id
+    WHERE pp.switch_port_id = ANY(v_keys)"""
+
+for _table, _events, _column, _column_type, _macs in [
+    (current_property, ('INSERT', 'UPDATE', 'DELETE'), 'user_id', 'integer', _macs_of_owners),
+    # deleting a host deletes its interfaces, and a new host has none yet
+    (Host.__table__, ('UPDATE',), 'id', 'integer', _macs_of_hosts),
+    (Interface.__table__, ('INSERT', 'UPDATE', 'DELETE'), 'mac', 'macaddr',
+     "SELECT unnest(v_keys)"),
+    (IP.__table__, ('INSERT', 'UPDATE', 'DELETE'), 'interface_id', 'integer',
+     _macs_of_interfaces),
+    (PatchPort.__table__, ('INSERT', 'UPDATE', 'DELETE'), 'room_id', 'integer',
+     _macs_in_rooms),
+    # deleting a switch port updates or deletes its patch port
+    (SwitchPort.__table__, ('UPDATE',), 'id', 'integer', _macs_at_switch_ports),
+]:
+    _function = _mark_dirty_function(
+        f"hades_{_table.name}_mark_dirty", _column, _column_type, _macs
+    )
+    hades_ddl.add_function(hades_sync_state, _function)
+    hades_ddl.add_trigger(hades_sync_state, ddl.Trigger(
+        f"hades_{_table.name}_mark_dirty_trigger",
+        _table,
+        _events,
+        f"hades_{_table.name}_mark_dirty()",
+    ))
+
+hades_mark_all_dirty_function = ddl.Function(
+    'hades_mark_all_dirty', [], 'trigger',
+    definition="""
+    BEGIN
+        UPDATE hades_sync_state SET full_refresh_needed = true WHERE NOT full_refresh_needed;
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+hades_ddl.add_function(hades_sync_state, hades_mark_all_dirty_function)
+# changes to these affect the rows of many MACs, but happen rarely
+for _table in (Switch.__table__, VLAN.__table__, Subnet.__table__,
+               radius_property, radgroupreply_base):
+    hades_ddl.add_trigger(hades_sync_state, ddl.Trigger(
+        f"hades_{_table.name}_mark_all_dirty_trigger",
+        _table,
+        ('INSERT', 'UPDATE', 'DELETE'),
+        'hades_mark_all_dirty()',
+    ))
+
+hades_refresh_table_function = ddl.Function(
+    'hades_refresh_table',
+    ['p_view text', 'p_table text', 'p_key text', 'p_keys text[]', 'p_version bigint'],
+    'integer',
+    definition="""
+    DECLARE
+        v_changed_keys text[];
+    BEGIN
+        -- The keys whose rows differ between the view and the table,
+        -- only looking at `p_keys` unless it is NULL.
+        EXECUTE format($q$
+            WITH fresh AS (
+                SELECT * FROM %%1$I WHERE $1 IS NULL OR %%3$s = ANY($1)
+            ), stale AS (
+                SELECT * FROM %%2$I WHERE $1 IS NULL OR %%3$s = ANY($1)
+            )
+            SELECT array_agg(DISTINCT %%3$s) FROM (
+                (SELECT * FROM fresh EXCEPT ALL SELECT * FROM stale)
+                UNION ALL
+                (SELECT * FROM stale EXCEPT ALL SELECT * FROM fresh)
+            ) d
+        $q$, p_view, p_table, p_key) INTO v_changed_keys USING p_keys;
+        IF v_changed_keys IS NULL THEN
+            RETURN 0;
+        END IF;
+
+        EXECUTE format('DELETE FROM %%2$I WHERE %%3$s = ANY($1)', p_view, p_table, p_key)
+            USING v_changed_keys;
+        EXECUTE format('INSERT INTO %%2$I SELECT * FROM %%1$I WHERE %%3$s = ANY($1)',
+                       p_view, p_table, p_key)
+            USING v_changed_keys;
+        INSERT INTO hades_change (version, table_name, key)
+            SELECT p_version, p_view, unnest(v_changed_keys);
+        RETURN cardinality(v_changed_keys);
+    END;
+    """,
+    volatility='volatile', language='plpgsql',
+)
+hades_ddl.add_function(hades_sync_state, hades_refresh_table_function)
+
+hades_refresh_function = ddl.Function(
+    'hades_refresh', [], 'bigint',
+    definition="""
+    DECLARE
+        v_state hades_sync_state;
+        v_macs text[];
+        v_all_or_none text[];
+        v_changed integer;
+    BEGIN
+        -- serializes concurrent refreshes
+        SELECT * INTO v_state FROM hades_sync_state FOR UPDATE;
+        WITH taken AS (DELETE FROM hades_dirty_mac RETURNING mac)
+            SELECT coalesce(array_agg(text(mac)), '{}') INTO v_macs FROM taken;
+        IF v_state.full_refresh_needed THEN
+            v_macs := NULL;
+        ELSE
+            v_all_or_none := '{}';
+        END IF;
+
+        v_changed :=
+            hades_refresh_table('radusergroup', 'hades_radusergroup', '"UserName"',
+                                v_macs, v_state.version + 1)
+            + hades_refresh_table('radcheck', 'hades_radcheck', '"UserName"',
+                                  v_macs, v_state.version + 1)
+            + hades_refresh_table('dhcphost', 'hades_dhcphost', 'text("Mac")',
+                                  v_macs, v_state.version + 1)
+            -- only depends on tables triggering a full refresh
+            + hades_refresh_table('radgroupreply', 'hades_radgroupreply', '"GroupName"',
+                                  v_all_or_none, v_state.version + 1)
+            -- keyed by IP addresses, but (almost) empty, so it is compared as a whole
+            + hades_refresh_table('alternative_dns', 'hades_alternative_dns', '"IpAddress"',
+                                  NULL, v_state.version + 1);
+
+        IF v_changed = 0 THEN
+            UPDATE hades_sync_state SET full_refresh_needed = false WHERE full_refresh_needed;
+            RETURN v_state.version;
+        END IF;
+        UPDATE hades_sync_state
+            SET version = v_state.version + 1, full_refresh_needed = false;
+        PERFORM pg_notify('hades_change', (v_state.version + 1)::text);
+        RETURN v_state.version + 1;
+    END;
+    """,
+    volatility='volatile', language='plpgsql',
+)
+hades_ddl.add_function(hades_sync_state, hades_refresh_function)
+
+hades_ddl.register()
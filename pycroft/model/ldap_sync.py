@@ -0,0 +1,198 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""
+pycroft.model.ldap_sync
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Bookkeeping for the incremental mode of the ldap syncer (see :mod:`ldap_sync`).
+
+Triggers record the users, groups and properties whose LDAP entries might have
+changed in the :class:`LdapSyncJournal`, which is consumed by the syncer.
+"""
+import typing as t
+
+from sqlalchemy import BigInteger, CheckConstraint, Enum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from pycroft.model import ddl
+from pycroft.model.base import ModelBase, IntegerIdModel
+from pycroft.model.property import current_property
+from pycroft.model.type_aliases import str255, datetime_tz
+from pycroft.model.unix_account import UnixAccount
+from pycroft.model.user import User, Group, Membership
+
+manager = ddl.DDLManager()
+
+LdapEntryKind = t.Literal["user", "group", "property"]
+
+
+class LdapSyncJournal(ModelBase):
+    """A user, group or property whose LDAP entry might have changed."""
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[LdapEntryKind] = mapped_column(
+        Enum(*LdapEntryKind.__args__, name="ldap_entry_kind")
+    )
+    #: the login of the user, or the name of the group or property
+    name: Mapped[str255]
+    changed_at: Mapped[datetime_tz]
+
+
+class LdapSyncState(IntegerIdModel):
+    """The high-water mark of the ldap syncer.
+
+    There is at most one row, which records up to which point in time
+    changes have been synced.
+    """
+    synced_until: Mapped[datetime_tz]
+
+    __table_args__ = (CheckConstraint("id = 1"),)
+
+
+ldap_sync_journal = LdapSyncJournal.__table__
+# the triggers are attached to these tables, so the journal must be created after them
+for _table in (User.__table__, UnixAccount.__table__, Group.__table__,
+               Membership.__table__, current_property):
+    ldap_sync_journal.add_is_dependent_on(_table)
+
+user_ldap_sync_journal_function = ddl.Function(
+    'user_ldap_sync_journal', [], 'trigger',
+    definition="""
+    BEGIN
+        -- only columns which are exported to LDAP are of interest
+        IF TG_OP = 'UPDATE'
+            AND (NEW.login, NEW.name, NEW.email, NEW.email_forwarded,
+                 NEW.passwd_hash, NEW.unix_account_id)
+            IS NOT DISTINCT FROM (OLD.login, OLD.name, OLD.email, OLD.email_forwarded,
+                                  OLD.passwd_hash, OLD.unix_account_id)
+        THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO ldap_sync_journal (kind, name) VALUES ('user', OLD.login);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO ldap_sync_journal (kind, name) VALUES ('user', NEW.login);
+        END IF;
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(ldap_sync_journal, user_ldap_sync_journal_function)
+manager.add_trigger(ldap_sync_journal, ddl.Trigger(
+    'user_ldap_sync_journal_trigger',
+    User.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'user_ldap_sync_journal()',
+))
+
+unix_account_ldap_sync_journal_function = ddl.Function(
+    'unix_account_ldap_sync_journal', [], 'trigger',
+    definition="""
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO ldap_sync_journal (kind, name)
+            SELECT 'user', u.login FROM "user" u
+            WHERE u.unix_account_id = CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END;
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(ldap_sync_journal, unix_account_ldap_sync_journal_function)
+manager.add_trigger(ldap_sync_journal, ddl.Trigger(
+    'unix_account_ldap_sync_journal_trigger',
+    UnixAccount.__table__,
+    ('UPDATE', 'DELETE'),
+    'unix_account_ldap_sync_journal()',
+))
+
+group_ldap_sync_journal_function = ddl.Function(
+    'group_ldap_sync_journal', [], 'trigger',
+    definition="""
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.name IS NOT DISTINCT FROM OLD.name THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO ldap_sync_journal (kind, name) VALUES ('group', OLD.name);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO ldap_sync_journal (kind, name) VALUES ('group', NEW.name);
+        END IF;
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(ldap_sync_journal, group_ldap_sync_journal_function)
+manager.add_trigger(ldap_sync_journal, ddl.Trigger(
+    'group_ldap_sync_journal_trigger',
+    Group.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'group_ldap_sync_journal()',
+))
+
+membership_ldap_sync_journal_function = ddl.Function(
+    'membership_ldap_sync_journal', [], 'trigger',
+    definition="""
+    DECLARE
+        v_group_ids integer[];
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            v_group_ids := array_append(v_group_ids, OLD.group_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            v_group_ids := array_append(v_group_ids, NEW.group_id);
+        END IF;
+        INSERT INTO ldap_sync_journal (kind, name)
+            SELECT 'group', g.name FROM "group" g WHERE g.id = ANY(v_group_ids);
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(ldap_sync_journal, membership_ldap_sync_journal_function)
+manager.add_trigger(ldap_sync_journal, ddl.Trigger(
+    'membership_ldap_sync_journal_trigger',
+    Membership.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'membership_ldap_sync_journal()',
+))
+
+current_property_ldap_sync_journal_function = ddl.Function(
+    'current_property_ldap_sync_journal', [], 'trigger',
+    definition="""
+    DECLARE
+        v_row current_property;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            v_row := OLD;
+        ELSE
+            v_row := NEW;
+        END IF;
+        -- the user is affected as well, because the required property
+        -- and `ldap_login_enabled` determine how the user is exported
+        INSERT INTO ldap_sync_journal (kind, name)
+            SELECT 'user', u.login FROM "user" u WHERE u.id = v_row.user_id;
+        INSERT INTO ldap_sync_journal (kind, name) VALUES ('property', v_row.property_name);
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(ldap_sync_journal, current_property_ldap_sync_journal_function)
+manager.add_trigger(ldap_sync_journal, ddl.Trigger(
+    'current_property_ldap_sync_journal_trigger',
+    current_property,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'current_property_ldap_sync_journal()',
+))
+
+manager.register()
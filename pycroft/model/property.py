@@ -10,42 +10,65 @@ This module contains model descriptions concerning properties, groups, and membe
 """
 from datetime import datetime
 
-from sqlalchemy import and_, func, union, literal, literal_column, select
-from sqlalchemy.orm import Query, Mapped
-from sqlalchemy.sql.selectable import TableValuedAlias
+from sqlalchemy import (
+    CheckConstraint,
+    and_,
+    func,
+    union,
+    literal,
+    literal_column,
+    ForeignKey,
+    Index,
+    ColumnElement,
+)
+from sqlalchemy.orm import Query, Mapped, mapped_column
+from sqlalchemy.sql.selectable import TableValuedAlias, CompoundSelect
 
 from pycroft.model import ddl
-from .base import ModelBase
-from .ddl import View, DDLManager
+from .base import ModelBase, IntegerIdModel
+from .ddl import DDLManager
+from .type_aliases import str255, datetime_tz
 from .user import User, Property, Membership, PropertyGroup
 
 manager = DDLManager()
 
-property_query_stmt = union(
-    Query([User.id.label('user_id'), Property.name.label('property_name'),
-           literal(False).label('denied')])
-    .select_from(Membership)
-    .join(PropertyGroup)
-    .join(User)
-    .filter(Membership.active_during.contains(literal_column('evaluation_time')))
-    .join(Property)
-    .group_by(User.id, Property.name)
-    .having(func.every(Property.granted))
-    .statement,
-
-    Query([User.id.label('user_id'), Property.name.label('property_name'),
-           literal(True).label('denied')])
-    .select_from(Membership)
-    .join(PropertyGroup)
-    .join(User)
-    .filter(Membership.active_during.contains(literal_column('evaluation_time')))
-    .join(Property)
-    .group_by(User.id, Property.name)
-    # granted by ≥1 membership, but also denied by ≥1 membership
-    # NB: this does NOT include properties in the list that were ONLY denied, but never granted!
-    .having(and_(func.bool_or(Property.granted), ~func.every(Property.granted)))
-    .statement,
-)
+
+def property_query(*criteria: ColumnElement[bool]) -> CompoundSelect:
+    """The query evaluating the properties of users at ``evaluation_time``.
+
+    :param criteria: additional criteria restricting the memberships which are
+        taken into account, e.g. to evaluate the properties of specific users only.
+    """
+    return union(
+        Query([User.id.label('user_id'), Property.name.label('property_name'),
+               literal(False).label('denied')])
+        .select_from(Membership)
+        .join(PropertyGroup)
+        .join(User)
+        .filter(Membership.active_during.contains(literal_column('evaluation_time')),
+                *criteria)
+        .join(Property)
+        .group_by(User.id, Property.name)
+        .having(func.every(Property.granted))
+        .statement,
+
+        Query([User.id.label('user_id'), Property.name.label('property_name'),
+               literal(True).label('denied')])
+        .select_from(Membership)
+        .join(PropertyGroup)
+        .join(User)
+        .filter(Membership.active_during.contains(literal_column('evaluation_time')),
+                *criteria)
+        .join(Property)
+        .group_by(User.id, Property.name)
+        # granted by ≥1 membership, but also denied by ≥1 membership
+        # NB: this does NOT include properties in the list that were ONLY denied, but never granted!
+        .having(and_(func.bool_or(Property.granted), ~func.every(Property.granted)))
+        .statement,
+    )
+
+
+property_query_stmt = property_query()
 
 evaluate_properties_function = ddl.Function(
     'evaluate_properties', ['evaluation_time timestamp with time zone'],
@@ -59,6 +82,19 @@ manager.add_function(
     evaluate_properties_function
 )
 
+evaluate_users_properties_function = ddl.Function(
+    'evaluate_users_properties',
+    ['evaluation_time timestamp with time zone', 'user_ids integer[]'],
+    'TABLE (user_id INT, property_name VARCHAR(255), denied BOOLEAN)',
+    definition=property_query(Membership.user_id == func.any(literal_column('user_ids'))),
+    volatility='stable',
+)
+
+manager.add_function(
+    Membership.__table__,
+    evaluate_users_properties_function
+)
+
 
 def evaluate_properties(when: datetime | None = None, name='properties') -> TableValuedAlias:
     """A sqlalchemy `func` wrapper for the `evaluate_properties` PSQL function.
@@ -69,30 +105,150 @@ def evaluate_properties(when: datetime | None = None, name='properties') -> Tabl
         .table_valued('user_id', 'property_name', 'denied', name=name)
 
 
-_current_props = evaluate_properties(func.current_timestamp())
-current_property = View(
-    name='current_property',
-    #metadata=ModelBase.metadata,
-    query=(
-        select(_current_props.c.user_id,
-               _current_props.c.property_name,
-               _current_props.c.denied)
-        .select_from(_current_props)
+class CurrentProperty(ModelBase):
+    """The result of `evaluate_properties` at the current point in time.
+
+    In contrast to `evaluate_properties`, this is a physical table,
+    so reading the properties of a user is a simple index lookup.
+    It is kept up to date by triggers on `membership` and `property`
+    (see `refresh_current_properties_function`).
+    Memberships starting or ending as time passes are not caught by these triggers;
+    they are applied by :func:`pycroft.lib.membership.refresh_properties_at_boundaries`,
+    which is executed periodically.
+    """
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey(User.id, ondelete="CASCADE"), primary_key=True
+    )
+    property_name: Mapped[str255] = mapped_column(primary_key=True)
+    denied: Mapped[bool]
+
+    __table_args__ = (
+        Index('ix_current_property_property_name', 'property_name'),
+    )
+
+
+current_property = CurrentProperty.__table__
+# the triggers are attached to this table, so it must be created after their targets
+current_property.add_is_dependent_on(Membership.__table__)
+current_property.add_is_dependent_on(Property.__table__)
+
+_refresh_current_properties_query = """
+        WITH evaluated AS (
+            SELECT user_id, property_name, denied FROM {evaluation}
+        ), deleted AS (
+            DELETE FROM current_property cp
+            WHERE {scope} AND NOT EXISTS (
+                SELECT FROM evaluated e
+                WHERE e.user_id = cp.user_id AND e.property_name = cp.property_name
+            )
+            RETURNING cp.user_id
+        ), upserted AS (
+            INSERT INTO current_property AS cp (user_id, property_name, denied)
+            SELECT user_id, property_name, denied FROM evaluated
+            ON CONFLICT (user_id, property_name) DO UPDATE SET denied = EXCLUDED.denied
+                WHERE cp.denied IS DISTINCT FROM EXCLUDED.denied
+            RETURNING cp.user_id
+        )
+        SELECT user_id FROM deleted UNION SELECT user_id FROM upserted"""
+
+refresh_current_properties_function = ddl.Function(
+    'refresh_current_properties', ['user_ids integer[]'], 'SETOF integer',
+    definition="""
+    BEGIN
+        -- Only rows which actually change are written, and only the ids of users
+        -- whose properties changed are returned.
+        IF user_ids IS NULL THEN
+            RETURN QUERY {refresh_all};
+        ELSE
+            RETURN QUERY {refresh_users};
+        END IF;
+    END;
+    """.format(
+        refresh_all=_refresh_current_properties_query.format(
+            evaluation="evaluate_properties(current_timestamp)",
+            scope="TRUE",
+        ),
+        refresh_users=_refresh_current_properties_query.format(
+            evaluation="evaluate_users_properties(current_timestamp, user_ids)",
+            scope="cp.user_id = ANY(user_ids)",
+        ),
     ),
+    volatility='volatile', language='plpgsql',
+)
+manager.add_function(current_property, refresh_current_properties_function)
+
+membership_refresh_current_properties_function = ddl.Function(
+    'membership_refresh_current_properties', [], 'trigger',
+    definition="""
+    DECLARE
+        v_user_ids integer[];
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            v_user_ids := array_append(v_user_ids, OLD.user_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            v_user_ids := array_append(v_user_ids, NEW.user_id);
+        END IF;
+        PERFORM refresh_current_properties(v_user_ids);
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
+)
+manager.add_function(current_property, membership_refresh_current_properties_function)
+manager.add_trigger(current_property, ddl.Trigger(
+    'membership_refresh_current_properties_trigger',
+    Membership.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'membership_refresh_current_properties()',
+))
+
+property_refresh_current_properties_function = ddl.Function(
+    'property_refresh_current_properties', [], 'trigger',
+    definition="""
+    DECLARE
+        v_group_ids integer[];
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            v_group_ids := array_append(v_group_ids, OLD.property_group_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            v_group_ids := array_append(v_group_ids, NEW.property_group_id);
+        END IF;
+        PERFORM refresh_current_properties(array(
+            SELECT DISTINCT m.user_id FROM membership m
+            WHERE m.group_id = ANY(v_group_ids)
+              AND m.active_during @> current_timestamp
+        ));
+        RETURN NULL;
+    END;
+    """,
+    volatility='volatile', strict=True, language='plpgsql',
 )
-manager.add_view(Membership.__table__, current_property)
+manager.add_function(current_property, property_refresh_current_properties_function)
+manager.add_trigger(current_property, ddl.Trigger(
+    'property_refresh_current_properties_trigger',
+    Property.__table__,
+    ('INSERT', 'UPDATE', 'DELETE'),
+    'property_refresh_current_properties()',
+))
 
 
-class CurrentProperty(ModelBase):
-    __table__ = current_property.table
-    __mapper_args__ = {
-        'primary_key': (current_property.table.c.user_id,
-                        current_property.table.c.property_name),
-    }
-
-    user_id: Mapped[int]
-    property_name: Mapped[str]
-    denied: Mapped[bool]
+class CurrentPropertyRefresh(IntegerIdModel):
+    """Bookkeeping for the periodic refresh of `current_property`.
+
+    There is at most one row, which tracks up to which point in time
+    the beginnings and ends of memberships have been applied.
+    """
+    refreshed_until: Mapped[datetime_tz]
+
+    __table_args__ = (CheckConstraint("id = 1"),)
 
 
 manager.register()
@@ -18,7 +18,7 @@ from sqlalchemy.sql.functions import AnsiFunction
 from werkzeug.local import LocalProxy
 import wrapt
 
-from sqlalchemy import func, orm
+from sqlalchemy import event, func, orm, select
 
 from pycroft.helpers.utc import DateTimeTz
 
@@ -74,8 +74,26 @@ def with_transaction(wrapped, instance, args, kwargs):
         raise
 
 
+#: the key in `Session.info` caching the result of :func:`utcnow`
+_UTCNOW = "utcnow"
+
+
 def utcnow() -> DateTimeTz:
-    return session.query(func.current_timestamp()).scalar()
+    """The start time of the current transaction, i.e. ``current_timestamp``.
+
+    As the value does not change within a transaction, it is only fetched
+    from the database once per transaction.
+    """
+    if (now := session.info.get(_UTCNOW)) is None:
+        now = session.info[_UTCNOW] = session.scalar(select(func.current_timestamp()))
+    return t.cast(DateTimeTz, now)
+
+
+@event.listens_for(orm.Session, "after_transaction_end")
+def _reset_utcnow(session: orm.Session, transaction: orm.SessionTransaction) -> None:
+    # savepoints share the time of the surrounding transaction
+    if transaction.parent is None:
+        session.info.pop(_UTCNOW, None)
 
 
 def current_timestamp() -> AnsiFunction[DateTimeTz]:
@@ -6,10 +6,16 @@ pycroft.model.traffic
 ~~~~~~~~~~~~~~~~~~~~~
 """
 import typing as t
+from datetime import date
 
 from sqlalchemy import (
+    Column,
+    DDL,
+    DateTime,
     ForeignKey,
     CheckConstraint,
+    Index,
+    Integer,
     PrimaryKeyConstraint,
     func,
     or_,
@@ -20,15 +26,19 @@ from sqlalchemy import (
     cast,
     TEXT,
     ColumnElement,
+    Table,
+    event,
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship, Query, Mapped, mapped_column
 from sqlalchemy.sql.selectable import TableValuedAlias
 from sqlalchemy.types import BigInteger, Enum
 
 from pycroft.helpers import utc
-from pycroft.model.base import ModelBase
+from pycroft.model.base import IntegerIdModel, ModelBase
 from pycroft.model.ddl import DDLManager, Function, Trigger, View
 from pycroft.model.type_aliases import datetime_tz
+from pycroft.model.types import IPAddress
 from pycroft.model.user import User
 from pycroft.model.host import IP, Host, Interface
 
@@ -41,8 +51,16 @@ TrafficDirection = t.Literal[
 
 
 class TrafficVolume(ModelBase):
+    """Traffic of an IP per day and direction.
+
+    The table is partitioned by day, see
+    :func:`pycroft.lib.traffic.create_traffic_partitions`.  Rows for which
+    no daily partition exists end up in :data:`TRAFFIC_VOLUME_DEFAULT_PARTITION`.
+    """
     __table_args__ = (
         PrimaryKeyConstraint('ip_id', 'type', 'timestamp'),
+        Index("ix_traffic_volume_user_id_timestamp", "user_id", "timestamp"),
+        {"postgresql_partition_by": 'RANGE ("timestamp")'},
     )
     timestamp: Mapped[datetime_tz]
     amount: Mapped[int] = mapped_column(BigInteger, CheckConstraint("amount >= 0"))
@@ -54,15 +72,88 @@ class TrafficVolume(ModelBase):
         ForeignKey(IP.id, ondelete="CASCADE"), index=True
     )
     ip: Mapped[IP] = relationship(back_populates="traffic_volumes")
-    user_id: Mapped[int] = mapped_column(
-        ForeignKey(User.id, ondelete="CASCADE"), index=True
-    )
+    user_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"))
     user: Mapped[User] = relationship(back_populates="traffic_volumes")
     packets: Mapped[int] = mapped_column(CheckConstraint("packets >= 0"))
 
 
 TrafficVolume.__table__.add_is_dependent_on(IP.__table__)
 
+class TrafficDailyUser(ModelBase):
+    """The traffic of a user per (UTC) day.
+
+    In contrast to :class:`TrafficVolume`, this is kept beyond the retention
+    period of the raw data, see :func:`pycroft.lib.traffic.rollup_traffic`.
+    """
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey(User.id, ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    ingress: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    egress: Mapped[int] = mapped_column(BigInteger, server_default="0")
+
+
+class TrafficMonthlyUser(ModelBase):
+    """The traffic of a user per month, summed up from :class:`TrafficDailyUser`."""
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey(User.id, ondelete="CASCADE"), primary_key=True
+    )
+    #: the first day of the month
+    month: Mapped[date] = mapped_column(primary_key=True)
+    ingress: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    egress: Mapped[int] = mapped_column(BigInteger, server_default="0")
+
+
+class TrafficQuotaUser(ModelBase):
+    """The traffic of a user within the rolling quota window.
+
+    Only kept up to date for the users whose traffic changed, see
+    :func:`pycroft.lib.traffic.update_traffic_quota_counters`.
+    """
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey(User.id, ondelete="CASCADE"), primary_key=True
+    )
+    #: the first day of the window `traffic` has been summed up over
+    window_start: Mapped[date]
+    traffic: Mapped[int] = mapped_column(BigInteger)
+
+
+class TrafficTopUser(ModelBase):
+    """The users with the highest traffic, by rank.
+
+    The table is recomputed periodically, see
+    :func:`pycroft.lib.traffic.refresh_traffic_leaderboard`.
+    """
+    rank: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"))
+    user: Mapped[User] = relationship()
+    traffic: Mapped[int] = mapped_column(BigInteger)
+
+
+class TrafficTopRefresh(IntegerIdModel):
+    """Bookkeeping for the refresh of :class:`TrafficTopUser`.
+
+    There is at most one row.  It is kept apart from the ranks,
+    so that a refresh is recorded even if nobody caused any traffic.
+    """
+    #: the number of days the traffic has been summed up over
+    days: Mapped[int]
+    computed_at: Mapped[datetime_tz]
+
+    __table_args__ = (CheckConstraint("id = 1"),)
+
+
+TRAFFIC_VOLUME_DEFAULT_PARTITION = "traffic_volume_default"
+
+event.listen(
+    TrafficVolume.__table__,
+    "after_create",
+    DDL(
+        f"CREATE TABLE {TRAFFIC_VOLUME_DEFAULT_PARTITION}"
+        f" PARTITION OF {TrafficVolume.__tablename__} DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
 pmacct_traffic_egress = View(
     name='pmacct_traffic_egress',
     query=(
@@ -174,6 +265,52 @@ pmacct_ingress_upsert_trigger = Trigger(
 ddl.add_function(TrafficVolume.__table__, pmacct_ingress_upsert)
 ddl.add_trigger(TrafficVolume.__table__, pmacct_ingress_upsert_trigger)
 
+#: A staging table for bulk ingestion via ``COPY``, as an alternative to inserting
+#: into the `pmacct_traffic_*` views row by row.  Staged rows are moved into
+#: `traffic_volume` by :data:`pmacct_traffic_merge`.  The table is unlogged, so it
+#: is emptied after a crash.
+pmacct_traffic_staging = Table(
+    "pmacct_traffic_staging",
+    ModelBase.metadata,
+    Column("type", TrafficVolume.__table__.c.type.type, nullable=False),
+    Column("ip", IPAddress, nullable=False),
+    Column("stamp_inserted", DateTime(timezone=True), nullable=False),
+    Column("bytes", BigInteger, nullable=False),
+    Column("packets", BigInteger, nullable=False),
+    prefixes=["UNLOGGED"],
+)
+pmacct_traffic_staging.add_is_dependent_on(TrafficVolume.__table__)
+
+pmacct_traffic_merge = Function(
+    name="pmacct_traffic_merge", arguments=[], rtype="bigint",
+    definition="""
+    WITH staged AS (
+        DELETE FROM pmacct_traffic_staging RETURNING *
+    ), aggregated AS (
+        SELECT type, ip, date_trunc('day', stamp_inserted) AS day,
+               sum(bytes) AS bytes, sum(packets) AS packets
+        FROM staged
+        GROUP BY type, ip, date_trunc('day', stamp_inserted)
+    ), resolved AS (
+        SELECT aggregated.*, {ip_id} AS ip_id, {host_owner_id} AS owner_id
+        FROM aggregated
+        JOIN {ip_tname} ON {ip_address} = aggregated.ip
+        JOIN {interface_tname} ON {ip_interface_id} = {interface_id}
+        JOIN {host_tname} ON {interface_host_id} = {host_id}
+    ), merged AS (
+        INSERT INTO traffic_volume ({tv_type}, {tv_ip_id}, "{tv_timestamp}", {tv_amount}, {tv_packets}, {tv_user_id})
+        SELECT type, ip_id, day, bytes, packets, owner_id FROM resolved
+        ON CONFLICT ({tv_ip_id}, {tv_type}, "{tv_timestamp}")
+        DO UPDATE SET ({tv_amount}, {tv_packets}) = ({tv_tname}.{tv_amount} + EXCLUDED.{tv_amount},
+                                                     {tv_tname}.{tv_packets} + EXCLUDED.{tv_packets})
+        RETURNING 1
+    )
+    SELECT count(*) FROM merged
+    """.format(**pmacct_expression_replacements),
+)
+
+ddl.add_function(pmacct_traffic_staging, pmacct_traffic_merge)
+
 
 def traffic_history_query():
     events = (select(func.sum(TrafficVolume.amount).label('amount'),
@@ -238,6 +375,52 @@ def traffic_history(
         .table_valued("timestamp", "ingress", "egress", name=name)
 
 
+traffic_history_many_function = Function(
+    "traffic_history_many",
+    ["arg_user_ids int[]", "arg_start timestamptz", "arg_end timestamptz"],
+    'TABLE (user_id int, "timestamp" timestamptz, ingress numeric, egress numeric)',
+    # the traffic is aggregated before the join with the days, so that the
+    # `(user_id, timestamp)` index can be used for a range scan per user
+    definition="""
+    WITH traffic AS (
+        SELECT tv.{tv_user_id} AS user_id, date_trunc('day', tv."{tv_timestamp}") AS day,
+               sum(tv.{tv_amount}) FILTER (WHERE tv.{tv_type} = 'Ingress') AS ingress,
+               sum(tv.{tv_amount}) FILTER (WHERE tv.{tv_type} = 'Egress') AS egress
+        FROM {tv_tname} AS tv
+        WHERE tv.{tv_user_id} = ANY(arg_user_ids)
+          AND tv."{tv_timestamp}" >= date_trunc('day', arg_start)
+          AND tv."{tv_timestamp}" < date_trunc('day', arg_end) + interval '1 day'
+        GROUP BY tv.{tv_user_id}, date_trunc('day', tv."{tv_timestamp}")
+    )
+    SELECT u.user_id, d.day, traffic.ingress, traffic.egress
+    FROM unnest(arg_user_ids) AS u(user_id)
+    CROSS JOIN generate_series(
+        date_trunc('day', arg_start), date_trunc('day', arg_end), '1 day'
+    ) AS d(day)
+    LEFT JOIN traffic ON traffic.user_id = u.user_id AND traffic.day = d.day
+    ORDER BY u.user_id, d.day
+    """.format(**pmacct_expression_replacements),
+    volatility="stable",
+)
+
+ddl.add_function(TrafficVolume.__table__, traffic_history_many_function)
+
+
+def traffic_history_many(
+    user_ids: t.Sequence[int],
+    start: utc.DateTimeTz | ColumnElement[utc.DateTimeTz],
+    end: utc.DateTimeTz | ColumnElement[utc.DateTimeTz],
+    name="traffic_history_many",
+) -> TableValuedAlias:
+    """A sqlalchemy `func` wrapper for the `traffic_history_many` PSQL function.
+
+    See `sqlalchemy.sql.selectable.FromClause.table_valued`.
+    """
+    return func.traffic_history_many(
+        cast(list(user_ids), ARRAY(Integer)), start, end
+    ).table_valued("user_id", "timestamp", "ingress", "egress", name=name)
+
+
 class TrafficHistoryEntry:
     def __init__(
         self, timestamp: utc.DateTimeTz, ingress: int | None, egress: int | None
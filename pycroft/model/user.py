@@ -502,6 +502,22 @@ def create_pgcrypto(target, connection, **kw):
     connection.execute(text("create extension if not exists pgcrypto"))
 
 
+@event.listens_for(User.__table__, "before_create")
+def create_pg_trgm(target, connection, **kw):
+    connection.execute(text("create extension if not exists pg_trgm"))
+
+
+# These serve the unanchored `ILIKE` and similarity searches
+# of `pycroft.lib.search`.
+for _column in (User.name, User.login, User.email):
+    Index(
+        f"ix_user_{_column.key}_trgm",
+        _column,
+        postgresql_using="gin",
+        postgresql_ops={_column.key: "gin_trgm_ops"},
+    )
+
+
 manager.add_function(
     User.__table__,
     ddl.Function(
@@ -629,6 +645,12 @@ class Membership(IntegerIdModel):
         ),
     )
 
+# These allow to efficiently find the memberships which began or ended
+# in a given period of time (see `pycroft.lib.membership.refresh_properties_at_boundaries`).
+Index('ix_membership_lower_active_during', func.lower(Membership.active_during))
+Index('ix_membership_upper_active_during', func.upper(Membership.active_during))
+
+
 @event.listens_for(Membership.__table__, 'before_create')
 def create_btree_gist(target, connection, **kw):
     connection.execute(text("create extension if not exists btree_gist"))
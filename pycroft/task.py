@@ -22,7 +22,9 @@ from sentry_sdk.integrations.logging import LoggingIntegration
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from sqlalchemy.orm.exc import ObjectDeletedError
 
+from pycroft import config
 from pycroft.lib.finance import get_negative_members, import_newer_than_days
+from pycroft.lib.hades import prune_hades_changes, refresh_hades_tables
 from pycroft.lib.logging import log_task_event
 from pycroft.lib.mail import (
     send_mails,
@@ -34,12 +36,21 @@ from pycroft.lib.mail import (
     _config_var,
     MailConfig,
 )
+from pycroft.lib.membership import refresh_properties_at_boundaries
 from pycroft.lib.task import get_task_implementation, get_scheduled_tasks
-from pycroft.lib.traffic import delete_old_traffic_data
+from pycroft.lib.traffic import (
+    create_upcoming_traffic_partitions,
+    drop_old_traffic_partitions,
+    evaluate_traffic_quota,
+    merge_staged_traffic,
+    refresh_traffic_leaderboard,
+    rollup_recent_traffic,
+)
 from pycroft.model import session
 from pycroft.model.session import with_transaction, set_scoped_session
 from pycroft.model.swdd import swdd_vo, swdd_import, swdd_vv
 from pycroft.model.task import TaskStatus
+from pycroft.model.user import User
 from scripts.connection import try_create_connection
 
 if dsn := os.getenv('PYCROFT_SENTRY_DSN'):
@@ -174,8 +185,78 @@ def execute_scheduled_tasks():
 
 @app.task(base=DBTask)
 def remove_old_traffic_data():
-    num_deleted = delete_old_traffic_data(session.session)
-    print(f"Deleted old traffic data ({num_deleted} rows)")
+    dropped = drop_old_traffic_partitions(session.session)
+    session.session.commit()
+    print(f"Deleted old traffic data ({len(dropped)} partitions)")
+
+
+@app.task(base=DBTask)
+def merge_pmacct_traffic():
+    num_merged = merge_staged_traffic(session.session)
+    session.session.commit()
+    print(f"Merged staged traffic data ({num_merged} rows)")
+
+
+@app.task(base=DBTask)
+def rollup_traffic():
+    user_ids = rollup_recent_traffic(session.session)
+    if (limit := config.traffic_limit) is not None:
+        changes = evaluate_traffic_quota(
+            session.session,
+            user_ids,
+            limit=limit,
+            group=config.traffic_limit_exceeded_group,
+            processor=session.session.get(User, 0),
+        )
+        print(
+            f"Evaluated the traffic quota ({len(changes.exceeded)} users exceeded,"
+            f" {len(changes.cleared)} users cleared)"
+        )
+    session.session.commit()
+    print(f"Rolled up recent traffic data ({len(user_ids)} users)")
+
+
+@app.task(base=DBTask)
+def refresh_traffic_top():
+    refresh_traffic_leaderboard(
+        session.session, days=config.traffic_top_days, limit=config.traffic_top_limit
+    )
+    session.session.commit()
+    print("Refreshed the traffic leaderboard")
+
+
+@app.task(base=DBTask)
+def create_traffic_partitions():
+    created = create_upcoming_traffic_partitions(session.session)
+    session.session.commit()
+    print(f"Created traffic partitions ({len(created)} partitions)")
+
+
+@app.task(base=DBTask)
+def update_current_properties() -> set[int]:
+    """Apply memberships which began or ended since the last run to `current_property`.
+
+    :returns: the ids of the users whose properties changed
+    """
+    changed_user_ids = refresh_properties_at_boundaries(session.session)
+    session.session.commit()
+
+    print(f"Refreshed current properties ({len(changed_user_ids)} users changed)")
+    return changed_user_ids
+
+
+@app.task(base=DBTask)
+def refresh_hades():
+    version = refresh_hades_tables(session.session)
+    session.session.commit()
+    print(f"Refreshed the hades tables (version {version})")
+
+
+@app.task(base=DBTask)
+def prune_hades_change_log():
+    num_pruned = prune_hades_changes(session.session)
+    session.session.commit()
+    print(f"Pruned the hades change log ({num_pruned} changes)")
 
 
 @app.task(base=DBTask)
@@ -231,6 +312,34 @@ app.conf.update(
             'task': 'pycroft.task.remove_old_traffic_data',
             'schedule': timedelta(days=1)
         },
+        'merge-pmacct-traffic': {
+            'task': 'pycroft.task.merge_pmacct_traffic',
+            'schedule': timedelta(minutes=1)
+        },
+        'rollup-traffic': {
+            'task': 'pycroft.task.rollup_traffic',
+            'schedule': timedelta(hours=1)
+        },
+        'refresh-traffic-top': {
+            'task': 'pycroft.task.refresh_traffic_top',
+            'schedule': timedelta(minutes=5)
+        },
+        'create-traffic-partitions': {
+            'task': 'pycroft.task.create_traffic_partitions',
+            'schedule': timedelta(hours=6)
+        },
+        'update-current-properties': {
+            'task': 'pycroft.task.update_current_properties',
+            'schedule': timedelta(minutes=1)
+        },
+        'refresh-hades': {
+            'task': 'pycroft.task.refresh_hades',
+            'schedule': timedelta(minutes=1)
+        },
+        'prune-hades-change-log': {
+            'task': 'pycroft.task.prune_hades_change_log',
+            'schedule': timedelta(days=1)
+        },
         'refresh-swdd-views':{
             'task': 'pycroft.task.refresh_swdd_views',
             'schedule': timedelta(hours=3)
@@ -0,0 +1,80 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""
+tests.benchmark
+~~~~~~~~~~~~~~~
+
+Benchmarks comparing the performance of different implementations
+on realistically sized data sets.
+
+Populating the database takes a while, so the benchmarks are skipped
+unless ``PYCROFT_BENCHMARK`` is set::
+
+    PYCROFT_BENCHMARK=1 pytest -s tests/benchmark
+"""
+import os
+import statistics
+import time
+import typing as t
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from tests.factories import AddressFactory
+
+#: marks to be used as ``pytestmark`` in benchmark modules
+benchmark = [
+    pytest.mark.skipif(
+        not os.environ.get("PYCROFT_BENCHMARK"),
+        reason="benchmarks only run if PYCROFT_BENCHMARK is set",
+    ),
+    pytest.mark.timeout(1800),
+]
+
+
+def measure(func: t.Callable[[], t.Any], repeat: int = 20) -> float:
+    """Call `func` `repeat` times and return the median duration in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def report(title: str, **timings: float) -> None:
+    """Print the given timings (in seconds) in milliseconds."""
+    print(f"\n{title}")
+    for name, seconds in timings.items():
+        print(f"  {name:<30} {seconds * 1000:10.3f} ms")
+
+
+def create_users(session: Session, n: int) -> list[int]:
+    """Create `n` users (each with their own finance account) using plain SQL.
+
+    :returns: the ids of the created users
+    """
+    address = AddressFactory.create()
+    session.flush()
+    return list(
+        session.scalars(
+            text(
+                """
+            WITH account AS (
+                INSERT INTO account (name, type, legacy)
+                SELECT 'Benchmark user ' || i, 'USER_ASSET', false
+                FROM generate_series(1, :n) i
+                RETURNING id
+            )
+            INSERT INTO "user" (login, name, registered_at, account_id, address_id)
+            SELECT 'bench' || account.id, 'Benchmark user', current_timestamp,
+                   account.id, :address_id
+            FROM account
+            RETURNING id
+        """
+            ),
+            {"n": n, "address_id": address.id},
+        )
+    )
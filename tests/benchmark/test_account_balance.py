@@ -0,0 +1,101 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Account balances: summing up the splits vs. the `account_balance` table."""
+import random
+
+import pytest
+from sqlalchemy import func, select, text
+
+from pycroft.model.finance import Account, Split
+from pycroft.model.user import User
+from tests import factories
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_ACCOUNTS = 50_000
+TRANSACTIONS_PER_ACCOUNT = 12
+
+#: how `Account.balance` used to be computed
+summed_balance = (
+    select(func.coalesce(func.sum(Split.amount), 0))
+    .where(Split.account_id == Account.id)
+    .scalar_subquery()
+)
+
+
+@pytest.fixture(scope="module")
+def account_ids(module_session):
+    user_ids = create_users(module_session, NUM_ACCOUNTS)
+    fee_account = factories.AccountFactory(type="REVENUE")
+    author = factories.UserFactory()
+    module_session.flush()
+    account_ids = module_session.scalars(
+        select(User.account_id).where(User.id.in_(user_ids))
+    ).all()
+    module_session.execute(
+        text(
+            """
+        WITH tx AS (
+            INSERT INTO transaction (description, author_id, posted_at, valid_on, confirmed)
+            SELECT 'benchmark ' || a.id, :author, current_timestamp,
+                   current_date - (i * 30), true
+            FROM unnest(:account_ids) a(id), generate_series(1, :n) i
+            RETURNING id, description
+        ), user_splits AS (
+            INSERT INTO split (amount, account_id, transaction_id)
+            SELECT CASE WHEN tx.id % 2 = 0 THEN 500 ELSE -450 END,
+                   substr(tx.description, 11)::integer, tx.id
+            FROM tx
+            RETURNING transaction_id, amount
+        )
+        INSERT INTO split (amount, account_id, transaction_id)
+        SELECT -amount, :fee_account, transaction_id FROM user_splits
+    """
+        ),
+        {
+            "account_ids": account_ids,
+            "n": TRANSACTIONS_PER_ACCOUNT,
+            "author": author.id,
+            "fee_account": fee_account.id,
+        },
+    )
+    module_session.execute(text("ANALYZE split; ANALYZE account_balance"))
+    return account_ids
+
+
+def test_single_balance(session, account_ids):
+    rnd = random.Random(0)
+
+    def before():
+        account_id = rnd.choice(account_ids)
+        session.scalar(select(summed_balance).where(Account.id == account_id))
+
+    def after():
+        account_id = rnd.choice(account_ids)
+        session.scalar(select(Account.balance).where(Account.id == account_id))
+
+    t_before, t_after = measure(before, repeat=200), measure(after, repeat=200)
+    report(
+        f"balance of a single account ({NUM_ACCOUNTS} accounts)",
+        sum_of_splits=t_before,
+        account_balance=t_after,
+    )
+    assert t_after < t_before
+
+
+def test_positive_balances(session, account_ids):
+    def before():
+        session.scalars(select(Account.id).where(summed_balance > 0)).all()
+
+    def after():
+        session.scalars(select(Account.id).where(Account.balance > 0)).all()
+
+    t_before, t_after = measure(before, repeat=3), measure(after, repeat=10)
+    report(
+        f"accounts with a positive balance ({NUM_ACCOUNTS} accounts)",
+        sum_of_splits=t_before,
+        account_balance=t_after,
+    )
+    assert t_after < t_before
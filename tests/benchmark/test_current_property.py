@@ -0,0 +1,86 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Property lookups: evaluating memberships on read vs. the `current_property` table."""
+import random
+
+import pytest
+from sqlalchemy import func, select, text
+
+from pycroft.model.property import CurrentProperty, evaluate_properties
+from tests import factories
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_USERS = 20_000
+
+
+@pytest.fixture(scope="module")
+def user_ids(module_session):
+    ids = create_users(module_session, NUM_USERS)
+    member = factories.PropertyGroupFactory(
+        granted={"network_access", "login", "mail", "member", "ldap"}
+    )
+    blocked = factories.PropertyGroupFactory(denied={"network_access"})
+    module_session.flush()
+    module_session.execute(
+        text(
+            """
+        INSERT INTO membership (user_id, group_id, active_during)
+        SELECT id, :member, tstzrange(current_timestamp - interval '1 year', NULL) FROM unnest(:ids) id
+        UNION ALL
+        SELECT id, :blocked, tstzrange(current_timestamp - interval '1 day', NULL)
+        FROM unnest(:ids) id WHERE id % 20 = 0
+    """
+        ),
+        {"ids": ids, "member": member.id, "blocked": blocked.id},
+    )
+    return ids
+
+
+def test_single_user_lookup(session, user_ids):
+    rnd = random.Random(0)
+    evaluated = evaluate_properties(func.current_timestamp())
+
+    def before():
+        uid = rnd.choice(user_ids)
+        session.execute(select(evaluated).where(evaluated.c.user_id == uid)).all()
+
+    def after():
+        uid = rnd.choice(user_ids)
+        session.execute(select(CurrentProperty).where(CurrentProperty.user_id == uid)).all()
+
+    t_before, t_after = measure(before, repeat=10), measure(after, repeat=200)
+    report(
+        f"properties of a single user ({NUM_USERS} users)",
+        evaluate_properties=t_before,
+        current_property=t_after,
+    )
+    assert t_after < t_before
+
+
+def test_users_with_property(session, user_ids):
+    evaluated = evaluate_properties(func.current_timestamp())
+
+    def before():
+        session.execute(
+            select(evaluated.c.user_id).where(
+                evaluated.c.property_name == "network_access", ~evaluated.c.denied
+            )
+        ).all()
+
+    def after():
+        session.execute(
+            select(CurrentProperty.user_id).where(
+                CurrentProperty.property_name == "network_access", ~CurrentProperty.denied
+            )
+        ).all()
+
+    t_before, t_after = measure(before, repeat=5), measure(after, repeat=20)
+    report(
+        f"users with `network_access` ({NUM_USERS} users)",
+        evaluate_properties=t_before,
+        current_property=t_after,
+    )
+    assert t_after < t_before
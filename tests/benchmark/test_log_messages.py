@@ -0,0 +1,134 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Localizing stored log messages: validating every message vs. the cached parser."""
+import json
+import random
+import traceback
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import jsonschema
+import pytest
+
+from pycroft.helpers.i18n import deferred_gettext, deferred_ngettext, localized
+from pycroft.helpers.i18n.message import (
+    ErroneousMessage,
+    NumericalMessage,
+    SimpleMessage,
+    clear_caches,
+    schema,
+)
+from pycroft.helpers.i18n.serde import deserialize_param
+from pycroft.helpers.i18n.types import Money
+from pycroft.helpers.interval import closedopen, starting_from
+from . import benchmark, measure, report
+
+pytestmark = benchmark
+
+#: the number of log entries of a user page
+NUM_MESSAGES = 3000
+
+
+def from_json_uncached(json_string):
+    """How `Message.from_json` used to be implemented"""
+    try:
+        float(json_string)
+    except ValueError:
+        pass
+    else:
+        return SimpleMessage(json_string, domain=None)
+    try:
+        obj = json.loads(json_string)
+    except ValueError:
+        return ErroneousMessage(json_string)
+    try:
+        jsonschema.validate(obj, schema)
+    except jsonschema.ValidationError as e:
+        return ErroneousMessage(f"Message validation failed: {e} for message {json_string}")
+    args = obj.get("args", ())
+    kwargs = obj.get("kwargs", {})
+    try:
+        args = tuple(deserialize_param(a) for a in args)
+        kwargs = {k: deserialize_param(v) for k, v in kwargs.items()}
+    except (TypeError, ValueError) as e:
+        error = "".join(traceback.format_exception_only(type(e), e))
+        return ErroneousMessage(f"Parameter deserialization error: {error} in message: {json_string}")
+    if "plural" in obj:
+        m = NumericalMessage(obj["singular"], obj["plural"], obj["n"], obj.get("domain"))
+    else:
+        m = SimpleMessage(obj["message"], obj.get("domain"))
+    m.args = args
+    m.kwargs = kwargs
+    return m
+
+
+@pytest.fixture(scope="module")
+def messages() -> list[str]:
+    """Log messages as written by `pycroft.lib`, some of them recurring"""
+    rnd = random.Random(0)
+    now = datetime(2026, 10, 16, tzinfo=timezone.utc)
+
+    def message(i: int) -> str:
+        match rnd.randrange(8):
+            case 0:
+                return deferred_gettext("User created.").to_json()
+            case 1:
+                return deferred_gettext("Moved from {old_room} to {new_room}.").format(
+                    old_room=f"W{rnd.randrange(50)}", new_room=f"Z{rnd.randrange(50)}"
+                ).to_json()
+            case 2:
+                return deferred_gettext("Changed MAC address from {} to {}.").format(
+                    f"00:de:ad:be:ef:{i % 256:02x}", f"00:de:ad:be:ee:{i % 256:02x}"
+                ).to_json()
+            case 3:
+                return deferred_gettext("Suspended during {during}. Reason: {reason}.").format(
+                    during=closedopen(now - timedelta(days=i), now), reason="Traffic"
+                ).to_json()
+            case 4:
+                return deferred_gettext("Added to group {group} during {during}.").format(
+                    group="Mitglied", during=starting_from(now - timedelta(hours=i))
+                ).to_json()
+            case 5:
+                return deferred_gettext("Mitgliedsbeitrag {fee_name}").format(
+                    fee_name=f"{2000 + i % 27}-{i % 12 + 1:02d}"
+                ).to_json()
+            case 6:
+                return deferred_ngettext(
+                    "Booked {amount} for {n} month.", "Booked {amount} for {n} months.", i % 3 + 1
+                ).format(amount=Money(Decimal(i % 40), "EUR"), n=i % 3 + 1).to_json()
+            case _:
+                return deferred_gettext("Changed birthdate from {} to {}.").format(
+                    date(1990, 1, 1) + timedelta(days=i), date(1990, 1, 2)
+                ).to_json()
+
+    return [message(i) for i in range(NUM_MESSAGES)]
+
+
+def test_localize_log_messages(messages):
+    def before():
+        for m in messages:
+            from_json_uncached(m).localize()
+
+    def after_cold():
+        clear_caches()
+        for m in messages:
+            localized(m)
+
+    def after_warm():
+        for m in messages:
+            localized(m)
+
+    for m in messages:
+        assert localized(m) == from_json_uncached(m).localize()
+
+    t_before = measure(before, repeat=5)
+    t_cold = measure(after_cold, repeat=5)
+    t_warm = measure(after_warm, repeat=20)
+    report(
+        f"localizing {NUM_MESSAGES} log messages",
+        validate_every_time=t_before,
+        compiled_validator=t_cold,
+        cached=t_warm,
+    )
+    assert t_warm < t_cold < t_before
@@ -0,0 +1,83 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Days in default: `Account.in_default_days` per user vs. `select_in_default_days`."""
+import pytest
+from sqlalchemy import select, text
+
+from pycroft.lib.finance import select_in_default_days
+from pycroft.model.finance import Account
+from pycroft.model.user import User
+from tests import factories
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_USERS = 5_000
+#: two years of monthly fees, and a payment for most of them
+NUM_MONTHS = 24
+
+
+@pytest.fixture(scope="module")
+def account_ids(module_session):
+    user_ids = create_users(module_session, NUM_USERS)
+    fee_account = factories.AccountFactory(type="REVENUE")
+    author = factories.UserFactory()
+    module_session.flush()
+    module_session.execute(
+        text(
+            """
+            WITH accounts AS (
+                SELECT account_id AS id FROM "user" WHERE id = ANY(:user_ids)
+            ), bookings AS (
+                -- a fee at the beginning of every month, paid some days later
+                -- except for every fifth account, which stopped paying half a year ago
+                SELECT a.id AS account_id, m, f.paid, current_date - (m * 30 + f.shift) AS valid_on
+                FROM accounts a, generate_series(0, :months - 1) m,
+                     (VALUES (false, 10), (true, 0)) f(paid, shift)
+                WHERE NOT (f.paid AND a.id % 5 = 0 AND m < 6)
+            ), tx AS (
+                INSERT INTO transaction (description, author_id, posted_at, valid_on, confirmed)
+                SELECT account_id || ':' || m || ':' || paid, :author, current_timestamp,
+                       valid_on, true
+                FROM bookings
+                RETURNING id, description
+            ), user_splits AS (
+                INSERT INTO split (amount, account_id, transaction_id)
+                SELECT CASE WHEN b.paid THEN -500 ELSE 500 END, b.account_id, tx.id
+                FROM bookings b JOIN tx ON tx.description = b.account_id || ':' || b.m || ':' || b.paid
+                RETURNING transaction_id, amount
+            )
+            INSERT INTO split (amount, account_id, transaction_id)
+            SELECT -amount, :fee_account, transaction_id FROM user_splits
+        """
+        ),
+        {
+            "user_ids": user_ids,
+            "months": NUM_MONTHS,
+            "author": author.id,
+            "fee_account": fee_account.id,
+        },
+    )
+    return module_session.scalars(
+        select(User.account_id).where(User.id.in_(user_ids))
+    ).all()
+
+
+def test_in_default_days(session, account_ids):
+    def before():
+        accounts = session.scalars(select(Account).where(Account.id.in_(account_ids)))
+        [account.in_default_days for account in accounts]
+
+    def after():
+        session.execute(select_in_default_days(select(Account.id).where(
+            Account.id.in_(account_ids)
+        ))).all()
+
+    t_before, t_after = measure(before, repeat=1), measure(after, repeat=5)
+    report(
+        f"days in default ({NUM_USERS} accounts, {NUM_MONTHS} months of bookings)",
+        in_default_days_per_account=t_before,
+        select_in_default_days=t_after,
+    )
+    assert t_after < t_before
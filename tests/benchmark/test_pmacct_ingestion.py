@@ -0,0 +1,96 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""pmacct ingestion: per-row view triggers vs. `COPY` into the staging table."""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from netaddr import IPNetwork
+from sqlalchemy import text
+
+from pycroft.lib.traffic import StagedTraffic, merge_staged_traffic, stage_traffic
+from pycroft.model.traffic import pmacct_traffic_egress, pmacct_traffic_ingress
+from tests import factories
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_IPS = 5_000
+
+
+@pytest.fixture(scope="module")
+def ips(module_session) -> list[str]:
+    user_ids = create_users(module_session, NUM_IPS)
+    subnet = factories.SubnetFactory(address=IPNetwork("10.0.0.0/8"))
+    module_session.flush()
+    return list(
+        module_session.scalars(
+            text(
+                """
+            WITH h AS (
+                INSERT INTO host (owner_id) SELECT unnest(CAST(:user_ids AS integer[]))
+                RETURNING id
+            ), i AS (
+                INSERT INTO interface (host_id, mac)
+                SELECT id, CAST(regexp_replace(
+                    '0200' || lpad(to_hex(id), 8, '0'), '(..)(?!$)', '\\1:', 'g'
+                ) AS macaddr)
+                FROM h
+                RETURNING id
+            )
+            INSERT INTO ip (address, interface_id, subnet_id)
+            SELECT inet '10.0.0.1' + row_number() OVER (ORDER BY id), id, :subnet_id
+            FROM i
+            RETURNING host(address)
+        """
+            ),
+            {"user_ids": user_ids, "subnet_id": subnet.id},
+        )
+    )
+
+
+def records(ips: list[str], n: int) -> list[StagedTraffic]:
+    rnd = random.Random(n)
+    now = datetime.now(timezone.utc)
+    return [
+        StagedTraffic(
+            type=rnd.choice(("Ingress", "Egress")),
+            ip=rnd.choice(ips),
+            stamp_inserted=now - timedelta(minutes=rnd.randrange(3 * 24 * 60)),
+            bytes=rnd.randrange(10**9),
+            packets=rnd.randrange(10**6),
+        )
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def test_ingestion(session, ips, n):
+    recs = records(ips, n)
+    egress = [
+        {"ip_src": r.ip, "stamp_inserted": r.stamp_inserted, "stamp_updated": r.stamp_inserted,
+         "bytes": r.bytes, "packets": r.packets}
+        for r in recs if r.type == "Egress"
+    ]
+    ingress = [
+        {"ip_dst": r.ip, "stamp_inserted": r.stamp_inserted, "stamp_updated": r.stamp_inserted,
+         "bytes": r.bytes, "packets": r.packets}
+        for r in recs if r.type == "Ingress"
+    ]
+
+    def before():
+        session.execute(pmacct_traffic_egress.table.insert(), egress)
+        session.execute(pmacct_traffic_ingress.table.insert(), ingress)
+
+    def after():
+        stage_traffic(session, recs)
+        merge_staged_traffic(session)
+
+    t_before, t_after = measure(before, repeat=3), measure(after, repeat=3)
+    report(
+        f"ingesting {n} pmacct records ({NUM_IPS} IPs)",
+        view_triggers=t_before,
+        copy_and_merge=t_after,
+    )
+    assert t_after < t_before
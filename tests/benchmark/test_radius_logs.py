@@ -0,0 +1,122 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Rendering Hades logs: the former namedtuple entries vs. the parse-once `RadiusLogEntry`."""
+import random
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import partial
+
+import pytest
+
+from hades_logs.parsing import (
+    RadiusLogEntry,
+    attrlist_to_dict,
+    parse_vlan,
+    reduce_radius_logs,
+    reduce_to_first_occurrence,
+)
+from . import benchmark, measure, report
+
+pytestmark = benchmark
+
+#: the number of entries of a port, i.e. the `limit` of the lookup
+NUM_ENTRIES = 500
+
+_fields = ['mac', 'reply', 'groups', 'raw_attributes', 'timestamp']
+
+
+class NamedTupleEntry(namedtuple('NamedTupleEntry', _fields)):
+    """How `RadiusLogEntry` used to be implemented"""
+    @property
+    def accepted(self):
+        return self.reply == "Access-Accept"
+
+    @property
+    def attributes(self):
+        return attrlist_to_dict(self.raw_attributes)
+
+    @property
+    def vlans(self):
+        return [parse_vlan(v) for v in self.attributes['Egress-VLAN-Name']]
+
+    @property
+    def time(self):
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+    def effectively_equal(self, other):
+        relevant_attributes = set(_fields) - {'timestamp'}
+        try:
+            return all(getattr(self, a) == getattr(other, a) for a in relevant_attributes)
+        except AttributeError:
+            return False
+
+
+reduce_namedtuple_entries = partial(
+    reduce_to_first_occurrence, comparator=NamedTupleEntry.effectively_equal
+)
+
+
+@pytest.fixture(scope="module")
+def raw_entries() -> list[tuple]:
+    rnd = random.Random(0)
+    replies = [
+        ("Access-Accept", ["member"], [["Egress-VLAN-Name", '"2Wu5"']]),
+        ("Access-Accept", ["traffic"], [["Egress-VLAN-Name", '"2hades-unauth"'],
+                                        ["Fall-Through", "No"]]),
+        ("Access-Reject", [], []),
+    ]
+    entries = []
+    reply = replies[0]
+    for i in range(NUM_ENTRIES):
+        # the reply mostly stays the same for a while
+        if rnd.random() < 0.2:
+            reply = rnd.choice(replies)
+        entries.append(("00:de:ad:be:ef:00", *reply, 1501623826.391414 - 60 * i))
+    return entries
+
+
+def render(entries) -> list[str]:
+    """Roughly what `format_hades_log_entry` does with every entry"""
+    return [
+        f"{e.time} {e.mac} {e.accepted} {', '.join(e.groups)} {', '.join(e.vlans)}"
+        for e in entries
+    ]
+
+
+def test_render_logs(raw_entries):
+    def before():
+        entries = [NamedTupleEntry(*e) for e in raw_entries]
+        render(reduce_namedtuple_entries(entries))
+        render(entries)
+
+    def after():
+        entries = [RadiusLogEntry(*e) for e in raw_entries]
+        render(reduce_radius_logs(entries))
+        render(entries)
+
+    assert render(reduce_namedtuple_entries(NamedTupleEntry(*e) for e in raw_entries)) \
+        == render(reduce_radius_logs(RadiusLogEntry(*e) for e in raw_entries))
+
+    t_before, t_after = measure(before, repeat=50), measure(after, repeat=50)
+    report(
+        f"parsing, reducing and rendering the logs of a port ({NUM_ENTRIES} entries)",
+        namedtuple_entries=t_before,
+        radius_log_entry=t_after,
+    )
+    assert t_after < t_before
+
+
+def test_reduce_cached_logs(raw_entries):
+    """Once the entries are cached, only the reduction has to be repeated"""
+    old_entries = [NamedTupleEntry(*e) for e in raw_entries]
+    new_entries = [RadiusLogEntry(*e) for e in raw_entries]
+
+    t_before = measure(lambda: list(reduce_namedtuple_entries(old_entries)), repeat=50)
+    t_after = measure(lambda: list(reduce_radius_logs(new_entries)), repeat=50)
+    report(
+        f"reducing the logs of a port ({NUM_ENTRIES} entries)",
+        namedtuple_entries=t_before,
+        radius_log_entry=t_after,
+    )
+    assert t_after < t_before
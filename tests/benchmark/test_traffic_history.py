@@ -0,0 +1,77 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Traffic history of many users: `traffic_history` per user vs. `traffic_history_many`."""
+from datetime import timedelta
+
+import pytest
+from netaddr import IPNetwork
+from sqlalchemy import text
+
+from pycroft.lib.user import traffic_history, traffic_history_many
+from tests import factories
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_USERS = 1_000
+#: users whose traffic is in the table, but not asked for
+NUM_OTHER_USERS = 9_000
+NUM_DAYS = 7
+
+
+@pytest.fixture(scope="module")
+def user_ids(module_session) -> list[int]:
+    user_ids = create_users(module_session, NUM_USERS + NUM_OTHER_USERS)
+    subnet = factories.SubnetFactory(address=IPNetwork("10.0.0.0/8"))
+    module_session.flush()
+    module_session.execute(
+        text(
+            """
+        WITH h AS (
+            INSERT INTO host (owner_id) SELECT unnest(CAST(:user_ids AS integer[]))
+            RETURNING id, owner_id
+        ), i AS (
+            INSERT INTO interface (host_id, mac)
+            SELECT id, CAST(regexp_replace(
+                '0200' || lpad(to_hex(id), 8, '0'), '(..)(?!$)', '\\1:', 'g'
+            ) AS macaddr)
+            FROM h
+            RETURNING id, host_id
+        ), ip AS (
+            INSERT INTO ip (address, interface_id, subnet_id)
+            SELECT inet '10.0.0.1' + row_number() OVER (ORDER BY id), id, :subnet_id
+            FROM i
+            RETURNING id, interface_id
+        )
+        INSERT INTO traffic_volume (type, ip_id, "timestamp", amount, packets, user_id)
+        SELECT t.type, ip.id, date_trunc('day', current_timestamp) - d * interval '1 day',
+               (random() * 1e9)::bigint, (random() * 1e6)::integer, h.owner_id
+        FROM ip JOIN i ON i.id = ip.interface_id JOIN h ON h.id = i.host_id,
+             generate_series(0, :days) d,
+             unnest(CAST(ARRAY['Ingress', 'Egress'] AS traffic_direction[])) t(type)
+    """
+        ),
+        {"user_ids": user_ids, "subnet_id": subnet.id, "days": NUM_DAYS},
+    )
+    module_session.execute(text("ANALYZE traffic_volume"))
+    return user_ids[:NUM_USERS]
+
+
+def test_traffic_history_many(session, user_ids, utcnow):
+    start, end = utcnow - timedelta(NUM_DAYS), utcnow
+
+    def before():
+        [traffic_history(user_id, start, end) for user_id in user_ids]
+
+    def after():
+        traffic_history_many(user_ids, start, end)
+
+    t_before, t_after = measure(before, repeat=1), measure(after, repeat=5)
+    report(
+        f"traffic history of {NUM_USERS} users over {NUM_DAYS} days"
+        f" ({NUM_USERS + NUM_OTHER_USERS} users with traffic)",
+        traffic_history_per_user=t_before,
+        traffic_history_many=t_after,
+    )
+    assert t_after < t_before
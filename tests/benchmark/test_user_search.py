@@ -0,0 +1,76 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""Searching users as you type: `user_search_query` vs. `ranked_user_search`."""
+import random
+
+import pytest
+from sqlalchemy import func, select, text
+
+from pycroft.lib.search import ranked_user_search, user_search_query
+from pycroft.model.user import User
+from . import benchmark, create_users, measure, report
+
+pytestmark = benchmark
+
+NUM_USERS = 100_000
+#: what the quick search is supposed to answer in
+TARGET_SECONDS = 0.05
+
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Emil", "Frieda", "Greta", "Hans",
+               "Ida", "Jonas", "Karl", "Lena", "Mia", "Noah", "Otto", "Paula"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer",
+              "Wagner", "Becker", "Schulz", "Hoffmann", "Koch", "Richter"]
+
+
+@pytest.fixture(scope="module")
+def user_ids(module_session):
+    ids = create_users(module_session, NUM_USERS)
+    module_session.execute(
+        text(
+            """
+        UPDATE "user" SET
+            name = (:first)[1 + id % cardinality(:first)]
+                || ' ' || (:last)[1 + (id / 7) % cardinality(:last)]
+                || ' ' || substr(md5(id::text), 1, 6),
+            email = 'user' || id || '@example.org'
+        WHERE id = ANY(:ids)
+    """
+        ),
+        {"ids": ids, "first": FIRST_NAMES, "last": LAST_NAMES},
+    )
+    module_session.execute(text('ANALYZE "user"'))
+    return ids
+
+
+def queries(user_ids) -> list[str]:
+    rnd = random.Random(0)
+    return [
+        *(f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}" for _ in range(10)),
+        *(f"bench{rnd.choice(user_ids)}" for _ in range(10)),
+        *(str(rnd.choice(user_ids)) for _ in range(10)),
+        "Schmitd",
+    ]
+
+
+def test_search_as_you_type(session, user_ids):
+    qs = queries(user_ids)
+    it = iter(qs * 100)
+
+    def before():
+        q = user_search_query(query=next(it))
+        count = session.scalar(select(func.count()).select_from(q.subquery()))
+        if count < session.query(User).count():
+            session.scalars(q).unique().all()
+
+    def after():
+        ranked_user_search(session, next(it))
+
+    t_before, t_after = measure(before, repeat=len(qs)), measure(after, repeat=len(qs))
+    report(
+        f"user search as you type ({NUM_USERS} users)",
+        user_search_query=t_before,
+        ranked_user_search=t_after,
+    )
+    assert t_after < TARGET_SECONDS
+    assert t_after < t_before
@@ -10,6 +10,8 @@ import jinja2 as j
 import pytest
 from flask import url_for, template_rendered, Response, message_flashed
 
+from web.instrumentation import collect_queries
+
 
 class TestClient(flask.testing.FlaskClient):
     __test__ = False
@@ -64,6 +66,28 @@ class TestClient(flask.testing.FlaskClient):
         __tracebackhide__ = True
         return self.assert_response_code(endpoint, code=200, **kw)
 
+    def assert_url_max_queries(
+        self, url: str, max_queries: int, method: str = "GET", **kw
+    ) -> Response:
+        """Assert that a URL returns 200 using at most `max_queries` SQL statements.
+
+        This guards pages against N+1 queries: on failure, the statements
+        executed more than once are listed.
+        """
+        __tracebackhide__ = True
+        with collect_queries() as stats:
+            resp = self.assert_url_response_code(url, code=200, method=method, **kw)
+        repeated = "".join(f"\n  {n}x {shape}" for shape, n in stats.repeated(2).items())
+        assert stats.count <= max_queries, (
+            f"Expected url {url} to use at most {max_queries} queries,"
+            f" got {stats.count}.{repeated}"
+        )
+        return resp
+
+    def assert_max_queries(self, endpoint: str, max_queries: int, **kw) -> Response:
+        __tracebackhide__ = True
+        return self.assert_url_max_queries(url_for(endpoint), max_queries, **kw)
+
     def assert_url_redirects(
         self, url: str, expected_location: str | None = None, method: str = "GET", **kw
     ) -> Response:
@@ -104,7 +104,7 @@ class TestBuilding:
             url_for("facilities.room_logs_json", room_id=room.id)
         )
         assert "items" in (j := resp.json)
-        assert j["items"]
+        assert j["items"]["rows"]
 
     def test_building_levels(self, client: TestClient, building: Building):
         with client.renders_template("facilities/levels.html"):
@@ -180,7 +180,7 @@ class TestOvercrowdedRooms:
 
     def test_overcrowded_rooms_json(self, client):
         resp = client.assert_url_ok(url_for("facilities.overcrowded_json"))
-        assert_one(resp.json.get("items"))
+        assert_one(resp.json["items"]["rows"])
 
     def test_per_building_overcrowded_rooms(self, client, building):
         with client.renders_template("facilities/room_overcrowded.html"):
@@ -190,7 +190,7 @@ class TestOvercrowdedRooms:
         resp = client.assert_url_ok(
             url_for("facilities.overcrowded_json", building=building.id)
         )
-        assert_one(resp.json.get("items"))
+        assert_one(resp.json["items"]["rows"])
 
 
 class TestRoomCreate:
@@ -27,6 +27,7 @@ from pycroft.model.finance import (
 )
 from tests.assertions import assert_one
 from tests.frontend.assertions import TestClient
+from web.instrumentation import collect_queries
 from .fixture_helpers import serialize_formdata
 
 
@@ -244,6 +245,17 @@ class TestAccount:
         if not query_args.get("splitted", False):
             assert len(i["rows"]) == query_args.get("limit", 2)
 
+    def test_accounts_show_json_queries(self, client: TestClient, member_account):
+        with collect_queries() as stats:
+            client.assert_url_ok(
+                url_for("finance.accounts_show_json", account_id=member_account.id, limit=1)
+            )
+        # more rows must not cause more queries
+        client.assert_url_max_queries(
+            url_for("finance.accounts_show_json", account_id=member_account.id),
+            max_queries=stats.count,
+        )
+
     def test_get_system_accounts(self, config, client):
         accounts = client.assert_ok("finance.json_accounts_system").json["accounts"]
         assert len(accounts) > 0
@@ -47,7 +47,8 @@ class TestSubnets:
     def test_subnets_json(self, client):
         response = client.assert_url_ok(url_for("infrastructure.subnets_json"))
         assert "items" in (j := response.json)
-        assert len(j["items"]) == 6
+        assert j["items"]["total"] == 6
+        assert len(j["items"]["rows"]) == 6
 
 
 @pytest.mark.usefixtures("admin_logged_in")
@@ -58,7 +59,7 @@ class TestSwitch:
 
     def test_switches_json(self, client: TestClient, switch):
         response = client.assert_url_ok(url_for("infrastructure.switches_json"))
-        it = assert_one(response.json.get("items", []))
+        it = assert_one(response.json["items"]["rows"])
         assert it["id"] == switch.host_id
         assert "edit_link" in it
         assert "delete_link" in it
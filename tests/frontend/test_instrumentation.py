@@ -0,0 +1,61 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+import pytest
+from flask import url_for
+from sqlalchemy import text
+from sqlalchemy.exc import DataError
+
+from tests.frontend.assertions import TestClient
+from web.instrumentation import QueryStats, collect_queries, statement_shape
+
+
+@pytest.fixture(scope="module")
+def client(module_test_client: TestClient) -> TestClient:
+    return module_test_client
+
+
+def test_statement_shape():
+    assert statement_shape(
+        "SELECT * FROM host WHERE host.id IN (%(id_1_1)s, %(id_1_2)s)"
+    ) == "SELECT * FROM host WHERE host.id IN (...)"
+
+
+def test_repeated_statements():
+    stats = QueryStats()
+    for i in range(3):
+        stats.record(f"SELECT 1 WHERE x IN ({', '.join(['%(x)s'] * (i + 1))})", 0.1)
+    stats.record("SELECT 2", 0.1)
+
+    assert stats.count == 4
+    assert stats.duration == pytest.approx(0.4)
+    assert stats.repeated(2) == {"SELECT 1 WHERE x IN (...)": 3}
+
+
+def test_nested_collectors(session):
+    with collect_queries() as outer:
+        session.execute(text("SELECT 1"))
+        with collect_queries() as inner:
+            session.execute(text("SELECT 2"))
+
+    assert outer.statements == {"SELECT 1": 1, "SELECT 2": 1}
+    assert inner.statements == {"SELECT 2": 1}
+
+
+def test_failing_statement_is_forgotten(session):
+    with collect_queries() as stats:
+        with pytest.raises(DataError), session.begin_nested():
+            session.execute(text("SELECT 1 / 0"))
+        session.execute(text("SELECT 2"))
+
+    assert not session.connection().info.get("query_start")
+    assert "SELECT 1 / 0" not in stats.statements
+    assert stats.statements["SELECT 2"] == 1
+
+
+@pytest.mark.usefixtures("session")
+def test_server_timing_header(client: TestClient):
+    resp = client.get(url_for("login.login"))
+    timings = resp.headers.getlist("Server-Timing")
+    assert any(timing.startswith("db;dur=") for timing in timings)
+    assert any(timing.startswith("app;dur=") for timing in timings)
@@ -2,14 +2,16 @@
 # This file is part of the Pycroft project and licensed under the terms of
 # the Apache License, Version 2.0. See the LICENSE file for details.
 import pytest
+from flask_login import login_user
 from jinja2.runtime import Context
 from sqlalchemy.orm import Session
 
 from pycroft.model.config import Config
 from pycroft.model.user import User
-from tests.factories.property import AdminPropertyGroupFactory
+from tests.factories.property import AdminPropertyGroupFactory, MembershipFactory
 from tests.factories.user import UserFactory
 from web import PycroftFlask
+from web.blueprints.access import current_properties, properties_of
 from web.template_filters import require
 from .assertions import TestClient
 from .fixture_helpers import login_context, BlueprintUrls
@@ -130,3 +132,56 @@ class TestPermissionsUser:
         # Login see Test_010_Anonymous
         #TODO assert client response by text or better, not code
         client.assert_response_code("login.logout", 302)
+
+
+class TestCurrentProperties:
+    """The properties of the current user are evaluated once per request,
+    but changes of their memberships take effect right away.
+    """
+    @pytest.fixture(scope="class")
+    def user(self, class_session: Session, config: Config) -> User:
+        user = UserFactory.create(
+            with_membership=True,
+            membership__group=config.member_group,
+            membership__includes_today=True,
+        )
+        class_session.flush()
+        return user
+
+    @pytest.fixture(scope="class", autouse=True)
+    def user_logged_in(self, user: User, client: TestClient, app: PycroftFlask):
+        with login_context(client, app, user.login):
+            yield
+
+    def test_membership_change(
+        self, session: Session, client: TestClient, user: User, admin_group
+    ):
+        client.assert_forbidden("facilities.overview")
+
+        membership = MembershipFactory.create(
+            user=user, group=admin_group, includes_today=True
+        )
+        session.flush()
+        session.expire(user)
+        client.assert_ok("facilities.overview")
+
+        session.delete(membership)
+        session.flush()
+        session.expire(user)
+        client.assert_forbidden("facilities.overview")
+
+    def test_properties_of_current_user_are_shared(self, app: PycroftFlask, user: User):
+        with app.test_request_context():
+            login_user(user)
+            assert properties_of(user) is current_properties()
+
+    def test_flush_of_membership_forgets_properties(
+        self, app: PycroftFlask, session: Session, user: User, admin_group
+    ):
+        with app.test_request_context():
+            login_user(user)
+            assert "facilities_show" not in current_properties()
+            MembershipFactory.create(user=user, group=admin_group, includes_today=True)
+            session.flush()
+            session.expire(user)
+            assert "facilities_show" in current_properties()
@@ -13,6 +13,7 @@ from tests.factories import (
     UserFactory,
     RoomFactory,
 )
+from web.instrumentation import collect_queries
 from ..assertions import TestClient
 from ...factories.address import AddressFactory
 
@@ -38,12 +39,68 @@ class TestUserViewingPages:
     def test_user_overview_access(self, client: TestClient):
         client.assert_ok("user.overview")
 
+    def test_traffic_usage(self, client: TestClient):
+        resp = client.assert_ok("user.json_users_highest_traffic")
+        assert resp.json["items"] == []
+
+    def test_traffic_data(self, client: TestClient, admin):
+        for days in (7, 30, 90, 365):
+            resp = client.assert_url_ok(
+                url_for("user.json_trafficdata", user_id=admin.id, days=days)
+            )
+            assert resp.json
+        client.assert_url_response_code(
+            url_for("user.json_trafficdata", user_id=admin.id, days=1000), code=404
+        )
+
     def test_user_viewing_himself(self, client: TestClient, admin):
         client.assert_url_ok(url_for("user.user_show", user_id=admin.id))
 
+    @pytest.mark.parametrize("endpoint", ["user.user_show", "user.user_show_groups_json"])
+    def test_user_page_reads_clock_once(self, client: TestClient, admin, endpoint):
+        with collect_queries() as stats:
+            client.assert_url_ok(url_for(endpoint, user_id=admin.id))
+        clock_reads = sum(
+            n
+            for statement, n in stats.statements.items()
+            if statement.startswith("SELECT CURRENT_TIMESTAMP")
+        )
+        # the test session is in a single transaction, which may have read it already
+        assert clock_reads <= 1
+
     def test_user_search_access(self, client: TestClient):
         client.assert_ok("user.search")
 
+    def test_user_search_without_criteria(self, client: TestClient):
+        resp = client.assert_ok("user.json_search")
+        assert resp.json["items"] == {"total": 0, "rows": []}
+
+    def test_user_search(self, client: TestClient, admin):
+        resp = client.assert_url_ok(url_for("user.json_search", login=admin.login))
+        assert [r["id"] for r in resp.json["items"]["rows"]] == [admin.id]
+
+    def test_user_search_table_is_server_side(self, client: TestClient):
+        assert 'data-side-pagination="server"' in client.assert_ok("user.search").text
+
+    def test_user_search_is_paginated(self, client: TestClient, session: Session):
+        users = UserFactory.create_batch(3, name="Paginated Searchee")
+        session.flush()
+        url = url_for(
+            "user.json_search", name="Paginated Searchee", limit=2, offset=1, sort="id"
+        )
+        items = client.assert_url_ok(url).json["items"]
+        assert items["total"] == 3
+        assert [r["id"] for r in items["rows"]] == [u.id for u in users[1:]]
+
+    def test_quick_search(self, client: TestClient, admin):
+        resp = client.assert_url_ok(url_for("user.json_quick_search", query=admin.login))
+        assert resp.json["items"][0]["id"] == admin.id
+
+    def test_quick_search_invalid_cursor(self, client: TestClient):
+        client.assert_url_response_code(
+            url_for("user.json_quick_search", query="foo", cursor="bar"), code=400
+        )
+
 
 @pytest.mark.usefixtures("session")
 class TestInhabitingUser:
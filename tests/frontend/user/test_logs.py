@@ -5,6 +5,7 @@ import pytest
 from flask import url_for
 
 from hades_logs import HadesLogs
+from pycroft.helpers.i18n import deferred_gettext
 from pycroft.model.logging import UserLogEntry, RoomLogEntry
 from pycroft.model.session import Session
 from pycroft.model.user import User
@@ -27,7 +28,7 @@ def get_logs(user_id: int, client: TestClient, **kw) -> list[t.Any]:
       * The response content_type contains ``"json"``
       * The response's JSON contains an ``"items"`` key
 
-    :returns: ``response.json['items']``
+    :returns: ``response.json['items']['rows']``
     """
     response = client.assert_url_ok(
         url_for("user.user_show_logs_json", user_id=user_id, **kw)
@@ -35,7 +36,7 @@ def get_logs(user_id: int, client: TestClient, **kw) -> list[t.Any]:
     assert "json" in response.content_type.lower()
     json = response.json
     assert json.get("items") is not None
-    return json["items"]
+    return json["items"]["rows"]
 
 
 GetLogs: t.TypeAlias = t.Callable[..., list[t.Any]]
@@ -88,6 +89,16 @@ class TestAppWithoutHadesLogs:
         log = assert_one(logs())
         self.assert_hades_message(log["message"])
 
+    def test_hades_logs_only_on_first_page(self, logs: GetLogs):
+        assert not logs(offset=20, limit=20)
+
+    def test_hades_logs_not_counted(self, user: User, client: TestClient):
+        items = client.assert_url_ok(
+            url_for("user.user_show_logs_json", user_id=user.id, limit=1)
+        ).json["items"]
+        assert items["total"] == 0
+        assert len(items["rows"]) == 1
+
 
 @pytest.mark.usefixtures("admin")
 class TestRoomAndUserLogDisplay:
@@ -133,6 +144,45 @@ class TestRoomAndUserLogDisplay:
         items = logs(logtype="user")
         self.assert_one_log(items, user_log_entry)
 
+    def test_all_logs_newest_first(
+        self, logs: GetLogs, room_log_entry: RoomLogEntry, user_log_entry: UserLogEntry
+    ):
+        items = [item for item in logs() if item["type"] != "hades"]
+        expected = sorted(
+            [room_log_entry, user_log_entry], key=lambda e: (e.created_at, e.id), reverse=True
+        )
+        assert [item["message"] for item in items] == [e.message for e in expected]
+
+    def test_paginated_by_cursor(
+        self, user: User, class_test_client: TestClient, logs: GetLogs
+    ):
+        first = class_test_client.assert_url_ok(
+            url_for("user.user_show_logs_json", user_id=user.id, logtype="user", limit=1)
+        ).json["items"]
+        assert first["total"] == 1
+        assert (cursor := first["cursor"])
+        assert not logs(logtype="user", limit=1, cursor=cursor)
+
+    def test_search_in_messages(
+        self, logs: GetLogs, session: Session, admin: User, user: User
+    ):
+        UserLogEntryFactory(
+            author=admin,
+            user=user,
+            message=deferred_gettext("Changed MAC address from {} to {}.")
+            .format("00:de:ad:be:ef:00", "00:de:ad:be:ef:01")
+            .to_json(),
+        )
+        session.flush()
+        item = assert_one(logs(logtype="user", search="DE:AD:BE:EF:01"))
+        assert "00:de:ad:be:ef:01" in item["message"]
+
+    def test_invalid_cursor(self, user: User, class_test_client: TestClient):
+        class_test_client.assert_url_response_code(
+            url_for("user.user_show_logs_json", user_id=user.id, cursor="yesterday"),
+            code=400,
+        )
+
     def test_no_hades_log_exists(self, logs: GetLogs):
         item = assert_one(logs(logtype="hades"))
         assert " cannot be displayed" in item['message'].lower()
@@ -0,0 +1,76 @@
+import pytest
+
+from hades_logs.cache import CacheStats, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock) -> TTLCache[str, int]:
+    return TTLCache(maxsize=2, ttl=10, stale_ttl=20, clock=clock)
+
+
+def test_miss(cache):
+    assert cache.get("a") is None
+    assert cache.stats() == CacheStats(hits=0, stale_hits=0, misses=1, size=0)
+
+
+def test_fresh_stale_expired(cache, clock):
+    cache.set("a", 1)
+    assert cache.get("a") == (1, True)
+    clock.now = 15
+    assert cache.get("a") == (1, False)
+    clock.now = 30
+    assert cache.get("a") is None
+    assert cache.stats() == CacheStats(hits=1, stale_hits=1, misses=1, size=0)
+
+
+def test_lru_eviction(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == (1, True)
+    assert cache.get("c") == (3, True)
+
+
+def test_single_revalidation(cache, clock):
+    cache.set("a", 1)
+    clock.now = 15
+    assert cache.start_revalidation("a")
+    assert not cache.start_revalidation("a")
+    cache.set("a", 2)
+    assert cache.get("a") == (2, True)
+    assert cache.start_revalidation("a")
+    cache.end_revalidation("a")
+    assert cache.start_revalidation("a")
+
+
+def test_zero_ttl_disables_cache(clock):
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=0, stale_ttl=120, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    clock.now = 60
+    assert cache.get("a") is None
+    assert cache.stats() == CacheStats(hits=0, stale_hits=0, misses=2, size=0)
+
+
+def test_contains(cache, clock):
+    cache.set("a", 1)
+    assert "a" in cache
+    assert "b" not in cache
+    clock.now = 30
+    assert "a" not in cache
+    assert cache.stats().misses == 0
@@ -148,6 +148,42 @@ class TestTaskCreated(ConfiguredFlaskAppTestBase):
         assert task.kwargs == {'bar': 'baz'}
 
 
+class TestConcurrentRevalidation(ConfiguredFlaskAppTestBase):
+    key = ("141.30.223.206", "C6", 100)
+
+    @pytest.fixture(scope='class')
+    def hades_logs(self, app):
+        return HadesLogs(app)
+
+    def test_revalidation_picked_up_by_another_thread(self, hades_logs):
+        revalidations = hades_logs._revalidations
+
+        class RacingResult:
+            def ready(self):
+                # another thread takes the result right after this check
+                del revalidations[TestConcurrentRevalidation.key]
+                return True
+
+        hades_logs.cache.set(self.key, [])
+        revalidations[self.key] = RacingResult()
+        assert hades_logs._get_cached(self.key) == []
+        assert self.key not in revalidations
+
+    def test_revalidations_of_evicted_entries_are_pruned(self, hades_logs, monkeypatch):
+        evicted = ("141.30.223.206", "C7", 100)
+        hades_logs._revalidations[evicted] = object()
+        monkeypatch.setattr(hades_logs, "_dispatch", lambda task: object())
+
+        cache = hades_logs.cache
+        now = cache.clock()
+        cache.set(self.key, [])
+        # the entry of `key` is stale now, so it is revalidated
+        monkeypatch.setattr(cache, "clock", lambda: now + cache.ttl + 1)
+        assert hades_logs._get_cached(self.key) == []
+        assert self.key in hades_logs._revalidations
+        assert evicted not in hades_logs._revalidations
+
+
 class TestCorrectURIsConfigured:
     """Provides ``HadesLogs`` with syntactically correct URIs"""
     @pytest.fixture(scope='class')
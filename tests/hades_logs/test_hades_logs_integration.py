@@ -1,6 +1,8 @@
+import time
+
 import pytest
 
-from hades_logs import HadesLogs, HadesTimeout
+from hades_logs import HadesLogs, HadesTimeout, PortLogs
 from hades_logs.parsing import RadiusLogEntry
 
 
@@ -40,6 +42,30 @@ class TestConfiguredHadesLogs:
             assert tasks == []
 
 
+class TestFetchLogsMany:
+    def test_no_ports(self, hades_logs):
+        assert hades_logs.fetch_logs_many([]) == []
+
+    def test_logs_in_order(self, hades_logs, valid_kwargs):
+        valid_port = (valid_kwargs['nasipaddress'], valid_kwargs['nasportid'])
+        first, second = hades_logs.fetch_logs_many([valid_port, ('', '')])
+        assert first[:2] == valid_port
+        assert len(first.logs) == 4
+        assert second == PortLogs('', '', [])
+
+    @pytest.mark.slow
+    @pytest.mark.timeout(15)
+    def test_timeout_is_shared(self, hades_logs, valid_kwargs):
+        valid_port = (valid_kwargs['nasipaddress'], valid_kwargs['nasportid'])
+        sleeping_port = ('', 'magic_sleep')
+        start = time.monotonic()
+        logs = hades_logs.fetch_logs_many([sleeping_port, sleeping_port, valid_port])
+        # waiting for each lookup in turn would take twice the timeout
+        assert time.monotonic() - start < 2 * hades_logs.timeout
+        assert [port.timed_out for port in logs] == [True, True, False]
+        assert len(logs[2].logs) == 4
+
+
 class TestSpecificLogs:
     @pytest.fixture(scope='class')
     def logs(self, hades_logs, valid_kwargs):
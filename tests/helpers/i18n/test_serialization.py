@@ -3,11 +3,12 @@ import json
 from decimal import Decimal
 
 import pytest
+from babel.support import Translations
 
-from pycroft.helpers.i18n import localized
+from pycroft.helpers.i18n import localized, set_translation_lookup
 from pycroft.helpers.i18n.types import Money
 from pycroft.helpers.i18n.serde import serialize_param, deserialize_param
-from pycroft.helpers.i18n.message import Message, ErroneousMessage
+from pycroft.helpers.i18n.message import Message, ErroneousMessage, SimpleMessage
 from pycroft.helpers.interval import UnboundedInterval, closed, closedopen, \
     openclosed, open
 
@@ -88,3 +89,25 @@ def test_invalid_parameter(json):
 @pytest.mark.parametrize("serialized", ("5", "42", "42.0", "7"))
 def test_numerical_strings_get_deserialized(serialized: str):
     assert localized(serialized) == serialized
+
+
+def test_cached_messages_are_not_shared():
+    serialized = SimpleMessage("{}").format(1).to_json()
+    Message.from_json(serialized).format(2)
+    assert Message.from_json(serialized).args == (1,)
+
+
+def test_localized_cache_respects_translation_lookup():
+    serialized = SimpleMessage("Hello").to_json()
+    assert localized(serialized) == "Hello"
+
+    class Greeting(Translations):
+        def ugettext(self, message):
+            return "Hallo"
+
+    set_translation_lookup(lambda: Greeting())
+    try:
+        assert localized(serialized) == "Hallo"
+    finally:
+        set_translation_lookup(lambda: Translations())
+    assert localized(serialized) == "Hello"
@@ -2,7 +2,7 @@ import ldap3
 import pytest
 
 from ldap_sync.concepts.action import IdleAction, AddAction, ModifyAction, DeleteAction
-from ldap_sync.execution import execute_real
+from ldap_sync.execution import execute_real, execute_parallel, log_execution_summary
 from ldap_sync.concepts.record import UserRecord
 from . import validate_attribute_type, get_all_objects
 
@@ -72,3 +72,34 @@ class TestModifyAction:
 def test_execute_does_nothing():
     record = UserRecord(dn='test', attrs={})
     execute_real(IdleAction(record_dn=record.dn), connection=None)  # type: ignore
+
+
+class TestExecuteParallel:
+    @pytest.fixture(scope='class')
+    def results(self, connection, dn):
+        return execute_parallel([
+            AddAction(record=UserRecord(dn=dn, attrs={'objectClass': UserRecord.LDAP_OBJECTCLASSES})),
+            IdleAction(record_dn=dn),
+            ModifyAction(record_dn=dn, modifications={'mail': 'new@shizzle.de'}),
+            DeleteAction(record_dn='uid=nonexistent,' + dn),
+        ], [connection])
+
+    def test_actions_per_dn_executed_in_order(self, results, connection, base):
+        objects = get_all_objects(connection, base)
+        assert len(objects) == 1
+        assert objects[0]['attributes']['mail'] == ['new@shizzle.de']
+
+    def test_results(self, results):
+        assert [(type(r.action), r.success) for r in results] == [
+            (AddAction, True),
+            (ModifyAction, True),
+            (DeleteAction, False),
+        ]
+
+    def test_failures_counted(self, results):
+        assert log_execution_summary(results) == 1
+
+
+def test_execute_parallel_requires_connections():
+    with pytest.raises(ValueError):
+        execute_parallel([], [])
@@ -2,8 +2,15 @@
 #  This file is part of the Pycroft project and licensed under the terms of
 #  the Apache License, Version 2.0. See the LICENSE file for details
 import pytest
-
-from ldap_sync.sources.db import _fetch_db_users, _UserProxyType
+from sqlalchemy import delete
+
+from ldap_sync.sources.db import (
+    _fetch_db_users,
+    _fetch_db_properties,
+    _UserProxyType,
+    consume_db_changes,
+)
+from pycroft.model.ldap_sync import LdapSyncState
 from tests import factories
 
 
@@ -52,3 +59,49 @@ def test_one_user_fetch_with_blockage(session, user, deny_membership):
     assert _fetch_db_users(session, required_property="ldap") == [
         tuple(_UserProxyType(user, should_be_blocked=True))
     ]
+
+
+def test_one_user_fetch_restricted_to_login(session, user):
+    assert _fetch_db_users(session, logins=[user.login]) == [
+        tuple(_UserProxyType(user, should_be_blocked=False))
+    ]
+    assert _fetch_db_users(session, logins=["other"]) == []
+
+
+def test_properties_fetch_restricted_to_names(session, user):
+    assert [p.name for p in _fetch_db_properties(session, names={"ldap_login_enabled"})] \
+        == ["ldap_login_enabled"]
+    assert _fetch_db_properties(session, names={"not_exported"}) == []
+
+
+class TestConsumeDbChanges:
+    @pytest.fixture(autouse=True)
+    def previous_sync(self, session, user):
+        session.execute(delete(LdapSyncState))
+        assert consume_db_changes(session) is None
+
+    def test_nothing_changed(self, session):
+        changes = consume_db_changes(session)
+        assert changes is not None
+        assert changes.users == set()
+        assert changes.properties == set()
+
+    def test_user_change_is_journaled(self, session, user):
+        user.name = "Changed Name"
+        session.flush()
+        changes = consume_db_changes(session)
+        assert user.login in changes.users
+        assert consume_db_changes(session).users == set()
+
+    def test_membership_change_is_journaled(self, session, user, deny_membership):
+        changes = consume_db_changes(session)
+        assert deny_membership.group.name in changes.groups
+        assert user.login in changes.users
+        assert "ldap_login_enabled" in changes.properties
+
+    def test_current_property_change_is_journaled(self, session, user, group):
+        group.property_grants["mail"] = True
+        session.flush()
+        changes = consume_db_changes(session)
+        assert changes.properties == {"mail"}
+        assert user.login in changes.users
@@ -0,0 +1,83 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+import ldap3
+import pytest
+from ldap3.utils.dn import safe_dn
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ldap_sync.__main__ import fetch_and_sync, parser
+from ldap_sync.concepts import types
+from ldap_sync.conversion import dn_from_username
+from ldap_sync.sources.db import consume_db_changes
+from ldap_sync.sources.ldap import fake_connection
+from pycroft.model.ldap_sync import LdapSyncJournal, LdapSyncState
+from tests import factories
+
+BASE_DN = types.DN("ou=pycroft,dc=agdsn,dc=de")
+
+
+@pytest.fixture(scope="module")
+def user(module_session):
+    return factories.UserFactory.create(
+        with_unix_account=True,
+        with_membership=True,
+        membership__group=factories.PropertyGroupFactory.create(granted={"ldap"}),
+    )
+
+
+@pytest.fixture
+def changed_user(session, user):
+    session.execute(delete(LdapSyncState))
+    consume_db_changes(session)
+    user.name = "Changed Name"
+    session.flush()
+    return user
+
+
+@pytest.fixture
+def sync_session(connection) -> Session:
+    # a savepoint, so that the outer transaction of the tests survives the commit
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as s:
+        yield s
+
+
+@pytest.fixture
+def failing_connection(user) -> ldap3.Connection:
+    """A connection on which adding the entry of `user` fails, because it exists."""
+    connection = fake_connection()
+    user_dn = dn_from_username(user.login, types.DN(safe_dn(["ou=users", BASE_DN])))
+    connection.add(user_dn, "inetOrgPerson", {"uid": user.login})
+    return connection
+
+
+def journaled_logins(session: Session) -> set[str]:
+    return set(session.scalars(select(LdapSyncJournal.name).where(LdapSyncJournal.kind == "user")))
+
+
+def test_failed_sync_keeps_journal(session, sync_session, changed_user, failing_connection):
+    synced_until = session.scalar(select(LdapSyncState.synced_until))
+
+    failures = fetch_and_sync(
+        sync_session, fake_connection(), BASE_DN,
+        incremental=True, write_connections=[failing_connection],
+    )
+
+    assert failures
+    assert changed_user.login in journaled_logins(session)
+    assert session.scalar(select(LdapSyncState.synced_until)) == synced_until
+
+
+def test_successful_sync_consumes_journal(session, sync_session, changed_user):
+    failures = fetch_and_sync(sync_session, fake_connection(), BASE_DN, incremental=True)
+
+    assert failures == 0
+    assert changed_user.login not in journaled_logins(session)
+
+
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_connections_must_be_positive(value):
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--connections", value])
+    assert parser.parse_args(["--connections", "1"]).num_connections == 1
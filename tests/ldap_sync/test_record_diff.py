@@ -8,7 +8,12 @@ import pytest
 from ldap_sync.concepts import types
 from ldap_sync.concepts.action import AddAction, DeleteAction, IdleAction, ModifyAction
 from ldap_sync.concepts.record import UserRecord, escape_and_normalize_attrs, GroupRecord, Record
-from ldap_sync.record_diff import diff_records, diff_attributes, iter_zip_dicts
+from ldap_sync.record_diff import (
+    diff_records,
+    diff_attributes,
+    iter_zip_dicts,
+    iter_diff_records,
+)
 from ldap_sync.concepts.types import DN
 
 
@@ -131,3 +136,18 @@ def test_dict_zipping(d1, d2, expected):
 ], 2))
 def test_dict_zipping_and_projection_is_merging(d1: dict[str, int], d2: dict[str, int]):
     assert {k: v2 or v1 for k, (v1, v2) in iter_zip_dicts(d1, d2)} == {**d1, **d2}
+
+
+def test_iter_diff_records():
+    def user(name: str, mail: str) -> UserRecord:
+        return UserRecord(dn=DN(f"uid={name}"), attrs={"mail": mail})
+
+    current = iter([user("kept", "a"), user("changed", "a"), user("deleted", "a")])
+    desired = [user("kept", "a"), user("changed", "b"), user("added", "a")]
+    actions = {a.record_dn: type(a) for a in iter_diff_records(current, desired)}
+    assert actions == {
+        "uid=kept": IdleAction,
+        "uid=changed": ModifyAction,
+        "uid=deleted": DeleteAction,
+        "uid=added": AddAction,
+    }
@@ -4,9 +4,11 @@
 import dataclasses
 from datetime import date, timedelta, datetime, timezone
 from decimal import Decimal
+from types import SimpleNamespace
 
 import pytest
 from factory import Iterator, SubFactory
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from pycroft import Config
@@ -22,8 +24,14 @@ from pycroft.lib.finance import (
     get_activities_to_return,
     generate_activities_return_sepaxml,
     generate_transfer_sepaxml,
+    select_in_default_days,
+    BalanceMismatch,
+    find_balance_mismatches,
+    repair_balance_mismatches,
 )
 from pycroft.model.finance import (
+    AccountBalance,
+    BankAccountActivity,
     Transaction,
     Split,
     Account,
@@ -485,6 +493,66 @@ class TestMembershipFeePosting:
         ), "Active member has payment_in_default property"
 
 
+class TestInDefaultDays:
+    @pytest.fixture
+    def counter_account(self, session) -> Account:
+        return AccountFactory.create(type="REVENUE")
+
+    @pytest.fixture
+    def account(self, session) -> Account:
+        return AccountFactory.create(type="USER_ASSET")
+
+    @pytest.mark.parametrize("bookings, expected", [
+        ([], None),
+        ([(30, 500)], 30),
+        ([(30, 500), (20, -500)], None),
+        ([(30, 500), (20, -500), (10, 500)], 10),
+        ([(30, 500), (20, -200), (10, 500)], 30),
+        ([(30, 500), (20, -600), (10, 500)], 10),
+        ([(30, -500), (20, 300), (10, 300)], 10),
+    ])
+    def test_in_default_days(self, session, account, counter_account, bookings, expected):
+        today = session.scalar(select(func.current_date()))
+        for days_ago, amount in bookings:
+            TransactionFactory.create(
+                valid_on=today - timedelta(days=days_ago),
+                splits__amount=Iterator([amount, -amount]),
+                splits__account=Iterator([account, counter_account]),
+            )
+        session.flush()
+
+        in_default_days = dict(
+            session.execute(select_in_default_days(select(account.id))).all()
+        )
+        assert in_default_days.get(account.id) == expected
+        assert account.in_default_days == (expected or 0)
+
+
+class TestBalanceMismatches:
+    @pytest.fixture
+    def account(self, session) -> Account:
+        account = AccountFactory.create(type="USER_ASSET")
+        TransactionFactory.create(splits__account=Iterator([account, AccountFactory()]))
+        session.flush()
+        return account
+
+    def test_consistent(self, session, account):
+        assert find_balance_mismatches(session) == []
+
+    def test_repair(self, session, account):
+        session.execute(
+            update(AccountBalance)
+            .where(AccountBalance.account_id == account.id)
+            .values(balance=42)
+        )
+        assert find_balance_mismatches(session) == [
+            BalanceMismatch(account.id, recorded=Decimal(42), actual=Decimal(5))
+        ]
+        repair_balance_mismatches(session)
+        assert find_balance_mismatches(session) == []
+        assert account.balance == 5
+
+
 class TestSplitTypes:
     @pytest.fixture
     def a_user(self) -> Account:
@@ -701,6 +769,65 @@ class TestLastImportedAt:
         )
 
 
+
+def fake_transaction(activity: BankAccountActivity, **kwargs) -> SimpleNamespace:
+    """A statement entry as it would be returned by `mt940` / `fints`."""
+    data = {
+        "amount": SimpleNamespace(amount=activity.amount),
+        "applicant_iban": activity.other_account_number,
+        "applicant_bin": activity.other_routing_number,
+        "applicant_name": activity.other_name,
+        "purpose": activity.reference,
+        "guessed_entry_date": activity.posted_on,
+        "date": activity.valid_on,
+    } | kwargs
+    return SimpleNamespace(data=data)
+
+
+class TestProcessTransactions:
+    @pytest.fixture
+    def known(self, session) -> BankAccountActivity:
+        activity = BankAccountActivityFactory.create(amount=Decimal("12.34"))
+        session.flush()
+        return activity
+
+    def test_classification(self, session, known):
+        statement = [
+            fake_transaction(known),
+            fake_transaction(known, purpose="another payment"),
+            fake_transaction(known, guessed_entry_date=date.today()),
+        ]
+        imported = finance.process_transactions(known.bank_account, statement)
+        assert [a.reference for a in imported.old] == [known.reference]
+        assert [a.reference for a in imported.new] == ["another payment"]
+        assert [a.posted_on for a in imported.doubtful] == [date.today()]
+
+    def test_identical_payments_in_one_statement(self, session, known):
+        statement = [fake_transaction(known, purpose="twice")] * 2
+        imported = finance.process_transactions(known.bank_account, statement)
+        assert len(imported.new) == 2
+
+    def test_find_known_activities(self, session, known):
+        statement = [fake_transaction(known, amount=SimpleNamespace(amount=Decimal(1))),
+                     fake_transaction(known)]
+        imported = finance.process_transactions(known.bank_account, statement)
+        assert finance.find_known_activities(session, imported.new + imported.old) == {1}
+
+    def test_insert_activities(self, session, known):
+        statement = [fake_transaction(known, purpose=f"payment {i}") for i in range(3)]
+        imported = finance.process_transactions(known.bank_account, statement)
+        finance.insert_activities(session, imported.new)
+        assert session.scalars(
+            select(BankAccountActivity.reference)
+            .where(BankAccountActivity.bank_account == known.bank_account)
+            .order_by(BankAccountActivity.id)
+        ).all() == [known.reference, "payment 0", "payment 1", "payment 2"]
+        # a second import of the same statement adds nothing
+        imported = finance.process_transactions(known.bank_account, statement)
+        assert imported.new == []
+        assert len(imported.old) == 3
+
+
 class TestReturnNonAttributable:
     @pytest.mark.parametrize(
         "expected, set_transaction_id, amount_negative, imported_at_old",
@@ -7,10 +7,19 @@ import pytest
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
-from pycroft.lib.logging import log_user_event, log_room_event
+from pycroft.lib.logging import (
+    log_user_event,
+    log_room_event,
+    log_task_event,
+    user_log_timeline,
+    room_log_timeline,
+    fetch_log_timeline,
+    count_log_timeline,
+)
 from pycroft.model.facilities import Room
 from pycroft.model.user import User
 from tests.factories import UserFactory, RoomFactory
+from tests.factories.task import UserTaskFactory
 
 
 def assert_log_entry(log_entry, expected_author, expected_created_at, expected_message):
@@ -49,3 +58,63 @@ def test_create_room_log_entry(session, utcnow, message, user, room):
 
     assert_log_entry(room_log_entry, user, utcnow, message)
     assert room_log_entry.room == room
+
+
+class TestLogTimeline:
+    @pytest.fixture(scope="class")
+    def user(self, class_session: Session) -> User:
+        return UserFactory.create()
+
+    @pytest.fixture(scope="class")
+    def entries(self, class_session: Session, utcnow, user: User) -> list[tuple[str, str]]:
+        """The (type, message) of the log entries of `user`, newest first"""
+        task = UserTaskFactory.create(user=user, due_yesterday=True)
+        other_user = UserFactory.create()
+        log_user_event("other user", author=user, user=other_user, created_at=utcnow)
+        log_room_event("other room", author=user, room=other_user.room, created_at=utcnow)
+        log_user_event("moved", author=user, user=user, created_at=utcnow - timedelta(1))
+        log_task_event("scheduled", author=user, task=task, created_at=utcnow - timedelta(2))
+        log_room_event("patched", author=user, room=user.room, created_at=utcnow - timedelta(3))
+        log_user_event("created", author=user, user=user, created_at=utcnow - timedelta(4))
+        class_session.flush()
+        return [
+            ("user", "moved"), ("task", "scheduled"), ("room", "patched"), ("user", "created")
+        ]
+
+    def test_merged_newest_first(self, session, user, entries):
+        page = fetch_log_timeline(session, user_log_timeline(user), limit=None)
+        assert [(e.type, e.message) for e in page.entries] == entries
+        assert all(e.author_name == user.name for e in page.entries)
+        assert page.cursor is None
+
+    def test_ascending(self, session, user, entries):
+        page = fetch_log_timeline(session, user_log_timeline(user), limit=None, ascending=True)
+        assert [(e.type, e.message) for e in page.entries] == entries[::-1]
+
+    def test_keyset_pagination(self, session, user, entries):
+        timeline = user_log_timeline(user)
+        first = fetch_log_timeline(session, timeline, limit=3)
+        assert [(e.type, e.message) for e in first.entries] == entries[:3]
+        assert first.cursor is not None
+
+        second = fetch_log_timeline(session, timeline, limit=3, after=first.cursor)
+        assert [(e.type, e.message) for e in second.entries] == entries[3:]
+        assert second.cursor is None
+
+    def test_kinds(self, session, user, entries):
+        page = fetch_log_timeline(session, user_log_timeline(user, ("room",)), limit=None)
+        assert [e.message for e in page.entries] == ["patched"]
+
+    def test_room_timeline(self, session, user, entries):
+        timeline = room_log_timeline(user.room)
+        assert [e.message for e in fetch_log_timeline(session, timeline, limit=None).entries] \
+            == ["patched"]
+
+    def test_count(self, session, user, entries):
+        assert count_log_timeline(session, user_log_timeline(user)) == len(entries)
+
+    def test_search(self, session, user, entries):
+        timeline = user_log_timeline(user)
+        page = fetch_log_timeline(session, timeline, limit=None, search="SCHED")
+        assert [e.message for e in page.entries] == ["scheduled"]
+        assert count_log_timeline(session, timeline, search="SCHED") == 1
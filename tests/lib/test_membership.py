@@ -1,6 +1,15 @@
+from datetime import timedelta
+
 import pytest
+from sqlalchemy import delete, select
 
-from pycroft.lib.membership import change_membership_active_during
+from pycroft.lib.membership import (
+    change_membership_active_during,
+    refresh_current_properties,
+    refresh_properties_at_boundaries,
+    users_with_membership_boundaries,
+)
+from pycroft.model.property import CurrentProperty, CurrentPropertyRefresh
 from tests import factories as f
 
 
@@ -19,6 +28,71 @@ def test_user_change_membership(session, membership, processor, utcnow):
 
 @pytest.fixture
 def membership(module_session):
-    m = f.MembershipFactory(group=f.PropertyGroupFactory())
+    m = f.MembershipFactory(group=f.PropertyGroupFactory(granted={"login"}))
     module_session.flush()
     return m
+
+
+class TestRefreshCurrentProperties:
+    @pytest.fixture
+    def user(self, membership):
+        return membership.user
+
+    def test_nothing_to_refresh(self, session, user):
+        assert refresh_current_properties(session, [user.id]) == set()
+        assert refresh_current_properties(session) == set()
+
+    @pytest.mark.parametrize("user_ids", [None, "user"])
+    def test_stale_rows_get_repaired(self, session, user, user_ids):
+        expected = {(p.property_name, p.denied) for p in user.current_properties_maybe_denied}
+        assert expected
+        session.execute(delete(CurrentProperty).where(CurrentProperty.user_id == user.id))
+
+        ids = [user.id] if user_ids == "user" else None
+        assert refresh_current_properties(session, ids) == {user.id}
+        session.refresh(user)
+        assert {(p.property_name, p.denied) for p in user.current_properties_maybe_denied} \
+            == expected
+
+
+class TestMembershipBoundaries:
+    @pytest.fixture
+    def membership(self, session, utcnow):
+        m = f.MembershipFactory(
+            group=f.PropertyGroupFactory(granted={"login"}),
+            begins_at=utcnow - timedelta(days=2),
+            ends_at=utcnow - timedelta(days=1),
+        )
+        session.flush()
+        return m
+
+    @pytest.mark.parametrize("after, until, found", [
+        (timedelta(days=-3), timedelta(days=-2), True),
+        (timedelta(days=-2), timedelta(days=-1), True),
+        (timedelta(days=-1), timedelta(days=0), False),
+        (timedelta(days=-5), timedelta(days=-3), False),
+    ])
+    def test_users_with_boundaries(self, session, utcnow, membership, after, until, found):
+        users = users_with_membership_boundaries(session, utcnow + after, utcnow + until)
+        assert (membership.user_id in users) == found
+
+    def test_first_refresh_creates_mark(self, session, utcnow, membership):
+        session.execute(delete(CurrentPropertyRefresh))
+        refresh_properties_at_boundaries(session)
+        assert session.get(CurrentPropertyRefresh, 1).refreshed_until == utcnow
+
+    def test_repeated_refresh_changes_nothing(self, session, membership):
+        refresh_properties_at_boundaries(session)
+        assert refresh_properties_at_boundaries(session) == set()
+
+    def test_expired_membership_gets_applied(self, session, utcnow, membership):
+        session.add(CurrentPropertyRefresh(id=1, refreshed_until=utcnow - timedelta(days=3)))
+        session.add(CurrentProperty(
+            user_id=membership.user_id, property_name="login", denied=False
+        ))
+        session.flush()
+
+        assert refresh_properties_at_boundaries(session) == {membership.user_id}
+        assert not session.scalars(
+            select(CurrentProperty).filter_by(user_id=membership.user_id)
+        ).all()
@@ -7,14 +7,15 @@ import pytest
 from sqlalchemy.orm import Session
 
 from pycroft.helpers.interval import single
-from pycroft.lib.search import user_search_query
+from pycroft.lib.search import user_search_query, ranked_user_search, SearchCursor
+from pycroft.model.session import session
 from pycroft.model.user import User, PropertyGroup
 from tests.factories import UserFactory, PropertyGroupFactory, \
     MembershipFactory
 
 
 def s(**kw):
-    return user_search_query(**kw).all()
+    return session.scalars(user_search_query(**kw)).all()
 
 
 @pytest.fixture(scope="module")
@@ -87,3 +88,61 @@ class TestUser:
 
     def test_property_group_search(self, group, user):
         assert s(property_group_id=group.id) == [user]
+
+    def test_combined_search(self, group, user):
+        mac = "00:de:ad:be:ef:00"
+        assert s(mac=mac, query=mac, property_group_id=group.id) == [user]
+
+
+class TestRankedUserSearch:
+    @pytest.fixture(scope="class", autouse=True)
+    def users(self, class_session) -> list[User]:
+        return [
+            UserFactory.create(name=name, login=login, email=f"{login}@example.org")
+            for name, login in (
+                ("Hans Mueller", "hmueller"),
+                ("Hanna Muellerova", "hanna.m"),
+                ("Johannes Maier", "jomai"),
+            )
+        ]
+
+    def search(self, session, query, **kw) -> list[str]:
+        return [r.user.login for r in ranked_user_search(session, query, **kw).users]
+
+    def test_exact_login_is_ranked_first(self, session, users):
+        result = ranked_user_search(session, "hmueller")
+        assert result.users[0].user == users[0]
+        assert result.users[0].score == 1
+
+    def test_ranking(self, session):
+        assert self.search(session, "Hanna Mueller")[:2] == ["hanna.m", "hmueller"]
+
+    def test_typo(self, session):
+        assert self.search(session, "Johanes") == ["jomai"]
+
+    def test_short_query_only_matches_exactly(self, session, users):
+        assert self.search(session, "hm") == []
+        assert self.search(session, str(users[2].id)) == ["jomai"]
+
+    def test_like_wildcards_are_escaped(self, session):
+        assert self.search(session, "%%%") == []
+
+    def test_cursor(self, session):
+        first = ranked_user_search(session, "example.org", limit=2)
+        assert len(first.users) == 2
+        assert first.cursor is not None
+        rest = ranked_user_search(session, "example.org", limit=2, after=first.cursor)
+        assert rest.cursor is None
+        logins = [r.user.login for r in first.users + rest.users]
+        assert sorted(logins) == ["hanna.m", "hmueller", "jomai"]
+
+
+@pytest.mark.parametrize("cursor", [SearchCursor(0.5, 1), SearchCursor(1 / 3, 42)])
+def test_cursor_roundtrip(cursor):
+    assert SearchCursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("value", ["", "foo", "0.5", "0.5_x"])
+def test_invalid_cursor(value):
+    with pytest.raises(ValueError):
+        SearchCursor.decode(value)
@@ -1,11 +1,38 @@
 # TODO: Tests for traffic history
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 
 import pytest
+from sqlalchemy import func, literal_column, select, text
 from sqlalchemy.orm import Session
 
-from pycroft.lib.traffic import delete_old_traffic_data
+from pycroft.lib.traffic import (
+    create_traffic_partitions,
+    create_upcoming_traffic_partitions,
+    drop_old_traffic_partitions,
+    evaluate_traffic_quota,
+    get_traffic_history,
+    get_traffic_leaderboard,
+    get_traffic_partitions,
+    merge_staged_traffic,
+    refresh_traffic_leaderboard,
+    rollup_traffic,
+    stage_traffic,
+    StagedTraffic,
+    traffic_history_granularity,
+    traffic_partition_name,
+    update_traffic_quota_counters,
+    TRAFFIC_PARTITIONS_AHEAD,
+)
 from pycroft.model.host import Interface
+from pycroft.model.traffic import (
+    TrafficDailyUser,
+    TrafficMonthlyUser,
+    TrafficQuotaUser,
+    TrafficVolume,
+    TRAFFIC_VOLUME_DEFAULT_PARTITION,
+    pmacct_traffic_staging,
+)
+from pycroft.model.user import User
 from tests import factories as f
 
 
@@ -16,6 +43,47 @@ def interface(module_session: Session):
     return i
 
 
+@pytest.fixture
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def session_time_zone_behind_utc(session):
+    session.execute(text("SET TimeZone = 'America/New_York'"))
+    yield
+    session.execute(text("SET TimeZone = 'UTC'"))
+
+
+def partitions_of(session: Session, ip_id: int) -> list[str]:
+    """The partitions holding the traffic of an IP"""
+    return session.scalars(
+        select(literal_column("tableoid::regclass::text"))
+        .select_from(TrafficVolume)
+        .where(TrafficVolume.ip_id == ip_id)
+    ).all()
+
+
+def test_upcoming_partitions(session, now):
+    create_upcoming_traffic_partitions(session)
+    partitions = get_traffic_partitions(session)
+    today = now.date()
+    for d in range(TRAFFIC_PARTITIONS_AHEAD + 1):
+        day = today + timedelta(days=d)
+        assert partitions[day] == traffic_partition_name(day)
+    assert create_upcoming_traffic_partitions(session) == []
+
+
+def test_rows_move_out_of_default_partition(session, interface, now):
+    volume = f.TrafficVolumeFactory(timestamp=now, ip__interface=interface)
+    session.flush()
+    ip_id = volume.ip.id
+    assert partitions_of(session, ip_id) == [TRAFFIC_VOLUME_DEFAULT_PARTITION]
+
+    create_traffic_partitions(session, now.date(), now.date() + timedelta(days=1))
+    assert partitions_of(session, ip_id) == [traffic_partition_name(now.date())]
+
+
 @pytest.mark.parametrize(
     "age_days, old",
     (
@@ -23,17 +91,18 @@ def interface(module_session: Session):
         *[(d, True) for d in range(8, 20)],
     ),
 )
+@pytest.mark.parametrize("partitioned", (True, False))
 def test_traffic_volume_cleanup(
-    session, interface: Interface, age_days: int, old: bool
+    session, interface: Interface, now, age_days: int, old: bool, partitioned: bool
 ):
-    f.TrafficVolumeFactory(
-        timestamp=datetime.utcnow() - timedelta(age_days),
-        ip__interface=interface,
-    )
+    timestamp = now - timedelta(age_days)
+    if partitioned:
+        create_traffic_partitions(session, timestamp.date(), now.date() + timedelta(days=1))
+    volume = f.TrafficVolumeFactory(timestamp=timestamp, ip__interface=interface)
     session.flush()
-    num_deleted = delete_old_traffic_data(session)
-    assert 0 <= num_deleted <= 1
-    got_deleted = num_deleted == 1
+    ip_id, user_id, amount = volume.ip.id, volume.user_id, volume.amount
+    dropped = drop_old_traffic_partitions(session)
+    got_deleted = not partitions_of(session, ip_id)
 
     if old:
         assert (
@@ -43,3 +112,243 @@ def test_traffic_volume_cleanup(
         assert (
             not got_deleted
         ), f"Traffic volume from {age_days} days ago unexpectedly got deleted in cleanup"
+    assert (traffic_partition_name(timestamp.date()) in dropped) == (old and partitioned)
+    # the traffic survives in the rollups
+    assert session.scalar(
+        select(TrafficDailyUser.ingress + TrafficDailyUser.egress).where(
+            TrafficDailyUser.user_id == user_id,
+            TrafficDailyUser.day == timestamp.date(),
+        )
+    ) == (amount if old else None)
+
+
+class TestRollup:
+    @pytest.fixture
+    def user(self, session) -> User:
+        user = f.UserFactory(with_host=True)
+        session.flush()
+        return user
+
+    @pytest.fixture
+    def traffic(self, session, user, interface, now) -> None:
+        for type_, amount, days_ago in [
+            ("Ingress", 100, 0), ("Egress", 20, 0), ("Ingress", 1, 1), ("Ingress", 5, 40),
+        ]:
+            f.TrafficVolumeFactory(
+                user=user,
+                ip__interface=interface,
+                type=type_,
+                amount=amount,
+                timestamp=now - timedelta(days=days_ago),
+            )
+        session.flush()
+
+    @pytest.mark.usefixtures("traffic")
+    def test_rollup(self, session, user, now):
+        today = now.date()
+        for _ in range(2):  # rolling up again does not change anything
+            rollup_traffic(session, today - timedelta(days=1), today + timedelta(days=1))
+            daily = session.execute(
+                select(TrafficDailyUser.day, TrafficDailyUser.ingress, TrafficDailyUser.egress)
+                .where(TrafficDailyUser.user_id == user.id)
+                .order_by(TrafficDailyUser.day)
+            ).all()
+            assert daily == [(today - timedelta(days=1), 1, 0), (today, 100, 20)]
+
+        month_ingress = session.scalar(
+            select(TrafficMonthlyUser.ingress).where(
+                TrafficMonthlyUser.user_id == user.id,
+                TrafficMonthlyUser.month == today.replace(day=1),
+            )
+        )
+        # the day before may belong to the previous month
+        assert month_ingress in (100, 101)
+
+    @pytest.mark.parametrize("days, granularity", [
+        (7, "raw"), (8, "raw"), (9, "day"), (30, "day"), (90, "day"), (365, "month"),
+    ])
+    def test_granularity(self, days, granularity):
+        today = date(2026, 10, 16)
+        start = today - timedelta(days=days - 1)
+        assert traffic_history_granularity(start, today, today) == granularity
+
+    @pytest.mark.parametrize("days", [7, 30, 90, 365])
+    @pytest.mark.usefixtures("traffic")
+    def test_history(self, session, user, now, days):
+        today = now.date()
+        rollup_traffic(session, today - timedelta(days=60), today + timedelta(days=1))
+        history = get_traffic_history(session, user.id, today - timedelta(days=days - 1), today)
+        if days < 365:
+            assert len(history) == days
+        else:
+            assert len(history) in (12, 13)
+        expected = 126 if days > 40 else 121
+        assert sum(e.ingress + e.egress for e in history) == expected
+
+    @pytest.mark.usefixtures("session_time_zone_behind_utc")
+    def test_raw_history_uses_utc_days(self, session, user, interface, now):
+        today = now.date()
+        # still the day before in the session's time zone
+        f.TrafficVolumeFactory(
+            user=user,
+            ip__interface=interface,
+            type="Ingress",
+            amount=7,
+            timestamp=datetime.combine(today, time(0, 30), tzinfo=timezone.utc),
+        )
+        session.flush()
+        rollup_traffic(session, today - timedelta(days=1), today + timedelta(days=1))
+
+        history = get_traffic_history(session, user.id, today - timedelta(days=1), today)
+        assert [(e.timestamp.date(), e.ingress) for e in history] == [
+            (today - timedelta(days=1), 0), (today, 7),
+        ]
+        assert session.scalar(
+            select(TrafficDailyUser.day).where(TrafficDailyUser.user_id == user.id)
+        ) == today
+
+
+class TestStagedTraffic:
+    ip = "141.30.228.39"
+
+    @pytest.fixture(scope="class")
+    def user(self, class_session) -> User:
+        return f.UserFactory(with_host=True, host__interface__ip__str_address=self.ip)
+
+    def test_merge(self, session, user):
+        stamp = datetime(2018, 3, 15, 10, 15, tzinfo=timezone.utc)
+        stage_traffic(session, [
+            StagedTraffic("Egress", self.ip, stamp, 1024, 200),
+            StagedTraffic("Egress", self.ip, stamp + timedelta(hours=1), 500, 324),
+            StagedTraffic("Ingress", self.ip, stamp, 7055, 12),
+            StagedTraffic("Ingress", "1.1.1.1", stamp, 1, 1),
+        ])
+        assert merge_staged_traffic(session) == 2
+        assert session.scalar(select(func.count()).select_from(pmacct_traffic_staging)) == 0
+
+        volumes = session.execute(
+            select(TrafficVolume.type, TrafficVolume.amount, TrafficVolume.packets)
+            .where(TrafficVolume.user_id == user.id)
+            .order_by(TrafficVolume.type)
+        ).all()
+        assert volumes == [("Ingress", 7055, 12), ("Egress", 1524, 524)]
+
+        # merging again adds up
+        stage_traffic(session, [StagedTraffic("Ingress", self.ip, stamp, 5, 1)])
+        assert merge_staged_traffic(session) == 1
+        assert session.scalar(
+            select(TrafficVolume.amount).where(
+                TrafficVolume.user_id == user.id, TrafficVolume.type == "Ingress"
+            )
+        ) == 7060
+
+
+class TestLeaderboard:
+    @pytest.fixture
+    def users(self, session, interface, now) -> list[User]:
+        users = f.UserFactory.create_batch(3)
+        for user, amount in zip(users, (10, 30, 20), strict=True):
+            f.TrafficVolumeFactory(
+                user=user, ip__interface=interface, amount=amount, timestamp=now
+            )
+        # too old to count
+        f.TrafficVolumeFactory(
+            user=users[0], ip__interface=interface, amount=100, timestamp=now - timedelta(days=3)
+        )
+        session.flush()
+        return users
+
+    def test_not_computed(self, session):
+        assert get_traffic_leaderboard(session) == ([], None, None)
+
+    def test_refresh(self, session, users):
+        refresh_traffic_leaderboard(session, days=2, limit=2)
+        leaderboard = get_traffic_leaderboard(session)
+        assert [(u.id, u.traffic_for_days) for u in leaderboard.users] == [
+            (users[1].id, 30), (users[2].id, 20),
+        ]
+        assert leaderboard.days == 2
+        assert leaderboard.computed_at is not None
+
+        refresh_traffic_leaderboard(session, days=7, limit=1)
+        assert [u.id for u in get_traffic_leaderboard(session).users] == [users[0].id]
+
+    def test_refresh_without_traffic(self, session):
+        refresh_traffic_leaderboard(session, days=2, limit=2)
+        leaderboard = get_traffic_leaderboard(session)
+        assert leaderboard.users == []
+        assert leaderboard.days == 2
+        assert leaderboard.computed_at is not None
+
+    @pytest.mark.usefixtures("session_time_zone_behind_utc")
+    def test_window_starts_at_utc_midnight(self, session, interface, now):
+        user = f.UserFactory.create()
+        midnight = datetime.combine(now.date(), time(), tzinfo=timezone.utc)
+        for amount, timestamp in ((5, midnight - timedelta(minutes=30)),
+                                  (7, midnight + timedelta(minutes=30))):
+            f.TrafficVolumeFactory(
+                user=user, ip__interface=interface, amount=amount, timestamp=timestamp
+            )
+        session.flush()
+
+        refresh_traffic_leaderboard(session, days=1, limit=1)
+        assert [(u.id, u.traffic_for_days) for u in get_traffic_leaderboard(session).users] \
+            == [(user.id, 7)]
+
+
+class TestTrafficQuota:
+    @pytest.fixture
+    def users(self, session, interface, now) -> list[User]:
+        users = f.UserFactory.create_batch(3)
+        for user, amount in zip(users, (10, 30, 20), strict=True):
+            f.TrafficVolumeFactory(
+                user=user, ip__interface=interface, amount=amount, timestamp=now
+            )
+        session.flush()
+        return users
+
+    @pytest.fixture
+    def group(self, session):
+        group = f.PropertyGroupFactory()
+        session.flush()
+        return group
+
+    @pytest.fixture
+    def processor(self, session) -> User:
+        return f.UserFactory()
+
+    def rollup(self, session, now) -> set[int]:
+        today = now.date()
+        return rollup_traffic(session, today, today + timedelta(days=1))
+
+    def test_counters(self, session, users, now):
+        changed = self.rollup(session, now)
+        assert changed == {u.id for u in users}
+        assert update_traffic_quota_counters(session, changed) == {
+            users[0].id: 10, users[1].id: 30, users[2].id: 20,
+        }
+        assert session.get(TrafficQuotaUser, users[1].id).traffic == 30
+        # nothing changed, so nothing is looked at
+        assert update_traffic_quota_counters(session, set()) == {}
+
+    def test_evaluate(self, session, users, group, processor, now):
+        changed = self.rollup(session, now)
+        changes = evaluate_traffic_quota(
+            session, changed, limit=15, group=group, processor=processor
+        )
+        assert changes == ({users[1].id, users[2].id}, set())
+        session.expire_all()
+        assert [u.member_of(group) for u in users] == [False, True, True]
+
+        # unchanged users are left alone
+        changes = evaluate_traffic_quota(
+            session, {users[0].id}, limit=25, group=group, processor=processor
+        )
+        assert changes == (set(), set())
+
+        changes = evaluate_traffic_quota(
+            session, changed, limit=25, group=group, processor=processor
+        )
+        assert changes == (set(), {users[2].id})
+        session.expire_all()
+        assert [u.member_of(group) for u in users] == [False, True, False]
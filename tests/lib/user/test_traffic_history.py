@@ -2,7 +2,7 @@ from datetime import timedelta
 
 import pytest
 
-from pycroft.lib.user import traffic_history
+from pycroft.lib.user import traffic_history, traffic_history_many
 from pycroft.model.user import User
 from tests.assertions import assert_one
 from tests.factories import TrafficVolumeLastWeekFactory, UserFactory
@@ -29,3 +29,19 @@ class TestTrafficHistory:
         history = traffic_history(user.id, utcnow - timedelta(14), utcnow)
         assert len(history) == 15
         assert [(t.egress, t.ingress) for t in history[:7]] == [(0, 0)] * 7
+
+    def test_get_traffic_history_many(self, session, user, utcnow):
+        other = UserFactory()
+        session.flush()
+        start, end = utcnow - timedelta(14), utcnow
+        matrix = traffic_history_many([other.id, user.id], start, end)
+        history = traffic_history(user.id, start, end)
+
+        assert matrix.user_ids == [other.id, user.id]
+        assert matrix.days == [e.timestamp for e in history]
+        assert [day[1] for day in matrix.ingress] == [e.ingress for e in history]
+        assert [day[1] for day in matrix.egress] == [e.egress for e in history]
+        assert all(day[0] == 0 for day in matrix.ingress + matrix.egress)
+
+    def test_get_traffic_history_many_without_users(self, utcnow):
+        assert traffic_history_many([], utcnow - timedelta(7), utcnow) == ([], [], [], [])
@@ -133,6 +133,44 @@ def test_unbalance_with_delete(session, t, balanced_splits):
             t.splits.pop()
 
 
+class TestAccountBalance:
+    @staticmethod
+    def recorded_balance(session, account) -> int:
+        return session.scalar(select(Account.balance).where(Account.id == account.id))
+
+    def test_insert(self, session, balanced_splits, asset_account, revenue_account):
+        assert self.recorded_balance(session, asset_account) == 100
+        assert self.recorded_balance(session, revenue_account) == -100
+        assert asset_account.balance == 100
+
+    def test_update(self, session, balanced_splits, asset_account, revenue_account):
+        s1, s2 = balanced_splits
+        with session.begin_nested():
+            s1.amount, s2.amount = 70, -70
+        assert self.recorded_balance(session, asset_account) == 70
+        assert self.recorded_balance(session, revenue_account) == -70
+
+    def test_move_to_other_account(
+        self, session, balanced_splits, revenue_account, liability_account
+    ):
+        _, s2 = balanced_splits
+        with session.begin_nested():
+            s2.account = liability_account
+        assert self.recorded_balance(session, revenue_account) == 0
+        assert self.recorded_balance(session, liability_account) == -100
+
+    def test_delete_transaction(self, session, t, balanced_splits, asset_account):
+        with session.begin_nested():
+            session.delete(t)
+        assert self.recorded_balance(session, asset_account) == 0
+
+    def test_account_without_splits(self, session):
+        account = AccountFactory(type='ASSET')
+        session.flush()
+        assert self.recorded_balance(session, account) == 0
+        assert account.balance == 0
+
+
 @pytest.fixture(name='immediate_trigger')
 def immediate_activity_matches_split_trigger(session):
     session.execute(text(
@@ -4,6 +4,7 @@ import pytest
 from sqlalchemy import select
 
 from pycroft.helpers.interval import closedopen
+from pycroft.lib.hades import get_hades_changes, refresh_hades_tables
 from pycroft.model import hades
 from pycroft.model.host import Switch, Host
 from pycroft.model.net import VLAN
@@ -266,3 +267,42 @@ class TestNonBlockingGroup:
                 "radusergroup contains a `no_network_access` row "
                 "for user with non-blocking custom group"
             )
+
+
+class TestMaterializedTables:
+    views_and_tables = [
+        (hades.radusergroup, hades.hades_radusergroup),
+        (hades.radcheck, hades.hades_radcheck),
+        (hades.radgroupreply, hades.hades_radgroupreply),
+        (hades.dhcphost, hades.hades_dhcphost),
+        (hades.alternative_dns, hades.hades_alternative_dns),
+    ]
+
+    def assert_tables_match_views(self, session):
+        for view, table in self.views_and_tables:
+            assert sorted(session.execute(select(view.table)).all(), key=str) \
+                == sorted(session.execute(select(table)).all(), key=str)
+
+    def test_full_refresh(self, session, user):
+        version = refresh_hades_tables(session)
+        self.assert_tables_match_views(session)
+        changes = get_hades_changes(session, version - 1)
+        assert changes.version == version
+        assert mac_from_host(user.hosts[0]) in changes.changes["radusergroup"]
+        # nothing changed since
+        assert refresh_hades_tables(session) == version
+        assert get_hades_changes(session, version) == (version, {})
+
+    def test_incremental_refresh(self, session, user, payment_in_default_group, now):
+        version = refresh_hades_tables(session)
+        MembershipFactory.create(
+            user=user, group=payment_in_default_group,
+            active_during=closedopen(now + timedelta(-1), None),
+        )
+        session.flush()
+
+        assert refresh_hades_tables(session) == version + 1
+        self.assert_tables_match_views(session)
+        changes = get_hades_changes(session, version)
+        mac = mac_from_host(user.hosts[0])
+        assert changes.changes == {"radusergroup": {mac}, "dhcphost": {mac}}
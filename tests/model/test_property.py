@@ -380,7 +380,7 @@ class TestCurrentPropertyView:
         return memberships
 
     def test_current_properties_of_user(self, session, users):
-        rows = (session.query(current_property.table.c.property_name)
+        rows = (session.query(current_property.c.property_name)
                 .add_columns(User.login.label('login'))
                 .join(User.current_properties)
                 .all())
@@ -400,7 +400,7 @@ class TestCurrentPropertyView:
                 assert (denied_prop, login) not in rows
 
     def test_current_granted_or_denied_properties_of_user(self, session, users):
-        rows = (session.query(current_property.table.c.property_name)
+        rows = (session.query(current_property.c.property_name)
                 .add_columns(User.login.label('login'))
                 .join(User.current_properties_maybe_denied)
                 .all())
@@ -409,6 +409,68 @@ class TestCurrentPropertyView:
         assert ('login', users['violator'].login) in rows
 
 
+class TestCurrentPropertyTable:
+    @pytest.fixture
+    def current_rows(self, session):
+        def _current_rows() -> set:
+            return set(session.execute(select(current_property)).all())
+        return _current_rows
+
+    @pytest.fixture
+    def evaluated_rows(self, session):
+        def _evaluated_rows() -> set:
+            props = evaluate_properties(func.current_timestamp())
+            return set(session.execute(select(props)).all())
+        return _evaluated_rows
+
+    def test_agrees_with_evaluation(
+        self, session, utcnow, user, property_group1, property_group2,
+        current_rows, evaluated_rows,
+    ):
+        membership = Membership(
+            active_during=starting_from(utcnow - timedelta(hours=2)),
+            user=user,
+            group=property_group2,
+        )
+        session.add_all([
+            Membership(active_during=starting_from(utcnow), user=user, group=property_group1),
+            membership,
+        ])
+        session.flush()
+        assert (user.id, PROP2, False) in current_rows()
+        assert current_rows() == evaluated_rows()
+
+        membership.disable(utcnow - timedelta(hours=1))
+        session.flush()
+        assert (user.id, PROP2, False) not in current_rows()
+        assert current_rows() == evaluated_rows()
+
+        session.delete(membership)
+        session.flush()
+        assert current_rows() == evaluated_rows()
+
+    def test_property_changes_are_applied(
+        self, session, utcnow, user, property_group1, current_rows, evaluated_rows
+    ):
+        session.add(
+            Membership(active_during=starting_from(utcnow), user=user, group=property_group1)
+        )
+        session.flush()
+
+        property_group1.property_grants[PROP2] = True
+        session.flush()
+        assert (user.id, PROP2, False) in current_rows()
+
+        property_group1.property_grants[PROP2] = False
+        session.flush()
+        assert (user.id, PROP2, False) not in current_rows()
+
+        del property_group1.properties[PROP1]
+        session.flush()
+        assert not {r for r in current_rows() if r.user_id == user.id}
+        assert current_rows() == evaluated_rows()
+
+
 def _iso(date):
     return datetime.fromisoformat(f'{date}T00:00:00+00:00')
 
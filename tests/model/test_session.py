@@ -0,0 +1,27 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from pycroft.model.session import utcnow
+
+
+def test_utcnow_is_transaction_time(session: Session):
+    assert utcnow() == session.scalar(select(func.current_timestamp()))
+
+
+def test_utcnow_is_cached_within_transaction(session: Session):
+    now = utcnow()
+    with session.begin_nested():
+        assert utcnow() == now
+    assert session.info["utcnow"] == now
+
+
+def test_utcnow_cache_reset_after_transaction(connection):
+    # a savepoint, so that the outer transaction of the tests survives
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as s:
+        s.info["utcnow"] = "outdated"
+        s.begin()
+        s.rollback()
+        assert "utcnow" not in s.info
@@ -0,0 +1,95 @@
+import pytest
+from flask import Flask
+from pydantic import BaseModel
+
+from web.table.paging import MAX_PAGE_SIZE, PageParams, paginate_rows
+from web.table.table import PagedTableResponse
+
+
+ROWS = [
+    {"id": 1, "name": "Carla"},
+    {"id": 2, "name": "alice"},
+    {"id": 3, "name": "Bob"},
+    {"id": 4, "name": "Alina"},
+]
+SORT_KEYS = {"id": lambda r: r["id"], "name": lambda r: r["name"].casefold()}
+
+
+def ids(rows):
+    return [r["id"] for r in rows]
+
+
+@pytest.mark.parametrize("params, expected", [
+    (PageParams(), [1, 2, 3, 4]),
+    (PageParams(limit=2), [1, 2]),
+    (PageParams(limit=2, offset=2), [3, 4]),
+    (PageParams(limit=10, offset=3), [4]),
+    (PageParams(offset=1), [2, 3, 4]),
+    (PageParams(offset=10), []),
+])
+def test_slice(params, expected):
+    assert ids(params.slice(ROWS)) == expected
+
+
+@pytest.mark.parametrize("query, limit", [
+    ("limit=10", 10),
+    (f"limit={MAX_PAGE_SIZE + 1}", MAX_PAGE_SIZE),
+    ("limit=0", MAX_PAGE_SIZE),
+    ("", MAX_PAGE_SIZE),
+])
+def test_page_params_limit_is_clamped(query, limit):
+    with Flask(__name__).test_request_context(f"/?{query}"):
+        assert PageParams.from_request().limit == limit
+
+
+@pytest.mark.parametrize("query, sort", [
+    ("sort=name", "name"),
+    ("sort=url.title", "url"),
+    ("sort=", None),
+    ("", None),
+])
+def test_page_params_sort_field(query, sort):
+    with Flask(__name__).test_request_context(f"/?{query}"):
+        assert PageParams.from_request().sort == sort
+
+
+def test_paginate_rows_sorts_before_slicing():
+    page = paginate_rows(
+        ROWS, sort_keys=SORT_KEYS, params=PageParams(limit=2, sort="name")
+    )
+    assert page.total == 4
+    assert ids(page.items) == [2, 4]
+
+
+def test_paginate_rows_descending():
+    page = paginate_rows(
+        ROWS, sort_keys=SORT_KEYS, params=PageParams(sort="id", descending=True)
+    )
+    assert ids(page.items) == [4, 3, 2, 1]
+
+
+def test_paginate_rows_ignores_unknown_sort_field():
+    page = paginate_rows(ROWS, sort_keys=SORT_KEYS, params=PageParams(sort="password"))
+    assert ids(page.items) == [1, 2, 3, 4]
+
+
+def test_paginate_rows_search_counts_matches_only():
+    page = paginate_rows(
+        ROWS,
+        sort_keys=SORT_KEYS,
+        search_text=lambda r: r["name"],
+        params=PageParams(limit=1, search="ALI"),
+    )
+    assert page.total == 2
+    assert ids(page.items) == [2]
+
+
+class Row(BaseModel):
+    id: int
+    name: str
+
+
+def test_paged_table_response():
+    rows = [Row(**r) for r in ROWS[:2]]
+    response = PagedTableResponse[Row].from_page(total=4, rows=rows).model_dump()
+    assert response == {"items": {"total": 4, "rows": ROWS[:2]}}
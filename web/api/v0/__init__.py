@@ -16,7 +16,7 @@ from webargs import fields
 from webargs.flaskparser import use_kwargs
 
 from pycroft.helpers import utc
-from pycroft.helpers.i18n import Message
+from pycroft.helpers.i18n import localized
 from pycroft.lib.finance import estimate_balance, get_last_import_date
 from pycroft.lib.mpsk_client import mpsk_edit, mpsk_client_create, mpsk_delete
 from pycroft.lib.host import change_mac, host_create, interface_create, host_edit
@@ -149,7 +149,7 @@ def generate_user_data(user: User) -> Response:
             "valid_on": split.transaction.valid_on,
             # Invert amount, to display it from the user's point of view
             "amount": -split.amount,
-            "description": Message.from_json(split.transaction.description).localize(),
+            "description": localized(split.transaction.description),
         }
         for split in user.account.splits
     ]
@@ -44,6 +44,7 @@ from .blueprints import (
 
 from .blueprints.login import oauth, login_manager
 from .commands import register_commands
+from .instrumentation import register_instrumentation
 from .templates import page_resources
 
 
@@ -136,6 +137,8 @@ def make_app(hades_logs: bool = True) -> PycroftFlask:
     )
 
     # initialization code
+    # first, so that the statements of every request are collected
+    register_instrumentation(app)
     login_manager.init_app(app)
     app.register_blueprint(user.bp, url_prefix="/user")
     app.register_blueprint(facilities.bp, url_prefix="/facilities")
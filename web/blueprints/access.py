@@ -4,16 +4,48 @@
 import typing as t
 from itertools import chain
 from flask.globals import current_app
-from flask import request, Blueprint, abort
+from flask import request, Blueprint, abort, g, has_app_context
 from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from werkzeug import Response
 
+from pycroft.model.user import Membership, Property, PropertyGroup, User
 from web.blueprints import bake_endpoint
 
 
+def current_properties() -> t.Container[str]:
+    """The properties of the current user.
+
+    They are evaluated at most once per request.  Changes of memberships
+    and properties flushed during the request are taken into account.
+    """
+    if "current_properties" not in g:
+        g.current_properties = frozenset(current_user.current_properties_set)
+    return t.cast(t.Container[str], g.current_properties)
+
+
+def properties_of(user: User) -> t.Container[str]:
+    """The properties of `user`, see :func:`current_properties` for the current user"""
+    if current_user.is_authenticated and user.id == current_user.id:
+        return current_properties()
+    return user.current_properties_set
+
+
+@event.listens_for(Session, "after_flush")
+def _forget_current_properties(session: Session, flush_context: t.Any) -> None:
+    if not has_app_context() or "current_properties" not in g:
+        return
+    if any(
+        isinstance(obj, Membership | Property | PropertyGroup)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        g.pop("current_properties")
+
+
 def _check_properties(properties: t.Iterable[str]) -> bool:
-    missing_props = set(properties) - current_user.current_properties_set
-    return not missing_props
+    granted = current_properties()
+    return all(prop in granted for prop in properties)
 
 
 class BlueprintAccess:
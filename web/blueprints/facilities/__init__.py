@@ -42,6 +42,7 @@ from pycroft.lib.facilities import (
 from pycroft.lib.infrastructure import create_patch_port, edit_patch_port, \
     delete_patch_port, \
     PatchPortAlreadyExistsException
+from pycroft.lib.logging import room_log_timeline
 from pycroft.model import session
 from pycroft.model.facilities import Room, Site, Building
 from pycroft.model.port import PatchPort
@@ -55,10 +56,17 @@ from web.blueprints.facilities.forms import (
     EditRoomForm,
     CreateAddressForm,
 )
-from web.blueprints.helpers.log import format_room_log_entry
+from web.blueprints.helpers.log import log_timeline_response
 from web.blueprints.helpers.user import user_button
 from web.blueprints.navigation import BlueprintNavigation
-from web.table.table import TableResponse, LinkColResponse, BtnColResponse, date_format
+from web.table.paging import server_side_paginated, paginate_rows
+from web.table.table import (
+    TableResponse,
+    LinkColResponse,
+    BtnColResponse,
+    PagedTableResponse,
+    date_format,
+)
 from .address import get_address_entity, address_entity_search_query
 from .tables import (
     BuildingLevelRoomTable,
@@ -74,7 +82,6 @@ from .tables import (
     RoomTenanciesRow,
 )
 from ..helpers.exception import abort_on_error, ErrorHandlerMap
-from ..helpers.log_tables import LogTableRow
 from ...template_filters import date_filter
 
 bp = Blueprint('facilities', __name__)
@@ -550,11 +557,10 @@ def room_show(room_id: int) -> ResponseReturnValue:
 
 
 @bp.route('/room/<int:room_id>/logs/json')
+@server_side_paginated
 def room_logs_json(room_id: int) -> ResponseReturnValue:
     room = get_room_or_404(room_id)
-    return TableResponse[LogTableRow](
-        items=[format_room_log_entry(entry) for entry in reversed(room.log_entries)]
-    ).model_dump()
+    return log_timeline_response(room_log_timeline(room))
 
 
 @bp.route('/room/<int:room_id>/patchpanel/json')
@@ -672,26 +678,42 @@ def overcrowded(building_id: int) -> ResponseReturnValue:
             data_url=url_for('.overcrowded_json', building_id=building_id)),
     )
 
+
+def _overcrowded_room_title(room: Room) -> str:
+    return f"{room.building.short_name} / {room.level:02d} / {room.number}"
+
+
 @bp.route('/overcrowded/json', defaults={'building_id': None})
 @bp.route('/overcrowded/<int:building_id>/json')
+@server_side_paginated
 def overcrowded_json(building_id: int) -> ResponseReturnValue:
-    return TableResponse[RoomOvercrowdedRow](
-        items=[
+    page = paginate_rows(
+        get_overcrowded_rooms(building_id).values(),
+        sort_keys={
+            "room": lambda inhabitants: (
+                inhabitants[0].room.building.short_name,
+                inhabitants[0].room.level,
+                inhabitants[0].room.number,
+            ),
+        },
+        search_text=lambda inhabitants: " ".join(
+            [_overcrowded_room_title(inhabitants[0].room), *(u.name for u in inhabitants)]
+        ),
+    )
+    return PagedTableResponse[RoomOvercrowdedRow].from_page(
+        total=page.total,
+        rows=[
             RoomOvercrowdedRow(
                 room=LinkColResponse(
-                    title="{} / {:02d} / {}".format(
-                        inhabitants[0].room.building.short_name,
-                        inhabitants[0].room.level,
-                        inhabitants[0].room.number,
-                    ),
+                    title=_overcrowded_room_title(inhabitants[0].room),
                     href=url_for(
                         "facilities.room_show", room_id=inhabitants[0].room.id
                     ),
                 ),
                 inhabitants=[user_button(user) for user in inhabitants],
             )
-            for inhabitants in get_overcrowded_rooms(building_id).values()
-        ]
+            for inhabitants in page.items
+        ],
     ).model_dump()
 
 
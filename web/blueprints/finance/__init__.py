@@ -468,7 +468,7 @@ def bank_accounts_import_run(bank_account_id: int) -> ResponseReturnValue:
 
     fints_client.resume_dialog(dialog_data)
 
-    session.add_all(imported.new)
+    finance.insert_activities(session, imported.new)
     session.commit()
     flash(
         f"{len(imported.new)} Bankkontobewegungen wurden importiert.",
@@ -894,21 +894,25 @@ def account_toggle_legacy(account_id: int) -> ResponseReturnValue:
 def balance_json(account_id: int) -> ResponseReturnValue:
     invert = request.args.get('invert', 'False') == 'True'
 
+    # one point per day is enough for the chart
+    daily = (
+        select(Transaction.valid_on, func.sum(Split.amount).label("amount"))
+        .select_from(Join(Split, Transaction, Split.transaction_id == Transaction.id))
+        .where(Split.account_id == account_id)
+        .group_by(Transaction.valid_on)
+        .subquery("daily")
+    )
     sum_exp: ColumnElement[int] = t.cast(
         Over[int],
-        func.sum(Split.amount).over(order_by=Transaction.valid_on),
+        func.sum(daily.c.amount).over(order_by=daily.c.valid_on),
     )
 
     if invert:
         sum_exp = -sum_exp
 
-    balance_json = (select(Transaction.valid_on,
-                           sum_exp.label("balance")
-                           )
-                    .select_from(
-        Join(Split, Transaction,
-             Split.transaction_id == Transaction.id))
-                    .where(Split.account_id == account_id))
+    balance_json = select(daily.c.valid_on, sum_exp.label("balance")).order_by(
+        daily.c.valid_on
+    )
 
     res = session.scalar(json_agg_core(balance_json))
     assert res is not None
@@ -936,7 +940,8 @@ def accounts_show(account_id: int) -> ResponseReturnValue:
     inverted = account.type == "USER_ASSET"
 
     tbl_data_url = url_for("finance.accounts_show_json", account_id=account_id)
-    balance = -account.balance if inverted else account.balance
+    saldo = account.balance
+    balance = -saldo if inverted else saldo
 
     return render_template(
         'finance/accounts_show.html',
@@ -945,12 +950,12 @@ def accounts_show(account_id: int) -> ResponseReturnValue:
                                  invert=inverted),
         finance_table_regular=FinanceTable(
             data_url=tbl_data_url,
-            saldo=account.balance,
+            saldo=saldo,
             inverted=inverted,
         ),
         finance_table_splitted=FinanceTableSplitted(
             data_url=tbl_data_url,
-            saldo=account.balance,
+            saldo=saldo,
             inverted=inverted,
         ),
         account_name=localized(account.name, {int: {'insert_commas': False}})
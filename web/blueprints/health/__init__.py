@@ -10,8 +10,16 @@ bp = Blueprint("health", __name__)
 @bp.route("hades-logs")
 def hades() -> ResponseReturnValue:
     try:
-        hades_logs.fetch_logs(nasipaddress="10.160.0.75", nasportid="2/1/39")
+        hades_logs.fetch_logs(nasipaddress="10.160.0.75", nasportid="2/1/39", cached=False)
     except HadesError as e:
         return f"CRIT {e}"
     else:
         return "OK"
+
+
+@bp.route("hades-logs/cache")
+def hades_cache() -> ResponseReturnValue:
+    try:
+        return hades_logs.cache.stats()._asdict()
+    except HadesError as e:
+        return f"CRIT {e}"
@@ -6,40 +6,108 @@ sources of logs to a dict.  The latter represents a valid table row to
 :class:`LogTableExtended`.
 
 """
+import heapq
 import typing as t
 from datetime import datetime, timezone
 from functools import partial
 
-from flask import url_for
+from flask import abort, request, url_for
+from sqlalchemy import Subquery
 
 from hades_logs import RadiusLogEntry
-from pycroft.helpers.i18n import Message
-from pycroft.model.logging import LogEntry
+from pycroft.helpers.i18n import localized
+from pycroft.lib.logging import (
+    LogCursor,
+    TimelineEntry,
+    count_log_timeline,
+    fetch_log_timeline,
+)
+from pycroft.model import session
+from web.table.paging import PageParams
 from web.table.table import (
     datetime_format,
     UserColResponseNative,
     UserColResponsePlain,
 )
-from .log_tables import LogType, LogTableRow
+from .log_tables import LogTableRow, LogTablePage, LogTableResponse
 
 from web.template_filters import datetime_filter
 
 
-def format_log_entry(entry: LogEntry, log_type: LogType) -> LogTableRow:
+def format_timeline_entry(entry: TimelineEntry) -> LogTableRow:
     return LogTableRow(
         created_at=datetime_format(entry.created_at, formatter=datetime_filter),
         user=UserColResponseNative(
-            title=entry.author.name,
-            href=url_for("user.user_show", user_id=entry.author.id),
+            title=entry.author_name,
+            href=url_for("user.user_show", user_id=entry.author_id),
         ),
-        message=Message.from_json(entry.message).localize(),
-        type=log_type,
+        message=localized(entry.message),
+        type=entry.type,
     )
 
 
-format_user_log_entry = partial(format_log_entry, log_type='user')
-format_task_log_entry = partial(format_log_entry, log_type='task')
-format_room_log_entry = partial(format_log_entry, log_type='room')
+def _row_time(row: LogTableRow) -> int:
+    return row.created_at.timestamp or 0
+
+
+def _merge_rows(
+    rows: t.Iterable[LogTableRow], other_rows: t.Iterable[LogTableRow]
+) -> list[LogTableRow]:
+    """Merge `other_rows` into `rows`, which are sorted newest first"""
+    other_rows = sorted(other_rows, key=_row_time, reverse=True)
+    return list(heapq.merge(rows, other_rows, key=_row_time, reverse=True))
+
+
+def log_timeline_response(
+    timeline: Subquery,
+    first_page_rows: t.Callable[[], t.Iterable[LogTableRow]] | None = None,
+) -> dict[str, t.Any]:
+    """Respond with the requested page of a log timeline.
+
+    Besides the parameters of :class:`~web.table.paging.PageParams`
+    (sorting only by ``created_at``), the ``cursor`` returned with a page
+    can be passed to fetch the next one.  Searching, sorting and paging
+    happen in the database, so only the entries of the page are formatted.
+
+    :param timeline: see :func:`pycroft.lib.logging.user_log_timeline`
+    :param first_page_rows: rows from other sources, e.g. the Hades logs.
+        They are only fetched for the first page (newest first), where they
+        are merged into the entries of the timeline.  They are neither
+        counted in the ``total`` nor in the page size.
+    """
+    params = PageParams.from_request()
+    try:
+        after = LogCursor.decode(c) if (c := request.args.get("cursor")) else None
+    except ValueError:
+        abort(400)
+
+    ascending = params.sort == "created_at" and not params.descending
+    page = fetch_log_timeline(
+        session.session,
+        timeline,
+        limit=params.limit,
+        after=after,
+        offset=params.offset,
+        ascending=ascending,
+        search=params.search,
+    )
+    rows = [format_timeline_entry(entry) for entry in page.entries]
+    total = count_log_timeline(session.session, timeline, search=params.search)
+
+    if first_page_rows is not None and after is None and params.offset == 0 and not ascending:
+        extra: t.Iterable[LogTableRow] = first_page_rows()
+        if params.search:
+            needle = params.search.casefold()
+            extra = (row for row in extra if needle in row.message.casefold())
+        rows = _merge_rows(rows, extra)
+
+    return LogTableResponse(
+        items=LogTablePage(
+            total=total,
+            rows=rows,
+            cursor=page.cursor.encode() if page.cursor else None,
+        )
+    ).model_dump()
 
 
 class SupportsFormat(t.Protocol):
@@ -14,6 +14,7 @@ from web.table.table import (
     DateColResponse,
     UserColResponse,
     TableArgs,
+    TablePage,
 )
 
 
@@ -63,3 +64,14 @@ class LogTableRow(BaseModel):
     type: LogType | None = None
     user: UserColResponse
     message: str
+
+
+class LogTablePage(TablePage[LogTableRow]):
+    #: pass as ``cursor`` to fetch the next page; ``None`` if there are none
+    cursor: str | None = None
+
+
+class LogTableResponse(BaseModel):
+    """The response of a server-side paginated log endpoint"""
+
+    items: LogTablePage
@@ -15,7 +15,8 @@ from flask.typing import ResponseValue
 from flask_login import current_user
 from flask_wtf import FlaskForm as Form
 from netaddr import IPAddress
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, contains_eager
 
 from pycroft.lib.infrastructure import create_switch, \
     edit_switch, delete_switch, create_switch_port, \
@@ -25,13 +26,19 @@ from pycroft.lib.net import get_subnets_with_usage
 from pycroft.lib.host import sort_ports
 from pycroft.model import session
 from pycroft.model.facilities import Room
-from pycroft.model.host import Switch, SwitchPort
+from pycroft.model.host import Host, Switch, SwitchPort
 from pycroft.model.net import VLAN, Subnet
 from pycroft.model.port import PatchPort
 from web.blueprints.access import BlueprintAccess
 from web.blueprints.infrastructure.forms import SwitchForm, SwitchPortForm
 from web.blueprints.navigation import BlueprintNavigation
-from web.table.table import LinkColResponse, TableResponse, BtnColResponse
+from web.table.paging import server_side_paginated, paginate_query, paginate_rows
+from web.table.table import (
+    LinkColResponse,
+    TableResponse,
+    BtnColResponse,
+    PagedTableResponse,
+)
 from .tables import (
     SubnetTable,
     SwitchTable,
@@ -61,9 +68,24 @@ def format_reserved_addresses(subnet: Subnet) -> list[str]:
 
 
 @bp.route('/subnets/json')
+@server_side_paginated
 def subnets_json() -> ResponseValue:
-    return TableResponse[SubnetRow](
-        items=[
+    page = paginate_rows(
+        get_subnets_with_usage(),
+        sort_keys={
+            "id": lambda row: row[0].id,
+            "description": lambda row: row[0].description or "",
+            "address": lambda row: row[0].address.sort_key(),
+            "gateway": lambda row: str(row[0].gateway),
+            "free_ips": lambda row: row[1].free_ips,
+        },
+        search_text=lambda row: " ".join(
+            str(v) for v in (row[0].id, row[0].description, row[0].address, row[0].gateway)
+        ),
+    )
+    return PagedTableResponse[SubnetRow].from_page(
+        total=page.total,
+        rows=[
             SubnetRow(
                 id=subnet.id,
                 description=subnet.description,
@@ -73,8 +95,8 @@ def subnets_json() -> ResponseValue:
                 free_ips=str(usage.free_ips),
                 free_ips_formatted=f"{usage.free_ips} (von {usage.max_ips})",
             )
-            for subnet, usage in get_subnets_with_usage()
-        ]
+            for subnet, usage in page.items
+        ],
     ).model_dump()
 
 
@@ -87,9 +109,22 @@ def switches() -> ResponseValue:
 
 
 @bp.route('/switches/json')
+@server_side_paginated
 def switches_json() -> ResponseValue:
-    return TableResponse[SwitchRow](
-        items=[
+    page = paginate_query(
+        session.session,
+        select(Switch).join(Switch.host).options(contains_eager(Switch.host)),
+        sort_columns={
+            "id": Switch.host_id,
+            "name": Host.name,
+            "ip": Switch.management_ip,
+        },
+        default_order=[Switch.host_id],
+        search_columns=[Host.name, Switch.management_ip],
+    )
+    return PagedTableResponse[SwitchRow].from_page(
+        total=page.total,
+        rows=[
             SwitchRow(
                 id=switch.host_id,
                 name=LinkColResponse(
@@ -110,8 +145,8 @@ def switches_json() -> ResponseValue:
                     btn_class="btn-link",
                 ),
             )
-            for switch in Switch.q.options(joinedload(Switch.host)).all()
-        ]
+            for switch in page.items
+        ],
     ).model_dump()
 
 
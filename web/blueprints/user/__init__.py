@@ -34,6 +34,7 @@ from flask.typing import ResponseReturnValue
 from flask_login import current_user
 from flask_wtf import FlaskForm
 from markupsafe import Markup
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 import pycroft.lib.search
@@ -45,18 +46,19 @@ from pycroft.helpers.i18n import gettext, deferred_gettext
 from pycroft.helpers.interval import closed, closedopen, starting_from
 from pycroft.helpers.net import ip_regex, mac_regex
 from pycroft.lib.facilities import get_room
-from pycroft.lib.logging import log_user_event
+from pycroft.lib.logging import log_user_event, user_log_timeline, LogKind, LOG_KINDS
+from pycroft.lib.search import SearchCursor
 from pycroft.lib.membership import (
     make_member_of,
     remove_member_of,
     change_membership_active_during,
     delete_membership,
 )
-from pycroft.lib.traffic import get_users_with_highest_traffic
+from pycroft.lib.traffic import get_traffic_leaderboard, get_traffic_history
 from pycroft.lib.user import encode_type1_user_id, encode_type2_user_id, \
-    traffic_history, generate_user_sheet, get_blocked_groups, \
+    generate_user_sheet, get_blocked_groups, \
     finish_member_request, send_confirmation_email, \
-    delete_member_request, get_member_requests, \
+    delete_member_request, MEMBER_REQUEST_ORDER, \
     get_possible_existing_users_for_pre_member, \
     send_member_request_merged_email, can_target, edit_address
 from pycroft.lib.user_deletion import (
@@ -73,6 +75,7 @@ from pycroft.model.user import (
     User,
     Membership,
     BaseUser,
+    PreMember,
     RoomHistoryEntry,
     PropertyGroup,
 )
@@ -104,8 +107,10 @@ from web.blueprints.user.forms import (
     NonResidentUserCreateForm,
     GroupMailForm,
 )
+from web.table.paging import server_side_paginated, paginate_query, paginate_rows
 from web.table.table import (
     TableResponse,
+    PagedTableResponse,
     LinkColResponse,
     datetime_format,
     BtnColResponse,
@@ -122,6 +127,7 @@ from .tables import (
     ArchivableMembersTable,
     TrafficTopRow,
     UserSearchRow,
+    QuickSearchResponse,
     MembershipRow,
     TenancyRow,
     RoomHistoryRow,
@@ -134,11 +140,11 @@ from ..helpers.log_tables import (
     LogTableSpecific,
     LogType,
     is_log_type,
-    LogTableRow,
+    LogTablePage,
+    LogTableResponse,
 )
 from ..finance.tables import FinanceTable, FinanceTableSplitted
-from ..helpers.log import format_user_log_entry, format_room_log_entry, \
-    format_task_log_entry
+from ..helpers.log import log_timeline_response
 from ...template_filters import date_filter, datetime_filter
 
 bp = Blueprint('user', __name__)
@@ -166,6 +172,7 @@ def overview() -> ResponseReturnValue:
                 "href": None,
                 "number": stats.not_paid_members}]
     return render_template("user/user_overview.html", entries=entries,
+                           traffic_top=get_traffic_leaderboard(session.session),
                            traffic_top_table=TrafficTopTable(
                                 data_url=url_for("user.json_users_highest_traffic"),
                                 table_args={'data-page-size': 10,
@@ -218,6 +225,7 @@ def static_datasheet(user_id: int) -> ResponseReturnValue:
 
 @bp.route('/json/traffic-usage')
 def json_users_highest_traffic() -> ResponseReturnValue:
+    """The precomputed traffic leaderboard (see `pycroft.task.refresh_traffic_top`)."""
     return TableResponse[TrafficTopRow](
         items=[
             TrafficTopRow(
@@ -228,7 +236,7 @@ def json_users_highest_traffic() -> ResponseReturnValue:
                     href=url_for(".user_show", user_id=user.id), title=user.name
                 ),
             )
-            for user in get_users_with_highest_traffic(7, 20)
+            for user in get_traffic_leaderboard(session.session).users
         ]
     ).model_dump()
 
@@ -242,6 +250,7 @@ def and_then[T, U](val: T | None, map: Callable[[T], U]) -> U | None:
 
 
 @bp.route('/json/search')
+@server_side_paginated
 def json_search() -> ResponseReturnValue:
     g = request.args.get
     try:
@@ -262,30 +271,61 @@ def json_search() -> ResponseReturnValue:
     if ip_invalid or mac_invalid:
         return abort(400)
 
-    search_query = lib.search.user_search_query(
+    criteria = (
         user_id, name, login, mac, ip_address, property_group_id, building_id, email, person_id,
         query
     )
+    if all(c is None or c == "" for c in criteria):
+        # don't list all users if nothing has been searched for
+        return PagedTableResponse[UserSearchRow].from_page(total=0, rows=[]).model_dump()
+
+    page = paginate_query(
+        session.session,
+        lib.search.user_search_query(*criteria),
+        sort_columns={"id": User.id, "url": User.name, "login": User.login},
+        default_order=[User.id],
+    )
 
-    return TableResponse[UserSearchRow](
-        items=[
-            UserSearchRow(
-                id=found_user.id,
-                name=found_user.name,
-                url=LinkColResponse(
-                    href=url_for(".user_show", user_id=found_user.id),
-                    title=found_user.name,
-                ),
-                login=found_user.login,
-                room_id=found_user.room_id if found_user.room_id is not None else None,
-            )
-            for found_user in (
-                search_query.all() if search_query.count() < User.q.count() else []
-            )
-        ]
+    return PagedTableResponse[UserSearchRow].from_page(
+        total=page.total,
+        rows=[_user_search_row(found_user) for found_user in page.items],
     ).model_dump()
 
 
+@bp.route('/json/quick-search')
+def json_quick_search() -> ResponseReturnValue:
+    """Search users as you type, best matches first.
+
+    See :func:`pycroft.lib.search.ranked_user_search`.  If there are more results,
+    they can be fetched by passing the returned ``cursor`` as a parameter.
+    """
+    try:
+        after = and_then(request.args.get("cursor") or None, SearchCursor.decode)
+    except ValueError:
+        return abort(400)
+
+    result = lib.search.ranked_user_search(
+        session.session, request.args.get("query", ""), after=after
+    )
+    return QuickSearchResponse(
+        items=[_user_search_row(ranked.user) for ranked in result.users],
+        cursor=and_then(result.cursor, SearchCursor.encode),
+    ).model_dump()
+
+
+def _user_search_row(user: User) -> UserSearchRow:
+    return UserSearchRow(
+        id=user.id,
+        name=user.name,
+        url=LinkColResponse(
+            href=url_for(".user_show", user_id=user.id),
+            title=user.name,
+        ),
+        login=user.login,
+        room_id=user.room_id,
+    )
+
+
 class InfoflagDict(t.TypedDict):
     title: str
     icon: str
@@ -408,33 +448,44 @@ def user_account(user_id: int) -> ResponseReturnValue:
                             account_id=user.account_id))
 
 
-def _iter_user_logs(user: User, logtype: LogType) -> t.Iterator[LogTableRow]:
-    if logtype in ["user", "all"]:
-        yield from (format_user_log_entry(e) for e in user.log_entries)
-    if logtype in ["room", "all"] and user.room:
-        yield from (format_room_log_entry(e) for e in user.room.log_entries)
-    if logtype in ["tasks", "all"]:
-        yield from (format_task_log_entry(e) for e in user.task_log_entries)
-    if logtype in ["hades", "all"]:
-        yield from formatted_user_hades_logs(user)
+_user_log_kinds: dict[LogType, tuple[LogKind, ...]] = {
+    "user": ("user",),
+    "room": ("room",),
+    "task": ("task",),
+    "all": LOG_KINDS,
+}
 
 
 @bp.route("/<int:user_id>/logs")
 @bp.route("/<int:user_id>/logs/<logtype>")
+@server_side_paginated
 def user_show_logs_json(user_id: int, logtype: str = "all") -> ResponseReturnValue:
+    """The logs of a user, newest first.
+
+    The user, room and task logs are merged by the database and paginated
+    (see :func:`~web.blueprints.helpers.log.log_timeline_response`).
+    The Hades logs are only fetched for the first page.
+    """
     user = get_user_or_404(user_id)
 
     if not is_log_type(logtype):
         flash(f"{logtype!r} ist kein valider logtyp", "error")
         abort(404)
-    logs = _iter_user_logs(user, logtype)
 
-    def sort_key(l: LogTableRow) -> int | None:
-        return l.created_at.timestamp
+    if logtype == "hades":
+        page = paginate_rows(
+            formatted_user_hades_logs(user),
+            sort_keys={"created_at": lambda row: row.created_at.timestamp or 0},
+            search_text=lambda row: row.message,
+        )
+        return LogTableResponse(
+            items=LogTablePage(total=page.total, rows=list(page.items))
+        ).model_dump()
 
-    return TableResponse[LogTableRow](
-        items=sorted(logs, key=sort_key, reverse=True)
-    ).model_dump()
+    return log_timeline_response(
+        user_log_timeline(user, _user_log_kinds[logtype]),
+        first_page_rows=(lambda: formatted_user_hades_logs(user)) if logtype == "all" else None,
+    )
 
 
 @bp.route("/<int:user_id>/groups")
@@ -622,22 +673,29 @@ def end_membership(user_id: int, membership_id: int) -> ResponseReturnValue:
                             _anchor='groups'))
 
 
+MAX_TRAFFIC_HISTORY_DAYS = 366
+
+
 @bp.route('/<int:user_id>/traffic/json')
 @bp.route('/<int:user_id>/traffic/json/<int:days>')
 def json_trafficdata(user_id: int, days: int = 7) -> ResponseReturnValue:
     """Generate a JSON file to use with traffic and credit graphs.
 
+    Ranges longer than a week are answered from the traffic rollups,
+    ranges longer than a quarter per month.
+
     :param user_id:
-    :param days: optional amount of days to be included
+    :param days: optional amount of days to be included, at most a year
     :return:
     """
-    interval = timedelta(days=days)
-    utcnow = session.utcnow()
+    if not 1 <= days <= MAX_TRAFFIC_HISTORY_DAYS:
+        abort(404)
+    today = session.utcnow().date()
     return jsonify(
         [
             e.__dict__
-            for e in traffic_history(
-                user_id, utcnow - interval + timedelta(days=1), utcnow
+            for e in get_traffic_history(
+                session.session, user_id, today - timedelta(days=days - 1), today
             )
         ]
     )
@@ -1427,11 +1485,25 @@ def member_request_merge_confirm(
 
 
 @bp.route('json/member-requests')
+@server_side_paginated
 def member_requests_json() -> ResponseReturnValue:
-    prms = get_member_requests()
+    page = paginate_query(
+        session.session,
+        select(PreMember),
+        sort_columns={
+            "prm_id": PreMember.id,
+            "name": PreMember.name,
+            "login": PreMember.login,
+            "email": PreMember.email,
+            "move_in_date": PreMember.move_in_date,
+        },
+        default_order=MEMBER_REQUEST_ORDER,
+        search_columns=(PreMember.name, PreMember.login, PreMember.email),
+    )
 
-    return TableResponse[PreMemberRow](
-        items=[
+    return PagedTableResponse[PreMemberRow].from_page(
+        total=page.total,
+        rows=[
             PreMemberRow(
                 prm_id=encode_type2_user_id(prm.id),
                 name=TextWithBooleanColResponse(
@@ -1464,8 +1536,8 @@ def member_requests_json() -> ResponseReturnValue:
                     ),
                 ],
             )
-            for prm in prms
-        ]
+            for prm in page.items
+        ],
     ).model_dump()
 
 
@@ -1526,9 +1598,24 @@ def scrub_mails() -> ResponseReturnValue:
 
 
 @bp.route('/archivable_users_table')
+@server_side_paginated
 def archivable_users_json() -> ResponseReturnValue:
-    return TableResponse[ArchivableMemberRow](
-        items=[
+    page = paginate_rows(
+        get_archivable_members(session.session),
+        sort_keys={
+            "id": lambda info: info.User.id,
+            "user": lambda info: info.User.name,
+            "room_shortname": lambda info: r.short_name if (r := info.User.room) else "",
+            "num_hosts": lambda info: len(info.User.hosts),
+            "end_of_membership": lambda info: info.mem_end,
+        },
+        search_text=lambda info: " ".join(
+            (info.User.name, info.User.login, r.short_name if (r := info.User.room) else "")
+        ),
+    )
+    return PagedTableResponse[ArchivableMemberRow].from_page(
+        total=page.total,
+        rows=[
             ArchivableMemberRow(
                 id=info.User.id,
                 user=LinkColResponse(
@@ -1548,8 +1635,8 @@ def archivable_users_json() -> ResponseReturnValue:
                 num_hosts=len(info.User.hosts),
                 end_of_membership=date_format(info.mem_end.date()),
             )
-            for info in get_archivable_members(session.session)
-        ]
+            for info in page.items
+        ],
     ).model_dump()
 
 
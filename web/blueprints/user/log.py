@@ -45,14 +45,19 @@ def iter_hades_switch_ports(room: Room) -> t.Sequence[Row[tuple[str, IPAddress]]
 def get_user_hades_logs(user: User) -> t.Iterator[tuple[PatchPort, RadiusLogEntry]]:
     """Iterate over a user's hades logs
 
+    The logs of all switch ports are fetched at once.
+
     :param user: the user whose logs to display
 
     :returns: an iterator over duples (interface, log_entry).
+
+    :raises HadesTimeout: after the logs of the other ports, if the lookup
+        of some port timed out
     """
     # Accessing the `hades_logs` proxy early ensures the exception is
     # raised even if there's no SwitchPort
 
-    do_fetch = hades_logs.fetch_logs
+    do_fetch = hades_logs.fetch_logs_many
     q: Query = session.session.query(SwitchPort)
     ports = (
         q
@@ -61,10 +66,19 @@ def get_user_hades_logs(user: User) -> t.Iterator[tuple[PatchPort, RadiusLogEntr
         .join(User)
         .filter(User.id == user.id)
         .distinct()
+        .all()
      )
-    for port in ports:
-        for log_entry in do_fetch(str(port.switch.management_ip), port.name):
+    port_logs = do_fetch((str(port.switch.management_ip), port.name) for port in ports)
+    timed_out = []
+    for port, logs in zip(ports, port_logs, strict=True):
+        if logs.timed_out:
+            timed_out.append(port)
+        for log_entry in logs.logs:
             yield port, log_entry
+    if timed_out:
+        raise HadesTimeout(
+            "The Hades lookup timed out for " + ", ".join(str(p) for p in timed_out)
+        )
 
 
 def is_user_connected(user: User) -> bool:
@@ -73,6 +73,11 @@ class MembershipRow(BaseModel):
 
 class SearchTable(BootstrapTable):
     """A table for displaying search results"""
+    class Meta:
+        table_args = {
+            'data-query-params': 'user_search_query_params',
+        }
+
     id = Column("ID")
     url = LinkColumn("Name")
     login = Column("Login")
@@ -92,6 +97,12 @@ class UserSearchRow(BaseModel):
     room_id: int | None = None
 
 
+class QuickSearchResponse(BaseModel):
+    items: list[UserSearchRow]
+    #: pass as ``cursor`` to fetch the next results; ``None`` if there are none
+    cursor: str | None = None
+
+
 class TrafficTopTable(BootstrapTable):
     """A table for displaying the users with the highest traffic usage"""
     url = LinkColumn("Name")
@@ -173,7 +184,9 @@ class ArchivableMembersTable(RefreshableTableMixin, BootstrapTable):
     user = LinkColumn("Mitglied")
     room_shortname = LinkColumn("<i class=\"fas fa-home\"></i>")
     num_hosts = Column("<i class=\"fas fa-laptop\"></i>")
-    current_properties = Column("Props", formatter="table.propertiesFormatter")
+    current_properties = Column(
+        "Props", formatter="table.propertiesFormatter", sortable=False
+    )
     end_of_membership = DateColumn("EOM")
 
 
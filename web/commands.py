@@ -7,7 +7,9 @@ import os
 import click
 from alembic import command
 from flask import Flask
+from sqlalchemy.orm import Session
 
+from pycroft.lib.finance import find_balance_mismatches, repair_balance_mismatches
 from pycroft.model import create_db_model
 from pycroft.model import create_engine, drop_db_model
 from pycroft.model.alembic import get_alembic_config
@@ -42,3 +44,25 @@ def register_commands(app: Flask) -> None:
             alembic_cfg.attributes["connection"] = conn
             command.upgrade(alembic_cfg, "head")
         app.logger.info("…done ")
+
+    @cli.command(
+        "check-account-balances",
+        help="Compare the recorded account balances to the sums of the splits.",
+    )
+    @click.option("--repair", is_flag=True, help="Correct the balances which are wrong.")
+    def check_account_balances(repair: bool) -> None:
+        engine = create_engine(os.getenv("PYCROFT_DB_URI"))
+        with Session(engine) as session, session.begin():
+            if repair:
+                mismatches = repair_balance_mismatches(session)
+            else:
+                mismatches = find_balance_mismatches(session)
+
+        for m in mismatches:
+            click.echo(f"account {m.account_id}: recorded {m.recorded}, actual {m.actual}")
+        if not mismatches:
+            click.echo("All account balances are consistent.")
+        elif repair:
+            click.echo(f"Repaired {len(mismatches)} account balances.")
+        else:
+            raise click.exceptions.Exit(1)
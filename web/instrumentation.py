@@ -0,0 +1,187 @@
+#  Copyright (c) 2026. The Pycroft Authors. See the AUTHORS file.
+#  This file is part of the Pycroft project and licensed under the terms of
+#  the Apache License, Version 2.0. See the LICENSE file for details
+"""
+web.instrumentation
+~~~~~~~~~~~~~~~~~~~
+
+Counting the SQL statements of every request.
+
+The statements are recorded by listeners on all SQLAlchemy engines.  Per
+request, the number of statements and the time spent in the database are
+sent as ``Server-Timing`` header and logged.  Statements executed many
+times within one request (usually lazy loads in a loop, i.e. N+1 queries)
+are logged as a warning.
+"""
+import contextlib
+import contextvars
+import logging
+import re
+import time
+import typing as t
+from collections import Counter
+
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+
+logger = logging.getLogger(__name__)
+
+#: matches the bind parameters of an expanded ``IN``, so that statements
+#: only differing in the number of parameters have the same shape
+_expanded_in = re.compile(r"IN \((?:%\(\w+\)s(?:, )?)+\)")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with a variable number of parameters collapsed"""
+    return _expanded_in.sub("IN (...)", statement)
+
+
+class QueryStats:
+    """The statements executed while collecting, see :func:`collect_queries`"""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self) -> None:
+        #: the number of statements
+        self.count = 0
+        #: the time spent executing them in seconds
+        self.duration = 0.0
+        #: the number of executions of every statement
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """The statement shapes executed at least `threshold` times"""
+        shapes: Counter[str] = Counter()
+        for statement, n in self.statements.items():
+            shapes[statement_shape(statement)] += n
+        return {shape: n for shape, n in shapes.most_common() if n >= threshold}
+
+
+_collectors: contextvars.ContextVar[tuple[QueryStats, ...]] = contextvars.ContextVar(
+    "query_collectors", default=()
+)
+
+
+@contextlib.contextmanager
+def collect_queries() -> t.Iterator[QueryStats]:
+    """Record the statements executed within the block
+
+    Collectors can be nested, every statement is recorded by all of them.
+    """
+    stats = QueryStats()
+    token = _collectors.set((*_collectors.get(), stats))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: t.Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if _collectors.get():
+        # keyed by cursor, as statements may be executed within the execution of another
+        conn.info.setdefault("query_start", {})[cursor] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: t.Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if not (collectors := _collectors.get()):
+        return
+    start = conn.info.get("query_start", {}).pop(cursor, None)
+    if start is None:
+        # collecting started while the statement was running
+        return
+    duration = time.perf_counter() - start
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context: ExceptionContext) -> None:
+    # `after_cursor_execute` is not called for a failing statement
+    if (conn := exception_context.connection) is not None:
+        conn.info.get("query_start", {}).pop(exception_context.cursor, None)
+
+
+def register_instrumentation(app: Flask) -> None:
+    """Collect the statements of every request of `app`
+
+    The thresholds above which a request is logged as a warning
+    can be configured by
+
+        - 'SQL_WARN_QUERIES' (default 100): the number of statements
+        - 'SQL_WARN_DURATION' (default 1): the time spent in the database in seconds
+        - 'SQL_WARN_REPEATED' (default 10): the number of executions of one statement
+    """
+    app.config.setdefault("SQL_WARN_QUERIES", 100)
+    app.config.setdefault("SQL_WARN_DURATION", 1.0)
+    app.config.setdefault("SQL_WARN_REPEATED", 10)
+
+    @app.before_request
+    def start_collecting() -> None:
+        g.query_stats = stats = QueryStats()
+        g.query_collectors_token = _collectors.set((*_collectors.get(), stats))
+        g.request_start = time.perf_counter()
+
+    @app.teardown_request
+    def stop_collecting(exception: BaseException | None = None) -> None:
+        # unlike `after_request`, this is called even after unhandled exceptions
+        if (token := g.pop("query_collectors_token", None)) is not None:
+            _collectors.reset(token)
+
+    @app.after_request
+    def report_queries(response: Response) -> Response:
+        if (stats := g.get("query_stats")) is None:
+            return response
+        total = time.perf_counter() - g.request_start
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"',
+        )
+        response.headers.add("Server-Timing", f"app;dur={total * 1000:.1f}")
+
+        repeated = stats.repeated(app.config["SQL_WARN_REPEATED"])
+        too_slow = (
+            stats.count >= app.config["SQL_WARN_QUERIES"]
+            or stats.duration >= app.config["SQL_WARN_DURATION"]
+            or repeated
+        )
+        logger.log(
+            logging.WARNING if too_slow else logging.DEBUG,
+            "%s %s: %d queries in %.1f ms%s",
+            request.method,
+            request.path,
+            stats.count,
+            stats.duration * 1000,
+            "".join(f"\n  {n}x {shape}" for shape, n in repeated.items()),
+            extra={
+                "endpoint": request.endpoint,
+                "sql_queries": stats.count,
+                "sql_duration": stats.duration,
+                "sql_repeated": repeated,
+                "duration": total,
+            },
+        )
+        return response
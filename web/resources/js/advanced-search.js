@@ -11,17 +11,12 @@ $(function() {
     const $form = $('.form-basic');
     const $results = $('#results');
 
+    // the search criteria are added by `user_search_query_params`,
+    // so they are also sent when switching pages.
     function refreshTable() {
-        const params = {};
-
-        $form.find('input,select').each(function (key, obj) {
-            params[$(obj).attr("name")] = $(obj).val();
-        });
-
-        $results.bootstrapTable('refresh', {query: params});
+        $results.bootstrapTable('refresh', {pageNumber: 1});
     }
 
     $form.find('input').keyup(_.debounce(refreshTable, 250));
     $form.find('select').change(_.debounce(refreshTable, 250));
-    refreshTable();
 });
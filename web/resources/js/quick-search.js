@@ -17,7 +17,7 @@ export const users = new Bloodhound({
     queryTokenizer: Bloodhound.tokenizers.whitespace,
     remote: {
         wildcard: '%QUERY',
-        url: `${$SCRIPT_ROOT}/user/json/search?query=%QUERY`,
+        url: `${$SCRIPT_ROOT}/user/json/quick-search?query=%QUERY`,
         ttl: 60,
         transform: response => response.items,
     },
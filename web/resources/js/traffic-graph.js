@@ -37,7 +37,10 @@ const options = {
     colors: ["#1f77b4", "#b55d1f"],
 }
 
+const charts = new Map();
+
 function renderChart(el, json) {
+    charts.get(el)?.destroy();
     const chart = new ApexCharts(el, {
         ...options,
         series: [  // TODO transpose the JSON response on the backend
@@ -49,9 +52,18 @@ function renderChart(el, json) {
             categories: json.map(x => x.timestamp),
         },
     })
+    charts.set(el, chart);
     chart.render();
 }
 
+function loadChart(el) {
+    const { url, days } = el.dataset;
+    fetch(`${url}/${days}`)
+        .then(data => data.json())
+        .catch(e => console.log(e))
+        .then(json => renderChart(el, json))
+}
+
 document.addEventListener('DOMContentLoaded', () => {
     const tabEl = document.getElementById('tab-traffic');
     if (!tabEl) {
@@ -59,12 +71,16 @@ document.addEventListener('DOMContentLoaded', () => {
         return
     }
     tabEl.addEventListener('shown.bs.tab', () => {
-        document.querySelectorAll(".traffic-graph").forEach(el => {
-            const { url } = el.dataset;
-            fetch(url)
-                .then(data => data.json())
-                .catch(e => console.log(e))
-                .then(json => renderChart(el, json))
-        })
+        document.querySelectorAll(".traffic-graph").forEach(loadChart)
     }, { once: true });
+    document.querySelectorAll("#trafficgraph-day-selector button").forEach(button => {
+        button.addEventListener('click', () => {
+            button.parentElement.querySelectorAll("button")
+                .forEach(b => b.classList.toggle('active', b === button));
+            document.querySelectorAll(".traffic-graph").forEach(el => {
+                el.dataset.days = button.dataset.days;
+                loadChart(el);
+            })
+        })
+    });
 });
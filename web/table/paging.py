@@ -0,0 +1,175 @@
+"""
+web.table.paging
+~~~~~~~~~~~~~~~~
+
+Server-side pagination, sorting and searching for bootstrap-table JSON endpoints.
+
+An endpoint decorated with :func:`server_side_paginated` receives the
+parameters ``limit``, ``offset``, ``sort``, ``order`` and ``search``
+(see :class:`PageParams`), selects the requested page using
+:func:`paginate_query` or :func:`paginate_rows`,
+and responds with a :class:`~web.table.table.PagedTableResponse`.
+A :class:`~web.table.table.BootstrapTable` whose ``data_url`` points to such
+an endpoint enables server-side pagination automatically.
+"""
+from __future__ import annotations
+
+import typing as t
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from flask import request, current_app, has_request_context
+from sqlalchemy import Select, String, asc, cast, desc, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql._typing import _ColumnExpressionArgument
+from werkzeug.exceptions import HTTPException
+
+#: The maximum number of rows returned per page, regardless of the requested ``limit``.
+#: Also used if no ``limit`` is requested.
+MAX_PAGE_SIZE = 1000
+
+_SERVER_SIDE_PAGINATED = "server_side_paginated"
+
+
+def server_side_paginated[F: t.Callable[..., t.Any]](view: F) -> F:
+    """Mark a view as a server-side paginated JSON endpoint.
+
+    Must be applied below ``@bp.route``.
+    """
+    setattr(view, _SERVER_SIDE_PAGINATED, True)
+    return view
+
+
+def is_server_side_paginated(url: str) -> bool:
+    """Whether `url` points to a view decorated with :func:`server_side_paginated`.
+
+    Outside of a request context, this is always ``False``.
+    """
+    if not has_request_context():
+        return False
+    path = urlsplit(url).path
+    if request.script_root and path.startswith(request.script_root):
+        path = path[len(request.script_root):]
+    try:
+        endpoint, _ = current_app.url_map.bind_to_environ(request.environ).match(
+            path, method="GET"
+        )
+    except HTTPException:
+        return False
+    return getattr(current_app.view_functions.get(endpoint), _SERVER_SIDE_PAGINATED, False)
+
+
+@dataclass(frozen=True)
+class PageParams:
+    """The page requested by a bootstrap-table with ``data-side-pagination="server"``."""
+
+    limit: int | None = None
+    offset: int = 0
+    #: the ``data-field`` of the column to sort by
+    sort: str | None = None
+    descending: bool = False
+    search: str | None = None
+
+    @classmethod
+    def from_request(cls) -> PageParams:
+        args = request.args
+        limit = args.get("limit", type=int)
+        # formatted columns are sorted by `<data-field>.<sortName>` (see `table.js`)
+        sort, _, _ = args.get("sort", default="").partition(".")
+        return cls(
+            limit=min(limit, MAX_PAGE_SIZE) if limit else MAX_PAGE_SIZE,
+            offset=max(args.get("offset", default=0, type=int), 0),
+            sort=sort or None,
+            descending=args.get("order") == "desc",
+            search=args.get("search") or None,
+        )
+
+    def slice[T](self, rows: t.Sequence[T]) -> t.Sequence[T]:
+        end = self.offset + self.limit if self.limit else None
+        return rows[self.offset:end]
+
+
+@dataclass(frozen=True)
+class Page[T]:
+    #: the number of rows matching the search, on all pages
+    total: int
+    items: t.Sequence[T]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def paginate_query[T](
+    session: Session,
+    stmt: Select[tuple[T]],
+    *,
+    sort_columns: t.Mapping[str, _ColumnExpressionArgument[t.Any]],
+    default_order: t.Sequence[_ColumnExpressionArgument[t.Any]],
+    search_columns: t.Iterable[_ColumnExpressionArgument[t.Any]] = (),
+    params: PageParams | None = None,
+) -> Page[T]:
+    """Select the requested page of a statement selecting a single entity.
+
+    :param session: the session
+    :param stmt: the statement selecting all rows of the table.
+        Every entity has to be selected only once, or the page would be
+        shorter than its size and `total` too high; filter by to-many
+        relationships with ``EXISTS`` (e.g. ``.any()``) instead of joining them.
+    :param sort_columns: the columns which may be sorted by, keyed by field name.
+        Requests to sort by other fields are ignored.
+    :param default_order: the order of the rows if no sorting has been requested.
+        It is also used to break ties, so it should be unique.
+    :param search_columns: the columns which are searched (case-insensitively)
+        for the search term
+    :param params: the requested page. Taken from the request if not given.
+    """
+    params = params or PageParams.from_request()
+
+    if params.search and (search_columns := list(search_columns)):
+        pattern = f"%{_escape_like(params.search)}%"
+        stmt = stmt.where(or_(*(
+            cast(column, String).ilike(pattern, escape="\\") for column in search_columns
+        )))
+
+    total = session.scalar(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ) or 0
+
+    order = list(default_order)
+    if params.sort in sort_columns:
+        column = sort_columns[params.sort]
+        order.insert(0, desc(column) if params.descending else asc(column))
+    stmt = stmt.order_by(None).order_by(*order).offset(params.offset).limit(params.limit)
+
+    return Page(total=total, items=session.scalars(stmt).unique().all())
+
+
+def paginate_rows[T](
+    rows: t.Iterable[T],
+    *,
+    sort_keys: t.Mapping[str, t.Callable[[T], t.Any]],
+    search_text: t.Callable[[T], str] | None = None,
+    params: PageParams | None = None,
+) -> Page[T]:
+    """Select the requested page of rows which are computed in python.
+
+    Only the rows on the page should be converted to the response model afterwards.
+
+    :param rows: all rows of the table, in their default order
+    :param sort_keys: key functions for the fields which may be sorted by.
+        Requests to sort by other fields are ignored.
+    :param search_text: returns the text of a row which is searched
+        (case-insensitively) for the search term
+    :param params: the requested page. Taken from the request if not given.
+    """
+    params = params or PageParams.from_request()
+    rows = list(rows)
+
+    if params.search and search_text:
+        needle = params.search.casefold()
+        rows = [row for row in rows if needle in search_text(row).casefold()]
+    if params.sort in sort_keys:
+        rows.sort(key=sort_keys[params.sort], reverse=params.descending)
+
+    return Page(total=len(rows), items=params.slice(rows))
@@ -16,6 +16,7 @@ from markupsafe import Markup
 from pydantic import BaseModel, Field
 
 from .lazy_join import lazy_join, HasDunderStr
+from .paging import is_server_side_paginated
 
 
 class Column:
@@ -334,6 +335,9 @@ class BootstrapTable(metaclass=BootstrapTableMeta):
         the sub-key ``items``: ``{"items": {"rows": …, "total": …}}``.
         The endpoint should also support the parameters limit, offset,
         search, sort, order to make server-side pagination work.
+        If the endpoint is marked as
+        :func:`~web.table.paging.server_side_paginated`,
+        server-side pagination is enabled automatically.
     :param table_args: Additional things to be passed to table_args.
     """
 
@@ -351,6 +355,8 @@ class BootstrapTable(metaclass=BootstrapTableMeta):
         # un-freeze the classes table args so it can be modified on the instance
         self.table_args = dict(self._table_args)
         self.table_args.setdefault('data-url', self.data_url)
+        if is_server_side_paginated(self.data_url):
+            self.table_args.setdefault('data-side-pagination', "server")
         if table_args:
             self.table_args.update(table_args)
 
@@ -590,3 +596,18 @@ def html_params(**kwargs: HtmlParamValue) -> str:
 
 class TableResponse[TRow: BaseModel](BaseModel):
     items: list[TRow]
+
+
+class TablePage[TRow: BaseModel](BaseModel):
+    total: int
+    rows: list[TRow]
+
+
+class PagedTableResponse[TRow: BaseModel](BaseModel):
+    """The response of a server-side paginated endpoint (see :mod:`web.table.paging`)."""
+
+    items: TablePage[TRow]
+
+    @classmethod
+    def from_page(cls, total: int, rows: list[TRow]) -> t.Self:
+        return cls.model_validate({"items": {"total": total, "rows": rows}})
@@ -6,6 +6,7 @@ import typing as t
 from flask import Flask
 
 from pycroft.model.user import User
+from web.blueprints.access import properties_of
 
 _check_registry: dict[str, t.Callable] = {}
 
@@ -29,10 +30,8 @@ def privilege_check(user: User, *required_privileges: str) -> bool:
     """Tests if the user has one of the required_privileges to view the
     requested component.
     """
-    for perm in required_privileges:
-        if user.has_property(perm):
-            return True
-    return False
+    properties = properties_of(user)
+    return any(perm in properties for perm in required_privileges)
 
 
 @template_check("greater")